@@ -24,6 +24,8 @@ from .tab_trends import generate_tab_trends, get_trends_chart_configs
 from .tab_forecast import generate_tab_forecast, get_forecast_base_data
 from .tab_inventory import generate_tab_inventory, get_inventory_data
 from .scripts import generate_scripts, collect_chart_configs
+from .filter_engine import get_filter_engine_data, get_filter_engine_script
+from .diagnostics import get_diagnostics_script
 
 __all__ = [
     'get_styles',
@@ -43,5 +45,8 @@ __all__ = [
     'generate_tab_inventory',
     'get_inventory_data',
     'generate_scripts',
-    'collect_chart_configs'
+    'collect_chart_configs',
+    'get_filter_engine_data',
+    'get_filter_engine_script',
+    'get_diagnostics_script'
 ]
@@ -31,7 +31,11 @@ def get_html_head(title="RHV to OpenShift Virtualization Migration Dashboard"):
 def get_header(data):
     """Return the dashboard header with title and generation timestamp."""
     generated_at = data.get('generated_at', '')
-    cluster_names = ', '.join(data.get('unique_clusters', ['Unknown']))
+    environments = data.get('environments')
+    if environments:
+        cluster_names = 'Environments: ' + ', '.join(env['name'] for env in environments)
+    else:
+        cluster_names = ', '.join(data.get('unique_clusters', ['Unknown']))
     
     return f'''<body>
     <div class="header">
@@ -47,8 +51,34 @@ def get_header(data):
 '''
 
 
+# Numeric range filters: (VM list field, label)
+RANGE_FILTERS = [
+    ('memory_gb', 'Memory (GB)'),
+    ('vcpus', 'vCPUs'),
+    ('storage_gb', 'Storage (GB)'),
+    ('utilization', 'Utilization (%)')
+]
+
+
+def get_range_filters(vm_list):
+    """Return the min/max input pairs of the numeric range filters."""
+    groups = ''
+    for field, label in RANGE_FILTERS:
+        values = [vm.get(field) or 0 for vm in vm_list]
+        low, high = (min(values), max(values)) if values else (0, 0)
+        groups += f'''
+        <div class="filter-group">
+            <label>{label}</label>
+            <div class="range-inputs">
+                <input type="number" id="filter-{field}-min" placeholder="{low:g}" oninput="scheduleRangeFilters()">
+                <input type="number" id="filter-{field}-max" placeholder="{high:g}" oninput="scheduleRangeFilters()">
+            </div>
+        </div>'''
+    return groups
+
+
 def get_filters_bar(data):
-    """Return the filters bar with all filter dropdowns."""
+    """Return the filters bar with all filter dropdowns and range inputs."""
     # Build cluster options
     cluster_options = '<option value="all">All Clusters</option>\n'
     for cluster in data.get('unique_clusters', []):
@@ -59,7 +89,22 @@ def get_filters_bar(data):
     for host in data.get('unique_hosts', []):
         host_options += f'                <option value="{host}">{host}</option>\n'
     
-    return f'''    <div class="filters-bar">
+    # Environment filter only exists when several exports are compared
+    environment_filter = ''
+    if data.get('environments'):
+        environment_options = '<option value="all">All Environments</option>\n'
+        for env in data['environments']:
+            name = env['name']
+            environment_options += f'                <option value="{name}">{name}</option>\n'
+        environment_filter = f'''
+        <div class="filter-group">
+            <label>Environment</label>
+            <select id="filter-environment" onchange="applyFilters()">
+                {environment_options.strip()}
+            </select>
+        </div>'''
+    
+    return f'''    <div class="filters-bar">{environment_filter}
         <div class="filter-group">
             <label>Cluster</label>
             <select id="filter-cluster" onchange="applyFilters()">
@@ -96,8 +141,15 @@ def get_filters_bar(data):
             <select id="filter-host" onchange="applyFilters()">
                 {host_options.strip()}
             </select>
-        </div>
+        </div>{get_range_filters(data.get('vm_list', []))}
+        <div class="chart-filters" id="chart-filters"></div>
         <button class="reset-btn" onclick="resetFilters()">Reset Filters</button>
+        <div class="filter-group filter-query">
+            <label>Query</label>
+            <input type="text" id="filter-query" placeholder="e.g. os_family=Windows and memory_gb>32 and cluster~PROD"
+                   onchange="applyFilters()" onkeydown="if (event.key === 'Enter') applyFilters()">
+            <div class="query-error" id="filter-query-error"></div>
+        </div>
     </div>
 '''
 
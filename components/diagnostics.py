@@ -0,0 +1,257 @@
+"""
+diagnostics.py
+--------------
+Optional diagnostics panel (generate_dashboard.py --diagnostics):
+- performance.now() spans for engine start-up, JSON parse, chart initialization,
+  each filter query stage and each chart update
+- dataset sizes and JS heap usage (where the browser reports it)
+- JSON export of everything recorded
+
+The script wraps the dashboard's global functions in timed wrappers when the
+page loads. Dashboards generated without the flag do not include it.
+"""
+
+
+def get_diagnostics_script():
+    """
+    Return the JavaScript of the diagnostics panel.
+    It must be embedded after the dashboard scripts (see scripts.generate_scripts).
+    """
+    return '''
+// ============================================
+// DIAGNOSTICS
+// ============================================
+const diagnostics = (function() {
+    const MAX_SPANS = 5000;
+    const spans = [];
+    const pendingQueries = new Map();
+    let engine = null;
+    let firstRender = true;
+
+    function record(name, start, duration, detail) {
+        spans.push({ name: name, start: start, duration: duration, detail: detail || null });
+        if (spans.length > MAX_SPANS) spans.splice(0, spans.length - MAX_SPANS);
+    }
+
+    // Replace a global function by a wrapper recording one span per call
+    // (label: span name, or a function of the call arguments returning it)
+    function wrap(name, label) {
+        const original = window[name];
+        if (typeof original !== 'function') return;
+        window[name] = function() {
+            const start = performance.now();
+            try {
+                return original.apply(this, arguments);
+            } finally {
+                const spanName = typeof label === 'function' ? label.apply(null, arguments) : label || name;
+                record(spanName, start, performance.now() - start);
+            }
+        };
+    }
+
+    function chartName(chart) {
+        return Object.keys(charts).find(key => charts[key] === chart) || 'chart';
+    }
+
+    // Engine messages: start-up timings ('ready') and per-query stage timings
+    function wrapResultHandler() {
+        const original = handleFilterResult;
+        window.handleFilterResult = function(event) {
+            const message = event.data;
+            if (message.type === 'ready') {
+                engine = message;
+                Object.entries(message.timings).forEach(([stage, ms]) => record(`engine ${stage}`, null, ms));
+                return original.apply(this, arguments);
+            }
+            const start = performance.now();
+            const result = original.apply(this, arguments);
+            const end = performance.now();
+            // Superseded results are dropped by the dashboard and not recorded
+            if (message.id !== filterQueryId) return result;
+            record('result render', start, end - start);
+            Object.entries(message.timings || {}).forEach(([stage, ms]) => record(`engine query ${stage}`, null, ms));
+            const queued = pendingQueries.get(message.id);
+            if (queued !== undefined) {
+                record('filter round trip', queued, end - queued, {
+                    id: message.id,
+                    visible: message.visibleCount,
+                    charts: Boolean(message.groups)
+                });
+            }
+            pendingQueries.forEach((_, id) => {
+                if (id <= message.id) pendingQueries.delete(id);
+            });
+            if (firstRender) {
+                firstRender = false;
+                record('page load to first render', 0, end);
+            }
+            if (isOpen()) setTimeout(refresh);
+            return result;
+        };
+    }
+
+    function wrapQueries() {
+        const original = queryFilterEngine;
+        window.queryFilterEngine = function() {
+            const start = performance.now();
+            const result = original.apply(this, arguments);
+            pendingQueries.set(filterQueryId, start);
+            record('query post', start, performance.now() - start);
+            return result;
+        };
+    }
+
+    function datasetSizes() {
+        const chartList = Object.values(charts);
+        return {
+            vms: filterResult ? filterResult.total : null,
+            visible_vms: filterResult ? filterResult.visibleCount : null,
+            engine: engine ? engine.sizes : null,
+            charts: chartList.length,
+            chart_points: chartList.reduce((sum, chart) =>
+                sum + chart.data.datasets.reduce((points, dataset) => points + dataset.data.length, 0), 0),
+            inventory_rows: inventoryRows ? inventoryRows.length : 0,
+            mounted_inventory_rows: document.querySelectorAll('#inventory-table tbody tr').length
+        };
+    }
+
+    // performance.memory is non-standard (Chromium only)
+    function heapUsage() {
+        const memory = performance.memory;
+        if (!memory) return null;
+        const mb = bytes => Math.round(bytes / 1048576 * 10) / 10;
+        return {
+            used_mb: mb(memory.usedJSHeapSize),
+            total_mb: mb(memory.totalJSHeapSize),
+            limit_mb: mb(memory.jsHeapSizeLimit)
+        };
+    }
+
+    // Count, last, mean and max duration per span name
+    function summary() {
+        const stats = {};
+        spans.forEach(span => {
+            const entry = stats[span.name] || (stats[span.name] = { count: 0, total_ms: 0, max_ms: 0, last_ms: 0 });
+            entry.count += 1;
+            entry.total_ms += span.duration;
+            entry.max_ms = Math.max(entry.max_ms, span.duration);
+            entry.last_ms = span.duration;
+        });
+        Object.values(stats).forEach(entry => { entry.mean_ms = entry.total_ms / entry.count; });
+        return stats;
+    }
+
+    function report() {
+        return {
+            generated: new Date().toISOString(),
+            user_agent: navigator.userAgent,
+            sizes: datasetSizes(),
+            heap: heapUsage(),
+            summary: summary(),
+            spans: spans.slice()
+        };
+    }
+
+    function exportJson() {
+        const blob = new Blob([JSON.stringify(report(), null, 2)], { type: 'application/json' });
+        const link = document.createElement('a');
+        link.href = URL.createObjectURL(blob);
+        link.download = 'dashboard-diagnostics.json';
+        link.click();
+        setTimeout(() => URL.revokeObjectURL(link.href));
+    }
+
+    function clear() {
+        spans.length = 0;
+        refresh();
+    }
+
+    function isOpen() {
+        const panel = document.getElementById('diagnostics-panel');
+        return Boolean(panel) && !panel.hidden;
+    }
+
+    function toggle() {
+        const panel = document.getElementById('diagnostics-panel');
+        panel.hidden = !panel.hidden;
+        if (!panel.hidden) refresh();
+    }
+
+    function refresh() {
+        const body = document.getElementById('diagnostics-body');
+        if (!body) return;
+        const sizes = datasetSizes();
+        const heap = heapUsage();
+        const ms = value => value.toFixed(1);
+        const sizeRows = Object.entries(Object.assign({}, sizes, sizes.engine || {}))
+            .filter(([key, value]) => key !== 'engine' && value !== null && typeof value !== 'object')
+            .map(([key, value]) => `<tr><td>${key}</td><td>${value.toLocaleString()}</td></tr>`);
+        if (sizes.engine) {
+            sizeRows.push(`<tr><td>cube_cells</td><td>${sizes.engine.cube_cells.join(' + ') || 'none'}</td></tr>`);
+        }
+        const heapRows = heap
+            ? Object.entries(heap).map(([key, value]) => `<tr><td>${key}</td><td>${value}</td></tr>`)
+            : ['<tr><td colspan="2">Not reported by this browser</td></tr>'];
+        const spanRows = Object.entries(summary()).map(([name, entry]) => `
+            <tr><td>${name}</td><td>${entry.count}</td><td>${ms(entry.last_ms)}</td>
+            <td>${ms(entry.mean_ms)}</td><td>${ms(entry.max_ms)}</td></tr>`);
+        body.innerHTML = `
+            <h4>Dataset</h4>
+            <table>${sizeRows.join('')}</table>
+            <h4>JS heap (MB)</h4>
+            <table>${heapRows.join('')}</table>
+            <h4>Spans (ms)</h4>
+            <table>
+                <tr><th>Span</th><th>Count</th><th>Last</th><th>Mean</th><th>Max</th></tr>
+                ${spanRows.join('')}
+            </table>`;
+    }
+
+    function mount() {
+        const button = document.createElement('button');
+        button.className = 'diagnostics-toggle';
+        button.textContent = 'Diagnostics';
+        button.onclick = toggle;
+        const panel = document.createElement('div');
+        panel.className = 'diagnostics-panel';
+        panel.id = 'diagnostics-panel';
+        panel.hidden = true;
+        panel.innerHTML = `
+            <div class="diagnostics-actions">
+                <strong>Diagnostics</strong>
+                <button onclick="diagnostics.refresh()">Refresh</button>
+                <button onclick="diagnostics.exportJson()">Export JSON</button>
+                <button onclick="diagnostics.clear()">Clear</button>
+            </div>
+            <div id="diagnostics-body"></div>`;
+        document.body.append(button, panel);
+    }
+
+    // Instrument before DOMContentLoaded starts the dashboard
+    engineTimings = true;
+    wrapQueries();
+    wrapResultHandler();
+    wrap('startFilterEngine', 'engine start');
+    wrap('initCharts', 'chart init');
+    ['Overview', 'Sizing', 'Migration', 'Trends'].forEach(tab =>
+        wrap(`init${tab}Charts`, `chart init ${tab.toLowerCase()}`));
+    wrap('initForecastChart', 'chart init forecast');
+    wrap('applyFilters');
+    wrap('updateStatCards');
+    wrap('updateInventoryTable');
+    wrap('renderInventoryWindow');
+    wrap('updateAllCharts');
+    ['Overview', 'Sizing', 'Migration', 'Trends', 'History'].forEach(tab => wrap(`update${tab}Charts`));
+    wrap('renderChart', chart => `chart update ${chartName(chart)}`);
+    wrap('applyForecast');
+    document.addEventListener('DOMContentLoaded', mount);
+
+    return { report: report, exportJson: exportJson, clear: clear, refresh: refresh, toggle: toggle };
+})();
+'''
+
+
+# For testing
+if __name__ == '__main__':
+    script = get_diagnostics_script()
+    print(f"Diagnostics script: {len(script)} characters")
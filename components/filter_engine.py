@@ -0,0 +1,831 @@
+"""
+filter_engine.py
+----------------
+Filtering and aggregation engine that runs in a Web Worker.
+The VM columns and filter cube are embedded once as a JSON data block; the
+worker loads them into a typed-array column store, answers filter queries
+and posts back only the group totals and a transferable row-visibility
+mask. scripts.py starts the worker from an inline Blob (or runs the engine
+in-page when workers are blocked).
+"""
+
+import json
+
+import pandas as pd
+
+
+# VM list fields loaded as typed numeric columns (Uint32Array for integers)
+NUMERIC_FIELDS = {
+    'vcpus': 'uint32',
+    'memory_gb': 'uint32',
+    'storage_gb': 'float64',
+    'used_gb': 'float64',
+    'utilization': 'float64'
+}
+
+# VM list fields loaded as dictionary codes (Uint16Array, Uint32Array past 65535 values)
+CATEGORICAL_FIELDS = [
+    'cluster', 'host', 'status', 'os_family', 'os_consolidated',
+    'size_category', 'complexity', 'environment', 'guest_os',
+    'storage_domain', 'creation_date'
+]
+
+# VM list fields kept as plain strings (one per VM)
+TEXT_FIELDS = ['vm_name']
+
+
+def build_vm_columns(vm_list):
+    """
+    Column-wise form of the VM list for the engine's column store.
+    Categorical fields become {'values', 'codes'}. 'month' codes are ordinals
+    into 'month_axis' (the sorted creation months); undated VMs get the
+    ordinal one past the end of the axis.
+    """
+    columns = {'count': len(vm_list), 'numeric': {}, 'categorical': {}, 'text': {}, 'month_axis': []}
+    if not vm_list:
+        return columns
+    
+    for field in NUMERIC_FIELDS:
+        columns['numeric'][field] = [vm.get(field) or 0 for vm in vm_list]
+    
+    for field in TEXT_FIELDS:
+        columns['text'][field] = [str(vm.get(field) or '') for vm in vm_list]
+    
+    for field in CATEGORICAL_FIELDS:
+        if field in vm_list[0]:
+            codes, uniques = pd.factorize(pd.Series([vm.get(field) for vm in vm_list], dtype=object).fillna(''))
+            columns['categorical'][field] = {'values': [str(v) for v in uniques], 'codes': codes.tolist()}
+    
+    months = pd.Series([(vm.get('creation_date') or '')[:7] for vm in vm_list], dtype=object)
+    axis = sorted(months[months != ''].unique())
+    month_values = axis + [''] if (months == '').any() else axis
+    columns['month_axis'] = axis
+    columns['categorical']['month'] = {
+        'values': month_values,
+        'codes': pd.Index(month_values).get_indexer(months).tolist()
+    }
+    
+    return columns
+
+
+def get_filter_engine_data(data):
+    """
+    Return the JSON data block consumed by the filter engine.
+    Placed before the main script so it is in the DOM when the script runs.
+    """
+    payload = json.dumps({
+        'columns': build_vm_columns(data.get('vm_list', [])),
+        'numeric_types': NUMERIC_FIELDS,
+        'cube': data.get('filter_cube')
+    }).replace('</', '<\\/')
+    return f'''    <script type="application/json" id="filter-engine-data">{payload}</script>
+'''
+
+
+def get_filter_engine_script():
+    """
+    Return the JavaScript source of filterEngine(scope).
+    The function is self-contained so it can be stringified into a worker.
+    """
+    return '''// Runs inside the worker (scope = self) or in-page with a message shim
+function filterEngine(scope) {
+    // Column store: typed numeric columns and dictionary-coded categorical columns
+    let rowCount = 0;
+    let numeric = {};
+    let categorical = {};
+    let text = {};
+    let cube = null;
+    let searchIndex = null;
+    let permutations = {};
+    let queryMasks = new Map();
+    let equalityMasks = new Map();
+    let lastCombination = null;
+    let monthAxis = [];
+    let cubeMonthOrdinals = null;
+
+    const MEASURES = ['vcpus', 'memory_gb', 'storage_gb', 'used_gb'];
+    const ARRAY_TYPES = { uint32: Uint32Array, float64: Float64Array };
+
+    function emptyTotals() {
+        return { count: 0, vcpus: 0, memory_gb: 0, storage_gb: 0, used_gb: 0 };
+    }
+
+    function loadColumns(columns, numericTypes) {
+        rowCount = columns.count || 0;
+        numeric = {};
+        categorical = {};
+        text = columns.text || {};
+        searchIndex = null;
+        permutations = {};
+        queryMasks = new Map();
+        equalityMasks = new Map();
+        lastCombination = null;
+        Object.entries(columns.numeric || {}).forEach(([field, values]) => {
+            const ArrayType = ARRAY_TYPES[numericTypes[field]] || Float64Array;
+            numeric[field] = ArrayType.from(values);
+        });
+        Object.entries(columns.categorical || {}).forEach(([field, column]) => {
+            const CodeArray = column.values.length > 0xFFFF ? Uint32Array : Uint16Array;
+            categorical[field] = { values: column.values, codes: CodeArray.from(column.codes) };
+        });
+    }
+
+    // Categories with a natural order; other values sort alphabetically after them
+    const CATEGORY_ORDER = {
+        size_category: ['Small', 'Medium', 'Large', 'X-Large'],
+        complexity: ['Low', 'Medium', 'High']
+    };
+
+    // Ascending row order of a column, built on first use and cached. Categorical
+    // columns are counting-sorted by the rank of their codes; numeric and text
+    // columns are sorted once (ties keep VM list order).
+    function sortPermutation(field) {
+        if (permutations[field]) return permutations[field];
+        const rows = new Uint32Array(rowCount);
+
+        if (categorical[field]) {
+            const { values, codes } = categorical[field];
+            const order = CATEGORY_ORDER[field] || [];
+            const ranked = values.map((value, code) => code).sort((a, b) => {
+                const ra = order.indexOf(values[a]), rb = order.indexOf(values[b]);
+                if (ra !== rb) return (ra < 0 ? order.length : ra) - (rb < 0 ? order.length : rb);
+                const va = values[a].toLowerCase(), vb = values[b].toLowerCase();
+                return va < vb ? -1 : va > vb ? 1 : 0;
+            });
+            const rank = new Uint32Array(values.length);
+            ranked.forEach((code, r) => { rank[code] = r; });
+            const starts = new Uint32Array(values.length + 1);
+            for (let i = 0; i < rowCount; i++) starts[rank[codes[i]] + 1]++;
+            for (let r = 0; r < values.length; r++) starts[r + 1] += starts[r];
+            for (let i = 0; i < rowCount; i++) rows[starts[rank[codes[i]]]++] = i;
+        } else if (numeric[field]) {
+            const values = numeric[field];
+            for (let i = 0; i < rowCount; i++) rows[i] = i;
+            rows.sort((a, b) => (values[a] - values[b]) || (a - b));
+        } else if (text[field]) {
+            const values = text[field].map(value => value.toLowerCase());
+            for (let i = 0; i < rowCount; i++) rows[i] = i;
+            rows.sort((a, b) => values[a] < values[b] ? -1 : values[a] > values[b] ? 1 : a - b);
+        } else {
+            for (let i = 0; i < rowCount; i++) rows[i] = i;
+        }
+        return permutations[field] = rows;
+    }
+
+    // Visible rows in display order (VM list order, or sorted by one pass over
+    // the column's permutation)
+    function displayOrder(sort, visible, visibleCount) {
+        const order = new Uint32Array(visibleCount);
+        let k = 0;
+        if (!sort) {
+            for (let i = 0; i < rowCount; i++) if (visible[i]) order[k++] = i;
+            return order;
+        }
+        const permutation = sortPermutation(sort.field);
+        if (sort.descending) {
+            for (let p = permutation.length - 1; p >= 0; p--) if (visible[permutation[p]]) order[k++] = permutation[p];
+        } else {
+            for (let p = 0; p < permutation.length; p++) if (visible[permutation[p]]) order[k++] = permutation[p];
+        }
+        return order;
+    }
+
+    // Clear visible rows outside any [min, max] range ([field, min, max], null =
+    // open end). Each range is a binary search on the column's sort permutation;
+    // only the rows inside the matching slices are visited before the final pass.
+    function applyRanges(ranges, visible) {
+        const hits = new Uint8Array(rowCount);
+        ranges.forEach(([field, min, max]) => {
+            const values = numeric[field];
+            if (!values) return;
+            const permutation = sortPermutation(field);
+            const bound = (limit, inclusive) => {
+                let low = 0, high = permutation.length;
+                while (low < high) {
+                    const mid = (low + high) >> 1;
+                    const value = values[permutation[mid]];
+                    if (value < limit || (inclusive && value === limit)) low = mid + 1;
+                    else high = mid;
+                }
+                return low;
+            };
+            const start = min === null ? 0 : bound(min, false);
+            const end = max === null ? permutation.length : bound(max, true);
+            for (let p = start; p < end; p++) hits[permutation[p]]++;
+        });
+        for (let i = 0; i < rowCount; i++) {
+            if (hits[i] !== ranges.length) visible[i] = 0;
+        }
+    }
+
+    // Query expressions: the predicate language of predicates.py, e.g.
+    // os_family=Windows and memory_gb>32 and cluster~PROD. Frame column names
+    // are accepted as aliases (mirrors FIELD_ALIASES in predicates.py, and the
+    // queryable fields match its QUERY_COLUMNS).
+    const QUERY_ALIASES = {
+        cluster_name: 'cluster', vm_host: 'host', mem_size_GB: 'memory_gb', num_of_cpus: 'vcpus',
+        storage_size_GB: 'storage_gb', used_size_GB: 'used_gb', storage_efficiency: 'utilization',
+        storage_pool_name: 'storage_domain'
+    };
+    // Date operands: YYYY, YYYY-MM or YYYY-MM-DD, any time part is ignored
+    const DATE_OPERAND = /^(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?(?:[T ].*)?$/;
+    const QUERY_TOKEN = /\\s*(?:("[^"]*"|'[^']*')|(==|!=|>=|<=|!~|=|<|>|~)|([()])|([^\\s()=!<>~"']+))/y;
+    const QUERY_CACHE_SIZE = 8;
+
+    function parseQuery(source) {
+        const fail = message => { throw new Error(`Invalid query '${source}': ${message}`); };
+        const tokens = [];
+        const input = source.trim();
+        QUERY_TOKEN.lastIndex = 0;
+        while (QUERY_TOKEN.lastIndex < input.length) {
+            const start = QUERY_TOKEN.lastIndex;
+            const match = QUERY_TOKEN.exec(input);
+            if (!match || QUERY_TOKEN.lastIndex === start) fail(`unexpected '${input.slice(start)}'`);
+            if (match[1] !== undefined) tokens.push(['string', match[1].slice(1, -1)]);
+            else if (match[2] !== undefined) tokens.push(['op', match[2]]);
+            else if (match[3] !== undefined) tokens.push(['paren', match[3]]);
+            else {
+                const lower = match[4].toLowerCase();
+                tokens.push(['and', 'or', 'not', 'true', 'false'].includes(lower) ? ['keyword', lower] : ['word', match[4]]);
+            }
+        }
+        if (!tokens.length) return ['const', true];
+
+        let position = 0;
+        const peek = () => tokens[position] || [null, null];
+        const is = (kind, value) => peek()[0] === kind && peek()[1] === value;
+        const advance = () => tokens[position++] || [null, null];
+        const parseOr = () => {
+            const nodes = [parseAnd()];
+            while (is('keyword', 'or')) { advance(); nodes.push(parseAnd()); }
+            return nodes.length === 1 ? nodes[0] : ['or', nodes];
+        };
+        const parseAnd = () => {
+            const nodes = [parseNot()];
+            while (is('keyword', 'and')) { advance(); nodes.push(parseNot()); }
+            return nodes.length === 1 ? nodes[0] : ['and', nodes];
+        };
+        const parseNot = () => {
+            if (is('keyword', 'not')) { advance(); return ['not', parseNot()]; }
+            return parseAtom();
+        };
+        const parseAtom = () => {
+            const [kind, value] = advance();
+            if (kind === 'paren' && value === '(') {
+                const node = parseOr();
+                const [closeKind, close] = advance();
+                if (closeKind !== 'paren' || close !== ')') fail("missing ')'");
+                return node;
+            }
+            if (kind === 'keyword' && (value === 'true' || value === 'false')) return ['const', value === 'true'];
+            if (kind !== 'word') fail(`expected a field name, got '${value}'`);
+            const [opKind, operator] = advance();
+            if (opKind !== 'op') fail(`expected an operator after '${value}'`);
+            const [valueKind, operand] = advance();
+            if (valueKind !== 'word' && valueKind !== 'string') fail(`expected a value after '${value} ${operator}'`);
+            return ['cmp', value, operator === '==' ? '=' : operator, operand];
+        };
+        const tree = parseOr();
+        if (position < tokens.length) fail(`unexpected '${tokens[position][1]}'`);
+        return tree;
+    }
+
+    function compare(value, operator, operand) {
+        switch (operator) {
+            case '=': return value === operand;
+            case '!=': return value !== operand;
+            case '>': return value > operand;
+            case '>=': return value >= operand;
+            case '<': return value < operand;
+            default: return value <= operand;
+        }
+    }
+
+    // Rows matching one comparison. Numeric columns use binary search on their
+    // sort permutation, categorical columns are evaluated once per distinct value
+    // and broadcast through the codes, and name substrings use the trigram index.
+    // Date operand as the YYYY-MM-DD day the VM list stores creation dates as
+    function dateOperand(name, operand) {
+        const match = DATE_OPERAND.exec(operand.trim());
+        const [year, month, day] = match ? match.slice(1).map(part => Number(part || 1)) : [];
+        const date = new Date(0);
+        date.setUTCFullYear(year, month - 1, day);
+        if (!match || date.getUTCFullYear() !== year || date.getUTCMonth() !== month - 1 || date.getUTCDate() !== day) {
+            throw new Error(`Field '${name}' is a date, got '${operand}'`);
+        }
+        return date.toISOString().slice(0, 10);
+    }
+
+    function comparisonMask(name, operator, operand) {
+        const field = QUERY_ALIASES[name] || name;
+        const mask = new Uint8Array(rowCount);
+        const contains = operator === '~' || operator === '!~';
+        const needle = field === 'creation_date' && !contains
+            ? dateOperand(name, operand)
+            : String(operand).toLowerCase();
+
+        if (numeric[field] && !contains) {
+            const number = operand.trim() === '' ? NaN : Number(operand);
+            if (isNaN(number)) throw new Error(`Field '${name}' is numeric, got '${operand}'`);
+            const values = numeric[field];
+            const permutation = sortPermutation(field);
+            const bound = inclusive => {
+                let low = 0, high = permutation.length;
+                while (low < high) {
+                    const mid = (low + high) >> 1;
+                    const value = values[permutation[mid]];
+                    if (value < number || (inclusive && value === number)) low = mid + 1;
+                    else high = mid;
+                }
+                return low;
+            };
+            const below = bound(false), through = bound(true);
+            const [start, end] = {
+                '=': [below, through], '!=': [below, through], '>': [through, rowCount],
+                '>=': [below, rowCount], '<': [0, below], '<=': [0, through]
+            }[operator];
+            for (let p = start; p < end; p++) mask[permutation[p]] = 1;
+            if (operator === '!=') for (let i = 0; i < rowCount; i++) mask[i] ^= 1;
+            return mask;
+        }
+
+        const test = value => contains
+            ? value.toLowerCase().includes(needle) === (operator === '~')
+            : compare(value.toLowerCase(), operator, needle);
+        if (numeric[field]) {
+            const values = numeric[field];
+            for (let i = 0; i < rowCount; i++) mask[i] = test(String(values[i])) ? 1 : 0;
+        } else if (categorical[field]) {
+            // Empty values count as missing and only match negative operators
+            const { values, codes } = categorical[field];
+            const lookup = Uint8Array.from(values, value =>
+                value === '' ? (operator === '!=' || operator === '!~' ? 1 : 0) : (test(value) ? 1 : 0));
+            for (let i = 0; i < rowCount; i++) mask[i] = lookup[codes[i]];
+        } else if (text[field]) {
+            if (field === 'vm_name' && contains && needle.length >= 3) {
+                if (!searchIndex) searchIndex = buildSearchIndex();
+                markNameMatches(needle, mask);
+                if (operator === '!~') for (let i = 0; i < rowCount; i++) mask[i] ^= 1;
+            } else {
+                const values = text[field];
+                for (let i = 0; i < rowCount; i++) mask[i] = test(values[i]) ? 1 : 0;
+            }
+        } else {
+            throw new Error(`Unknown field '${name}' in query`);
+        }
+        return mask;
+    }
+
+    function evaluateQuery(node) {
+        const [kind] = node;
+        if (kind === 'const') return new Uint8Array(rowCount).fill(node[1] ? 1 : 0);
+        if (kind === 'not') {
+            const mask = evaluateQuery(node[1]);
+            for (let i = 0; i < rowCount; i++) mask[i] ^= 1;
+            return mask;
+        }
+        if (kind === 'and' || kind === 'or') {
+            const mask = evaluateQuery(node[1][0]);
+            node[1].slice(1).forEach(child => {
+                const other = evaluateQuery(child);
+                if (kind === 'and') for (let i = 0; i < rowCount; i++) mask[i] &= other[i];
+                else for (let i = 0; i < rowCount; i++) mask[i] |= other[i];
+            });
+            return mask;
+        }
+        return comparisonMask(node[1], node[2], node[3]);
+    }
+
+    // Match mask of a query expression, compiled once and cached (it does not
+    // depend on the other filters)
+    function queryMask(source) {
+        let mask = queryMasks.get(source);
+        if (!mask) {
+            mask = evaluateQuery(parseQuery(source));
+            if (queryMasks.size >= QUERY_CACHE_SIZE) queryMasks.delete(queryMasks.keys().next().value);
+            queryMasks.set(source, mask);
+        }
+        return mask;
+    }
+
+    // Search index, built on first search: trigram posting lists (ascending row
+    // ids) and a name-sorted row order for prefix lookups over VM names, plus
+    // lower-cased dictionaries of the categorical search fields
+    const SEARCH_FIELDS = ['guest_os', 'host'];
+
+    function buildSearchIndex() {
+        const names = (text.vm_name || []).map(name => name.toLowerCase());
+        const grams = new Map();
+        names.forEach((name, row) => {
+            for (let k = 0; k + 3 <= name.length; k++) {
+                const gram = name.substr(k, 3);
+                let list = grams.get(gram);
+                if (!list) grams.set(gram, list = []);
+                if (list[list.length - 1] !== row) list.push(row);
+            }
+        });
+        grams.forEach((list, gram) => grams.set(gram, Uint32Array.from(list)));
+        const byName = sortPermutation('vm_name');
+
+        const dictionaries = {};
+        SEARCH_FIELDS.forEach(field => {
+            if (categorical[field]) dictionaries[field] = categorical[field].values.map(v => v.toLowerCase());
+        });
+        return { names: names, grams: grams, byName: byName, dictionaries: dictionaries };
+    }
+
+    // Mark the rows whose VM name matches a term: substring via trigram
+    // intersection for terms of 3+ characters, name prefix otherwise
+    function markNameMatches(term, hits) {
+        const { names, grams, byName } = searchIndex;
+        if (term.length >= 3) {
+            const lists = [];
+            for (let k = 0; k + 3 <= term.length; k++) {
+                const list = grams.get(term.substr(k, 3));
+                if (!list) return;
+                lists.push(list);
+            }
+            lists.sort((a, b) => a.length - b.length);
+            const candidates = lists[0];
+            for (let c = 0; c < candidates.length; c++) {
+                if (names[candidates[c]].includes(term)) hits[candidates[c]] = 1;
+            }
+            return;
+        }
+        let low = 0, high = byName.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (names[byName[mid]] < term) low = mid + 1;
+            else high = mid;
+        }
+        for (let k = low; k < byName.length && names[byName[k]].startsWith(term); k++) hits[byName[k]] = 1;
+    }
+
+    // Clear visible rows that do not match every search term in name, guest OS or host
+    function applySearch(search, visible) {
+        const terms = search.toLowerCase().split(/\\s+/).filter(Boolean);
+        if (!terms.length) return;
+        if (!searchIndex) searchIndex = buildSearchIndex();
+
+        terms.forEach(term => {
+            const hits = new Uint8Array(rowCount);
+            markNameMatches(term, hits);
+            Object.entries(searchIndex.dictionaries).forEach(([field, values]) => {
+                const matched = Uint8Array.from(values, value => value.includes(term) ? 1 : 0);
+                const codes = categorical[field].codes;
+                for (let i = 0; i < rowCount; i++) hits[i] |= matched[codes[i]];
+            });
+            for (let i = 0; i < rowCount; i++) visible[i] &= hits[i];
+        });
+    }
+
+    // Row mask of one dropdown/chart filter (field = value), cached
+    const EQUALITY_CACHE_SIZE = 64;
+
+    function equalityMask(field, value) {
+        const key = field + '\u0000' + value;
+        let mask = equalityMasks.get(key);
+        if (!mask) {
+            mask = new Uint8Array(rowCount);
+            const column = categorical[field];
+            const code = column ? column.values.indexOf(value) : -1;
+            if (code >= 0) {
+                const codes = column.codes;
+                for (let i = 0; i < rowCount; i++) mask[i] = codes[i] === code ? 1 : 0;
+            }
+            if (equalityMasks.size >= EQUALITY_CACHE_SIZE) equalityMasks.delete(equalityMasks.keys().next().value);
+            equalityMasks.set(key, mask);
+        }
+        return mask;
+    }
+
+    // Intersection of the filter masks. The main selection is incremental: when
+    // the filters only add to the previous combination, its mask is narrowed by
+    // the new filters instead of intersecting everything again.
+    function filtersMask(active, incremental) {
+        const keys = active.map(([field, value]) => field + '\u0000' + value);
+        let mask;
+        let pending = active;
+        if (incremental && lastCombination && lastCombination.keys.every(key => keys.includes(key))) {
+            mask = lastCombination.mask.slice();
+            pending = active.filter((filter, j) => !lastCombination.keys.includes(keys[j]));
+        } else {
+            mask = new Uint8Array(rowCount).fill(1);
+        }
+        pending.forEach(([field, value]) => {
+            const other = equalityMask(field, value);
+            for (let i = 0; i < rowCount; i++) mask[i] &= other[i];
+        });
+        if (incremental) lastCombination = { keys: keys, mask: mask.slice() };
+        return mask;
+    }
+
+    function maskRows(mask) {
+        let count = 0;
+        for (let i = 0; i < rowCount; i++) count += mask[i];
+        const rows = new Uint32Array(count);
+        for (let i = 0, r = 0; i < rowCount; i++) if (mask[i]) rows[r++] = i;
+        return rows;
+    }
+
+    // Filtered VMs as the aggregations see them: cube cells per cuboid when the
+    // cube can answer, otherwise row indices of the mask; both built on demand.
+    // A cuboid can only answer if it has every filtered field (covers).
+    function selection(filters, rowMask, useCube) {
+        const cells = [];
+        let rows = null;
+        return {
+            useCube: useCube,
+            covers: cuboid => filters.every(([field]) => cuboid.dimensions[field]),
+            cells: index => cells[index] ||= filterCuboid(cube.cuboids[index], filters),
+            rows: () => rows ||= maskRows(rowMask())
+        };
+    }
+
+    function filterCuboid(cuboid, active) {
+        const checks = active.map(([field, value]) => {
+            const dim = cuboid.dimensions[field];
+            const code = dim ? dim.values.indexOf(value) : -1;
+            return [dim ? dim.codes : [], code < 0 ? -2 : code];
+        });
+        const cells = [];
+        for (let i = 0; i < cuboid.cells; i++) {
+            if (checks.every(([codes, code]) => codes[i] === code)) cells.push(i);
+        }
+        return cells;
+    }
+
+    // Sum measures of the filtered rows into flat per-code accumulators
+    // (group code * subgroup count + subgroup code), then name the groups.
+    function scanTotals(field, subField, rows) {
+        const columnOf = name => name ? categorical[name] : null;
+        const groupColumn = columnOf(field);
+        const subColumn = columnOf(subField);
+        const groupCount = groupColumn ? groupColumn.values.length : 1;
+        const subCount = subColumn ? subColumn.values.length : 1;
+        const slots = groupCount * subCount;
+        const counts = new Float64Array(slots);
+        const sums = MEASURES.map(() => new Float64Array(slots));
+        const measureColumns = MEASURES.map(name => numeric[name]);
+        const groupCodes = groupColumn ? groupColumn.codes : null;
+        const subCodes = subColumn ? subColumn.codes : null;
+
+        for (let r = 0; r < rows.length; r++) {
+            const i = rows[r];
+            const slot = (groupCodes ? groupCodes[i] * subCount : 0) + (subCodes ? subCodes[i] : 0);
+            counts[slot] += 1;
+            for (let m = 0; m < measureColumns.length; m++) {
+                if (measureColumns[m]) sums[m][slot] += measureColumns[m][i];
+            }
+        }
+
+        const cells = [];
+        for (let slot = 0; slot < slots; slot++) {
+            if (!counts[slot]) continue;
+            const totals = { count: counts[slot] };
+            MEASURES.forEach((name, m) => { totals[name] = sums[m][slot]; });
+            cells.push([
+                groupColumn ? groupColumn.values[Math.floor(slot / subCount)] : 'all',
+                subColumn ? subColumn.values[slot % subCount] : null,
+                totals
+            ]);
+        }
+        return cells;
+    }
+
+    // Sum VM count and resources grouped by one field (and optionally a second,
+    // giving nested groups). Sums cube cells when a cuboid covers the fields,
+    // otherwise scans the selection's rows in the column store.
+    function groupTotals(field, subField, selection) {
+        const result = {};
+        if ((field && !categorical[field]) || (subField && !categorical[subField])) return result;
+        const bucket = (key, subKey) => {
+            const group = key || 'Unknown';
+            if (!subField) return result[group] ||= emptyTotals();
+            const nested = result[group] ||= {};
+            return nested[subKey || 'Unknown'] ||= emptyTotals();
+        };
+        const add = (totals, count, measure) => {
+            totals.count += count;
+            MEASURES.forEach(name => { totals[name] += measure(name); });
+        };
+
+        const index = selection.useCube ? cube.cuboids.findIndex(cuboid =>
+            (!field || cuboid.dimensions[field]) && (!subField || cuboid.dimensions[subField]) &&
+            selection.covers(cuboid)
+        ) : -1;
+
+        if (index >= 0) {
+            const cuboid = cube.cuboids[index];
+            const m = cuboid.measures;
+            const keyOf = name => {
+                if (!name) return () => 'all';
+                const dim = cuboid.dimensions[name];
+                return i => dim.values[dim.codes[i]];
+            };
+            const key = keyOf(field);
+            const subKey = keyOf(subField);
+            selection.cells(index).forEach(i => {
+                add(bucket(key(i), subKey(i)), m.count[i], name => m[name][i]);
+            });
+        } else {
+            scanTotals(field, subField, selection.rows()).forEach(([key, subKey, totals]) => {
+                add(bucket(key, subKey), totals.count, name => totals[name]);
+            });
+        }
+        return result;
+    }
+
+    // Monthly VMs/vCPUs/memory over the global month axis: counting sort of the
+    // filtered cells (or rows) into fixed buckets, then prefix sums for the
+    // cumulative series
+    function monthlyTrends(selection) {
+        const size = monthAxis.length;
+        const monthly = { count: new Float64Array(size), vcpus: new Float64Array(size), memory_gb: new Float64Array(size) };
+        const index = selection.useCube && cubeMonthOrdinals
+            ? cube.cuboids.findIndex(cuboid => cuboid.dimensions.month && selection.covers(cuboid))
+            : -1;
+
+        if (index >= 0) {
+            const cuboid = cube.cuboids[index];
+            const codes = cuboid.dimensions.month.codes;
+            const m = cuboid.measures;
+            const cells = selection.cells(index);
+            for (let c = 0; c < cells.length; c++) {
+                const i = cells[c];
+                const ordinal = codes[i] >= 0 ? cubeMonthOrdinals[codes[i]] : -1;
+                if (ordinal < 0) continue;
+                monthly.count[ordinal] += m.count[i];
+                monthly.vcpus[ordinal] += m.vcpus[i];
+                monthly.memory_gb[ordinal] += m.memory_gb[i];
+            }
+        } else if (categorical.month) {
+            const ordinals = categorical.month.codes;
+            const vcpus = numeric.vcpus;
+            const memory = numeric.memory_gb;
+            const rows = selection.rows();
+            for (let r = 0; r < rows.length; r++) {
+                const i = rows[r];
+                const ordinal = ordinals[i];
+                if (ordinal >= size) continue;
+                monthly.count[ordinal] += 1;
+                monthly.vcpus[ordinal] += vcpus[i];
+                monthly.memory_gb[ordinal] += memory[i];
+            }
+        }
+
+        const cumulative = {};
+        Object.entries(monthly).forEach(([name, values]) => {
+            const sums = cumulative[name] = new Float64Array(size);
+            for (let k = 0, total = 0; k < size; k++) sums[k] = total += values[k];
+        });
+        return { monthly: monthly, cumulative: cumulative };
+    }
+
+    // Stage timer for diagnostics: lap(name) records the time since the previous lap
+    function stopwatch() {
+        const timings = {};
+        let last = performance.now();
+        const lap = name => {
+            const now = performance.now();
+            timings[name] = now - last;
+            last = now;
+        };
+        lap.timings = timings;
+        return lap;
+    }
+
+    function init(json, withTimings) {
+        const lap = withTimings ? stopwatch() : null;
+        const data = JSON.parse(json);
+        lap?.('parse');
+        const columns = data.columns || {};
+        loadColumns(columns, data.numeric_types || {});
+        cube = data.cube;
+
+        // Cube month values -> ordinals on the global month axis
+        monthAxis = columns.month_axis || [];
+        const monthCuboid = cube ? cube.cuboids.find(cuboid => cuboid.dimensions.month) : null;
+        cubeMonthOrdinals = monthCuboid
+            ? Int32Array.from(monthCuboid.dimensions.month.values, value => monthAxis.indexOf(value))
+            : null;
+
+        if (lap) {
+            lap('load');
+            scope.postMessage({
+                type: 'ready',
+                timings: lap.timings,
+                sizes: {
+                    json_chars: json.length,
+                    rows: rowCount,
+                    categorical_fields: Object.keys(categorical).length,
+                    months: monthAxis.length,
+                    cube_cells: cube ? cube.cuboids.map(cuboid => cuboid.cells) : []
+                }
+            });
+        }
+    }
+
+    function query(message) {
+        const active = message.filters;
+        const ranges = message.ranges || [];
+        const lap = message.timings ? stopwatch() : null;
+
+        // An invalid query is reported back and otherwise ignored
+        let matches = null;
+        let queryError = null;
+        if (message.query) {
+            try {
+                matches = queryMask(message.query);
+            } catch (error) {
+                queryError = error.message;
+            }
+        }
+
+        // The cube has no numeric dimensions and cannot evaluate queries, so range
+        // filters and queries aggregate from the rows
+        const useCube = Boolean(cube) && !ranges.length && !matches;
+        const narrow = mask => {
+            if (ranges.length) applyRanges(ranges, mask);
+            if (matches) for (let i = 0; i < rowCount; i++) mask[i] &= matches[i];
+            return mask;
+        };
+
+        // Row visibility in VM list order (= inventory row order)
+        const visible = narrow(filtersMask(active, true));
+        let visibleCount = 0;
+        for (let i = 0; i < rowCount; i++) visibleCount += visible[i];
+        const filtered = selection(active, () => visible, useCube);
+        lap?.('filters');
+
+        // Inventory-only queries (search, sort) skip the chart groups
+        const groups = message.groups ? {} : null;
+        (message.groups || []).forEach(([field, subField]) => {
+            groups[[field, subField].filter(Boolean).join('|') || 'all'] = groupTotals(field, subField, filtered);
+        });
+        lap?.('groups');
+
+        // Context groups for cross-filtering: a filtered field grouped under all
+        // the other filters, so its chart keeps every segment and highlights the
+        // selected one
+        const contextGroups = message.groups ? {} : null;
+        (message.contextFields || []).forEach(field => {
+            if (!active.some(([name]) => name === field)) return;
+            const others = active.filter(([name]) => name !== field);
+            contextGroups[field] = groupTotals(field, null, selection(others, () => narrow(filtersMask(others, false)), useCube));
+        });
+        lap?.('context');
+
+        const transfer = [visible.buffer];
+        const trends = message.trends ? monthlyTrends(filtered) : null;
+        if (trends) {
+            [trends.monthly, trends.cumulative].forEach(series =>
+                Object.values(series).forEach(values => transfer.push(values.buffer)));
+        }
+        lap?.('trends');
+
+        // The inventory search narrows the visible rows only, after the groups are built
+        if (message.search) {
+            applySearch(message.search, visible);
+            visibleCount = 0;
+            for (let i = 0; i < rowCount; i++) visibleCount += visible[i];
+        }
+        lap?.('search');
+
+        const order = displayOrder(message.sort, visible, visibleCount);
+        transfer.push(order.buffer);
+        lap?.('order');
+
+        scope.postMessage({
+            type: 'result',
+            id: message.id,
+            groups: groups,
+            contextGroups: contextGroups,
+            trends: trends,
+            visible: visible,
+            order: order,
+            sort: message.sort || null,
+            queryError: queryError,
+            visibleCount: visibleCount,
+            total: rowCount,
+            timings: lap ? lap.timings : null
+        }, transfer);
+    }
+
+    scope.onmessage = function(event) {
+        const message = event.data;
+        if (message.type === 'init') init(message.data, message.timings);
+        else if (message.type === 'query') query(message);
+    };
+}
+'''
+
+
+# For testing
+if __name__ == '__main__':
+    mock_data = {
+        'vm_list': [{'vm_name': 'VM-1', 'cluster': 'TEST', 'os_family': 'Linux'}],
+        'filter_cube': None
+    }
+    print(get_filter_engine_data(mock_data))
+    print(f"Engine script: {len(get_filter_engine_script())} characters")
@@ -11,37 +11,60 @@ All JavaScript for the dashboard:
 
 import json
 
+try:
+    from .filter_engine import get_filter_engine_script
+    from .diagnostics import get_diagnostics_script
+except ImportError:
+    from filter_engine import get_filter_engine_script
+    from diagnostics import get_diagnostics_script
 
-def generate_scripts(data, chart_configs):
+
+# Chart size limits (overridable from the generator command line):
+# top_n - bars shown for high-cardinality groups (hosts, guest OS, clusters), the rest
+#         are summed into an "Other" bar
+# max_points - points per time series; longer series are downsampled
+# animation_threshold - charts with more data points than this update without animation
+DEFAULT_CHART_DISPLAY = {
+    'top_n': 20,
+    'max_points': 120,
+    'animation_threshold': 500
+}
+
+
+def generate_scripts(data, chart_configs, diagnostics=False):
     """
     Generate complete JavaScript for the dashboard.
     
     Args:
         data: Processed data dictionary from data_processor
         chart_configs: Dictionary containing chart configuration data
+        diagnostics: Include the diagnostics panel (see diagnostics.py)
         
     Returns:
         JavaScript code as a string
     """
     
-    # Serialize data for embedding
-    vm_list_json = json.dumps(data.get('vm_list', []))
+    # Serialize data for embedding (the VM list and filter cube go to the
+    # filter engine's JSON data block, see filter_engine.py)
     overview_charts = json.dumps(chart_configs.get('overview', {}))
     sizing_charts = json.dumps(chart_configs.get('sizing', {}))
     migration_charts = json.dumps(chart_configs.get('migration', {}))
     trends_charts = json.dumps(chart_configs.get('trends', {}))
     forecast_data = json.dumps(chart_configs.get('forecast', {}))
+    chart_display = json.dumps({**DEFAULT_CHART_DISPLAY, **(chart_configs.get('display') or {})})
+    filter_engine_script = get_filter_engine_script()
+    diagnostics_script = get_diagnostics_script() if diagnostics else ''
     
     return f'''
 // ============================================
 // DATA
 // ============================================
-const vmData = {vm_list_json};
 const overviewChartData = {overview_charts};
 const sizingChartData = {sizing_charts};
 const migrationChartData = {migration_charts};
 const trendsChartData = {trends_charts};
 const forecastBaseData = {forecast_data};
+const chartDisplay = {chart_display};
 
 // Chart instances storage
 const charts = {{}};
@@ -66,84 +89,515 @@ function switchTab(tabId) {{
             if (chart) chart.resize();
         }});
     }}, 100);
+    
+    // The inventory window is sized from the visible table
+    if (tabId === 'inventory' && inventoryRows) renderInventoryWindow(true);
 }}
 
 // ============================================
-// FILTERING
+// FILTER ENGINE
 // ============================================
-let filteredData = [...vmData];
+{filter_engine_script}
+// Filter dropdown -> VM field
+const FILTER_FIELDS = {{
+    'filter-environment': 'environment',
+    'filter-cluster': 'cluster',
+    'filter-os': 'os_family',
+    'filter-status': 'status',
+    'filter-complexity': 'complexity',
+    'filter-host': 'host'
+}};
+
+// Groupings requested from the engine for stat cards and charts
+const GROUP_REQUESTS = [
+    [null], ['status'], ['cluster'], ['host'], ['environment'], ['os_family'], ['os_consolidated'],
+    ['size_category'], ['complexity'], ['os_family', 'complexity']
+];
+
+let filterEngineWorker = null;
+let filterQueryId = 0;
+let filterResult = null;
+// Set by the diagnostics panel: the engine then reports its stage timings
+let engineTimings = false;
+
+// Run filterEngine() in-page behind the same message interface as a Worker
+function createInPageEngine() {{
+    const port = {{ onmessage: null }};
+    const scope = {{
+        onmessage: null,
+        postMessage: message => setTimeout(() => port.onmessage && port.onmessage({{ data: message }}))
+    }};
+    filterEngine(scope);
+    port.postMessage = message => setTimeout(() => scope.onmessage({{ data: message }}));
+    port.terminate = () => {{}};
+    return port;
+}}
+
+function startFilterEngine() {{
+    const dataBlock = document.getElementById('filter-engine-data');
+    const json = dataBlock ? dataBlock.textContent : '{{"columns": {{}}, "cube": null}}';
+    
+    const connect = engine => {{
+        filterEngineWorker = engine;
+        engine.onmessage = handleFilterResult;
+        engine.postMessage({{ type: 'init', data: json, timings: engineTimings }});
+    }};
+    
+    try {{
+        const source = '(' + filterEngine.toString() + ')(self);';
+        const url = URL.createObjectURL(new Blob([source], {{ type: 'text/javascript' }}));
+        const worker = new Worker(url);
+        worker.onerror = () => {{
+            // Worker blocked or failed to load: fall back to the in-page engine
+            worker.terminate();
+            connect(createInPageEngine());
+            applyFilters();
+        }};
+        connect(worker);
+    }} catch (e) {{
+        connect(createInPageEngine());
+    }}
+}}
+
+function getActiveFilters() {{
+    const active = [];
+    Object.entries(FILTER_FIELDS).forEach(([id, field]) => {{
+        const value = document.getElementById(id)?.value || 'all';
+        if (value !== 'all') active.push([field, value]);
+    }});
+    // Chart selections on fields without a dropdown (or a value the dropdown lacks)
+    Object.entries(chartFilters).forEach(([field, value]) => {{
+        if (!active.some(([name]) => name === field)) active.push([field, value]);
+    }});
+    return active;
+}}
+
+// Numeric range filters: [field, min, max], null for an empty input
+const RANGE_FIELDS = ['memory_gb', 'vcpus', 'storage_gb', 'utilization'];
+
+function getActiveRanges() {{
+    const ranges = [];
+    RANGE_FIELDS.forEach(field => {{
+        const bound = suffix => {{
+            const value = parseFloat(document.getElementById(`filter-${{field}}-${{suffix}}`)?.value);
+            return isNaN(value) ? null : value;
+        }};
+        const min = bound('min');
+        const max = bound('max');
+        if (min !== null || max !== null) ranges.push([field, min, max]);
+    }});
+    return ranges;
+}}
+
+let rangeFilterTimer = null;
+
+function scheduleRangeFilters() {{
+    clearTimeout(rangeFilterTimer);
+    rangeFilterTimer = setTimeout(applyFilters, 200);
+}}
+
+// Id of the latest query that asked for chart groups, and of the latest one rendered
+let chartsQueryId = 0;
+let renderedChartsQueryId = 0;
+
+function queryFilterEngine(inventoryOnly) {{
+    if (!filterEngineWorker) startFilterEngine();
+    filterQueryId += 1;
+    // An inventory-only query must not supersede a chart update still in flight
+    const withCharts = !inventoryOnly || chartsQueryId > renderedChartsQueryId || !filterResult;
+    if (withCharts) chartsQueryId = filterQueryId;
+    filterEngineWorker.postMessage({{
+        type: 'query',
+        id: filterQueryId,
+        filters: getActiveFilters(),
+        ranges: getActiveRanges(),
+        query: document.getElementById('filter-query')?.value.trim() || '',
+        groups: withCharts ? GROUP_REQUESTS : null,
+        contextFields: withCharts ? CONTEXT_FIELDS : null,
+        trends: withCharts,
+        search: document.getElementById('inventory-search')?.value.trim() || '',
+        sort: inventorySort,
+        timings: engineTimings
+    }});
+}}
 
 function applyFilters() {{
-    const clusterFilter = document.getElementById('filter-cluster').value;
-    const osFilter = document.getElementById('filter-os').value;
-    const statusFilter = document.getElementById('filter-status').value;
-    const complexityFilter = document.getElementById('filter-complexity').value;
-    const hostFilter = document.getElementById('filter-host').value;
-    
-    filteredData = vmData.filter(vm => {{
-        if (clusterFilter !== 'all' && vm.cluster !== clusterFilter) return false;
-        if (osFilter !== 'all' && vm.os_family !== osFilter) return false;
-        if (statusFilter !== 'all' && vm.status !== statusFilter) return false;
-        if (complexityFilter !== 'all' && vm.complexity !== complexityFilter) return false;
-        if (hostFilter !== 'all' && vm.host !== hostFilter) return false;
-        return true;
+    queryFilterEngine(false);
+}}
+
+// Inventory search narrows the inventory rows; queries are issued once typing pauses
+let inventorySearchTimer = null;
+
+function scheduleInventorySearch() {{
+    clearTimeout(inventorySearchTimer);
+    inventorySearchTimer = setTimeout(() => queryFilterEngine(true), 120);
+}}
+
+// Inventory sort: clicking a column sorts ascending, clicking it again toggles the direction
+let inventorySort = null;
+
+function sortInventory(field) {{
+    const descending = inventorySort?.field === field && !inventorySort.descending;
+    inventorySort = {{ field: field, descending: descending }};
+    document.querySelectorAll('#inventory-table th.sortable').forEach(th => {{
+        th.classList.toggle('sort-asc', th.dataset.sort === field && !descending);
+        th.classList.toggle('sort-desc', th.dataset.sort === field && descending);
     }});
+    queryFilterEngine(true);
+}}
+
+function handleFilterResult(event) {{
+    const result = event.data;
+    // Only the latest query is rendered; results of superseded queries are dropped
+    if (result.type !== 'result' || result.id !== filterQueryId) return;
+    const queryError = document.getElementById('filter-query-error');
+    if (queryError) queryError.textContent = result.queryError || '';
+    
+    // Inventory-only results keep the chart groups of the previous result
+    if (!result.groups) {{
+        filterResult = Object.assign(result, {{
+            groups: filterResult.groups,
+            contextGroups: filterResult.contextGroups,
+            trends: filterResult.trends
+        }});
+        updateInventoryTable();
+        return;
+    }}
+    filterResult = result;
+    renderedChartsQueryId = result.id;
     
     updateInventoryTable();
     updateAllCharts();
     updateStatCards();
 }}
 
+// ============================================
+// FILTERED AGGREGATION
+// ============================================
+function emptyTotals() {{
+    return {{ count: 0, vcpus: 0, memory_gb: 0, storage_gb: 0, used_gb: 0 }};
+}}
+
+// Totals of the filtered VMs grouped by field (and subField), from the latest engine result
+function groupTotals(field, subField) {{
+    const key = [field, subField].filter(Boolean).join('|') || 'all';
+    return filterResult?.groups[key] || {{}};
+}}
+
+function filteredTotals() {{
+    return groupTotals(null).all || emptyTotals();
+}}
+
+// Count per group, e.g. {{ Linux: 10, Windows: 4 }}
+function groupCounts(field) {{
+    const groups = groupTotals(field);
+    return Object.fromEntries(Object.entries(groups).map(([key, totals]) => [key, totals.count]));
+}}
+
 function resetFilters() {{
+    const environmentSelect = document.getElementById('filter-environment');
+    if (environmentSelect) environmentSelect.value = 'all';
     document.getElementById('filter-cluster').value = 'all';
     document.getElementById('filter-os').value = 'all';
     document.getElementById('filter-status').value = 'all';
     document.getElementById('filter-complexity').value = 'all';
     document.getElementById('filter-host').value = 'all';
+    RANGE_FIELDS.forEach(field => ['min', 'max'].forEach(suffix => {{
+        const input = document.getElementById(`filter-${{field}}-${{suffix}}`);
+        if (input) input.value = '';
+    }}));
+    const searchInput = document.getElementById('inventory-search');
+    if (searchInput) searchInput.value = '';
+    const queryInput = document.getElementById('filter-query');
+    if (queryInput) queryInput.value = '';
+    chartFilters = {{}};
+    renderChartFilterChips();
     applyFilters();
 }}
 
+// ============================================
+// CROSS-FILTERING
+// ============================================
+// Clicking a chart segment toggles a filter on the chart's field. Fields with a
+// dropdown use the dropdown; the others are kept as chart filters (shown as
+// chips). A filtered field's own charts are drawn from its context group (all
+// other filters applied) with the selected segment highlighted and the rest dimmed.
+const CHART_FILTER_FIELDS = {{
+    osFamily: 'os_family',
+    sizeCategories: 'size_category',
+    complexity: 'complexity',
+    clusterResources: 'cluster',
+    hostResources: 'host',
+    environments: 'environment',
+    guestOs: 'os_consolidated',
+    sizePie: 'size_category',
+    resourcesBySize: 'size_category',
+    complexityOs: 'os_family'
+}};
+const CONTEXT_FIELDS = [...new Set(Object.values(CHART_FILTER_FIELDS))];
+const FILTER_LABELS = {{
+    environment: 'Environment', cluster: 'Cluster', os_family: 'OS Family', status: 'Status',
+    complexity: 'Complexity', host: 'Host', size_category: 'Size', os_consolidated: 'Guest OS'
+}};
+
+let chartFilters = {{}};
+
+function filterSelect(field) {{
+    const id = Object.keys(FILTER_FIELDS).find(key => FILTER_FIELDS[key] === field);
+    return id ? document.getElementById(id) : null;
+}}
+
+function selectedValue(field) {{
+    const select = filterSelect(field);
+    if (select && select.value !== 'all') return select.value;
+    return chartFilters[field] ?? null;
+}}
+
+function toggleChartFilter(field, value) {{
+    const wasSelected = selectedValue(field) === value;
+    const select = filterSelect(field);
+    if (select) select.value = 'all';
+    delete chartFilters[field];
+    if (!wasSelected) {{
+        if (select && Array.from(select.options).some(option => option.value === value)) select.value = value;
+        else chartFilters[field] = value;
+    }}
+    renderChartFilterChips();
+    applyFilters();
+}}
+
+function renderChartFilterChips() {{
+    const container = document.getElementById('chart-filters');
+    if (!container) return;
+    container.replaceChildren(...Object.entries(chartFilters).map(([field, value]) => {{
+        const chip = document.createElement('button');
+        chip.className = 'filter-chip';
+        chip.title = 'Remove filter';
+        chip.textContent = `${{FILTER_LABELS[field] || field}}: ${{value}} \u2715`;
+        chip.onclick = () => toggleChartFilter(field, value);
+        return chip;
+    }}));
+}}
+
+// Totals of a chart's field: its context group while the field is filtered
+function chartTotals(field) {{
+    return filterResult?.contextGroups?.[field] || groupTotals(field);
+}}
+
+function chartCounts(field) {{
+    const groups = chartTotals(field);
+    return Object.fromEntries(Object.entries(groups).map(([key, totals]) => [key, totals.count]));
+}}
+
+function dimColor(color) {{
+    return /^#[0-9a-f]{{6}}$/i.test(color) ? color + '40' : color;
+}}
+
+// Highlight the selected label of a chart and dim the others (dataset.baseColor
+// keeps the undimmed colors)
+function highlightSelection(chart, field) {{
+    const selected = selectedValue(field);
+    chart.data.datasets.forEach(dataset => {{
+        if (dataset.baseColor === undefined) dataset.baseColor = dataset.backgroundColor;
+        const base = dataset.baseColor;
+        if (selected === null) {{
+            dataset.backgroundColor = base;
+            return;
+        }}
+        dataset.backgroundColor = chart.data.labels.map((label, i) => {{
+            const color = Array.isArray(base) ? base[i % base.length] : base;
+            return label === selected ? color : dimColor(color);
+        }});
+    }});
+}}
+
+function enableChartFilters() {{
+    Object.entries(CHART_FILTER_FIELDS).forEach(([key, field]) => {{
+        const chart = charts[key];
+        if (!chart) return;
+        chart.options.onClick = (event, elements) => {{
+            const label = elements.length ? chart.data.labels[elements[0].index] : null;
+            if (label !== null && label !== chart.data.otherLabel) toggleChartFilter(field, label);
+        }};
+        chart.options.onHover = (event, elements) => {{
+            event.native.target.style.cursor = elements.length ? 'pointer' : 'default';
+        }};
+    }});
+}}
+
+// ============================================
+// CHART DECIMATION
+// ============================================
+// Largest groups of a chart, with the remaining ones summed into an "Other" group.
+// A selected group (cross-filter) stays visible even when it is not among the largest.
+function topGroups(groups, selected) {{
+    const entries = Object.entries(groups);
+    const limit = chartDisplay.top_n;
+    if (entries.length <= limit) return {{ entries, otherLabel: null }};
+    entries.sort((a, b) => b[1].count - a[1].count);
+    const kept = entries.slice(0, limit - 1);
+    const rest = entries.slice(limit - 1);
+    const selectedIndex = rest.findIndex(([key]) => key === selected);
+    if (selectedIndex >= 0) kept.push(...rest.splice(selectedIndex, 1));
+    const other = emptyTotals();
+    rest.forEach(([, totals]) => Object.keys(other).forEach(measure => {{
+        other[measure] += totals[measure] || 0;
+    }}));
+    const otherLabel = `Other (${{rest.length}})`;
+    kept.push([otherLabel, other]);
+    return {{ entries: kept, otherLabel }};
+}}
+
+// Largest-Triangle-Three-Buckets: indices of at most `threshold` points that keep
+// the visual shape of a series (first and last points always kept)
+function lttbIndices(values, threshold) {{
+    const length = values.length;
+    if (threshold >= length || threshold < 3) return Array.from({{ length }}, (_, i) => i);
+    const indices = [0];
+    const bucketSize = (length - 2) / (threshold - 2);
+    let previous = 0;
+    for (let bucket = 0; bucket < threshold - 2; bucket++) {{
+        // Average of the next bucket is the third triangle vertex
+        const nextStart = Math.floor((bucket + 1) * bucketSize) + 1;
+        const nextEnd = Math.min(Math.floor((bucket + 2) * bucketSize) + 1, length);
+        let averageX = 0;
+        let averageY = 0;
+        for (let i = nextStart; i < nextEnd; i++) {{
+            averageX += i;
+            averageY += values[i];
+        }}
+        averageX /= nextEnd - nextStart;
+        averageY /= nextEnd - nextStart;
+        
+        const start = Math.floor(bucket * bucketSize) + 1;
+        const end = Math.floor((bucket + 1) * bucketSize) + 1;
+        let maxArea = -1;
+        let chosen = start;
+        for (let i = start; i < end; i++) {{
+            const area = Math.abs(
+                (previous - averageX) * (values[i] - values[previous]) -
+                (previous - i) * (averageY - values[previous])
+            );
+            if (area > maxArea) {{
+                maxArea = area;
+                chosen = i;
+            }}
+        }}
+        indices.push(chosen);
+        previous = chosen;
+    }}
+    indices.push(length - 1);
+    return indices;
+}}
+
+// Line series on the month axis, downsampled with LTTB. Points keep their month as x,
+// so the category axis still spans every month and gaps stay proportional.
+function decimatedSeries(months, values) {{
+    return lttbIndices(values, chartDisplay.max_points).map(i => ({{ x: months[i], y: values[i] }}));
+}}
+
+// Per-month bars summed into buckets of consecutive months when there are more
+// months than max_points (labelled first–last month)
+function bucketedMonths(months, seriesList) {{
+    const size = Math.ceil(months.length / chartDisplay.max_points);
+    if (size <= 1) return {{ labels: months, series: seriesList.map(values => Array.from(values)) }};
+    const labels = [];
+    const series = seriesList.map(() => []);
+    for (let start = 0; start < months.length; start += size) {{
+        const end = Math.min(start + size, months.length);
+        labels.push(`${{months[start]}}–${{months[end - 1]}}`);
+        seriesList.forEach((values, s) => {{
+            let sum = 0;
+            for (let i = start; i < end; i++) sum += values[i];
+            series[s].push(sum);
+        }});
+    }}
+    return {{ labels, series }};
+}}
+
+// Update a chart, without animation when it holds many data points
+function renderChart(chart) {{
+    const points = chart.data.datasets.reduce((sum, dataset) => sum + dataset.data.length, 0);
+    chart.update(points > chartDisplay.animation_threshold ? 'none' : undefined);
+}}
+
 // ============================================
 // INVENTORY TABLE UPDATE
 // ============================================
+// Rows are rendered in VM list order by the generator; the table only mounts the
+// rows inside the scroll window (plus overscan) between two spacer rows, in the
+// display order computed by the engine (filtered, searched and sorted)
+const INVENTORY_OVERSCAN = 20;
+let inventoryRows = null;
+let inventoryOrder = new Uint32Array(0);
+let inventoryRowHeight = 45;
+let inventorySpacers = null;
+let inventoryWindow = '';
+let inventorySortKey = '';
+
+function renderInventoryWindow(force) {{
+    const tbody = document.getElementById('inventory-tbody');
+    const wrapper = tbody.closest('.table-wrapper');
+    const total = inventoryOrder.length;
+    const viewport = wrapper.clientHeight || 500;
+    const start = Math.min(total, Math.max(0, Math.floor(wrapper.scrollTop / inventoryRowHeight) - INVENTORY_OVERSCAN));
+    const end = Math.min(total, start + Math.ceil(viewport / inventoryRowHeight) + 2 * INVENTORY_OVERSCAN);
+    if (!force && inventoryWindow === start + ':' + end) return;
+    inventoryWindow = start + ':' + end;
+    
+    const [top, bottom] = inventorySpacers;
+    top.style.height = (start * inventoryRowHeight) + 'px';
+    bottom.style.height = ((total - end) * inventoryRowHeight) + 'px';
+    const fragment = document.createDocumentFragment();
+    fragment.appendChild(top);
+    for (let k = start; k < end; k++) fragment.appendChild(inventoryRows[inventoryOrder[k]]);
+    fragment.appendChild(bottom);
+    tbody.replaceChildren(fragment);
+    
+    // Measure the real row height once rows are laid out
+    const first = tbody.querySelector('.vm-row');
+    if (first && first.offsetHeight && first.offsetHeight !== inventoryRowHeight) {{
+        inventoryRowHeight = first.offsetHeight;
+        renderInventoryWindow(true);
+    }}
+}}
+
 function updateInventoryTable() {{
     const tbody = document.getElementById('inventory-tbody');
-    if (!tbody) return;
+    if (!tbody || !filterResult) return;
     
-    const rows = tbody.querySelectorAll('.vm-row');
+    if (!inventoryRows) {{
+        inventoryRows = Array.from(tbody.querySelectorAll('.vm-row'));
+        const columns = document.querySelectorAll('#inventory-table thead th').length;
+        inventorySpacers = [0, 1].map(() => {{
+            const spacer = document.createElement('tr');
+            spacer.className = 'inventory-spacer';
+            spacer.innerHTML = `<td colspan="${{columns}}"></td>`;
+            return spacer;
+        }});
+        let frame = null;
+        tbody.closest('.table-wrapper').addEventListener('scroll', () => {{
+            if (frame) return;
+            frame = requestAnimationFrame(() => {{
+                frame = null;
+                renderInventoryWindow(false);
+            }});
+        }});
+    }}
     
-    const clusterFilter = document.getElementById('filter-cluster').value;
-    const osFilter = document.getElementById('filter-os').value;
-    const statusFilter = document.getElementById('filter-status').value;
-    const complexityFilter = document.getElementById('filter-complexity').value;
-    const hostFilter = document.getElementById('filter-host').value;
-    
-    let visibleCount = 0;
-    
-    rows.forEach(row => {{
-        const cluster = row.dataset.cluster || '';
-        const osFamily = row.dataset.osfamily || '';
-        const status = row.dataset.status || '';
-        const complexity = row.dataset.complexity || '';
-        const host = row.dataset.host || '';
-        
-        let visible = true;
-        if (clusterFilter !== 'all' && cluster !== clusterFilter) visible = false;
-        if (osFilter !== 'all' && osFamily !== osFilter) visible = false;
-        if (statusFilter !== 'all' && status !== statusFilter) visible = false;
-        if (complexityFilter !== 'all' && complexity !== complexityFilter) visible = false;
-        if (hostFilter !== 'all' && host !== hostFilter) visible = false;
-        
-        row.style.display = visible ? '' : 'none';
-        if (visible) visibleCount++;
-    }});
+    // A new sort starts from the top
+    const sortKey = filterResult.sort ? filterResult.sort.field + (filterResult.sort.descending ? ':desc' : ':asc') : '';
+    if (sortKey !== inventorySortKey) tbody.closest('.table-wrapper').scrollTop = 0;
+    inventorySortKey = sortKey;
+    
+    inventoryOrder = filterResult.order;
+    renderInventoryWindow(true);
     
     // Update footer count
-    const totalCount = vmData.length;
     const filteredCountEl = document.getElementById('filtered-count');
     const totalCountEl = document.getElementById('total-count');
-    if (filteredCountEl) filteredCountEl.textContent = visibleCount;
-    if (totalCountEl) totalCountEl.textContent = totalCount;
+    if (filteredCountEl) filteredCountEl.textContent = filterResult.visibleCount;
+    if (totalCountEl) totalCountEl.textContent = filterResult.total;
 }}
 
 // ============================================
@@ -151,19 +605,21 @@ function updateInventoryTable() {{
 // ============================================
 function updateStatCards() {{
     // Calculate stats from filtered data
-    const totalVms = filteredData.length;
-    const runningVms = filteredData.filter(vm => vm.status === 'On').length;
-    const stoppedVms = filteredData.filter(vm => vm.status === 'Off').length;
-    
-    // Get unique clusters and hosts from filtered data
-    const uniqueClusters = new Set(filteredData.map(vm => vm.cluster));
-    const uniqueHosts = new Set(filteredData.map(vm => vm.host));
-    
-    // Calculate totals
-    const totalVcpus = filteredData.reduce((sum, vm) => sum + (vm.vcpus || 0), 0);
-    const totalMemory = filteredData.reduce((sum, vm) => sum + (vm.memory_gb || 0), 0);
-    const storageUsed = filteredData.reduce((sum, vm) => sum + (vm.used_gb || 0), 0);
-    const storageProvisioned = filteredData.reduce((sum, vm) => sum + (vm.storage_gb || 0), 0);
+    const totals = filteredTotals();
+    const statusCounts = groupCounts('status');
+    const totalVms = totals.count;
+    const runningVms = statusCounts['On'] || 0;
+    const stoppedVms = statusCounts['Off'] || 0;
+    
+    // Distinct clusters and hosts among the filtered VMs
+    const clusterCount = Object.keys(groupTotals('cluster')).length;
+    const hostCount = Object.keys(groupTotals('host')).length;
+    
+    // Totals
+    const totalVcpus = totals.vcpus;
+    const totalMemory = totals.memory_gb;
+    const storageUsed = totals.used_gb;
+    const storageProvisioned = totals.storage_gb;
     const storageEfficiency = storageProvisioned > 0 ? ((storageUsed / storageProvisioned) * 100).toFixed(1) : 0;
     
     // Update DOM elements
@@ -175,8 +631,8 @@ function updateStatCards() {{
     updateEl('stat-total-vms', totalVms);
     updateEl('stat-running-vms', runningVms);
     updateEl('stat-stopped-vms', stoppedVms);
-    updateEl('stat-clusters', uniqueClusters.size);
-    updateEl('stat-hosts', uniqueHosts.size);
+    updateEl('stat-clusters', clusterCount);
+    updateEl('stat-hosts', hostCount);
     updateEl('stat-vcpus', totalVcpus);
     updateEl('stat-memory', totalMemory);
     updateEl('stat-storage-used', Math.round(storageUsed));
@@ -222,6 +678,8 @@ function initCharts() {{
     initOverviewCharts();
     initSizingCharts();
     initMigrationCharts();
+    initMigrationGantt();
+    initHostDrainChart();
     initTrendsCharts();
     initForecastChart();
 }}
@@ -299,27 +757,29 @@ function initOverviewCharts() {{
         }});
     }}
     
+    // Cluster, host and guest OS charts are filled (top-N bucketed) by updateOverviewCharts
+    
     // Cluster Resources Bar Chart
     const clusterCtx = document.getElementById('chart-cluster-resources');
     if (clusterCtx) {{
         charts.clusterResources = new Chart(clusterCtx, {{
             type: 'bar',
             data: {{
-                labels: overviewChartData.cluster?.labels || [],
+                labels: [],
                 datasets: [
                     {{
                         label: 'VMs',
-                        data: overviewChartData.cluster?.vms || [],
+                        data: [],
                         backgroundColor: chartColors.blue
                     }},
                     {{
                         label: 'vCPUs (÷10)',
-                        data: (overviewChartData.cluster?.vcpus || []).map(v => v / 10),
+                        data: [],
                         backgroundColor: chartColors.green
                     }},
                     {{
                         label: 'Memory GB (÷100)',
-                        data: (overviewChartData.cluster?.memory || []).map(v => v / 100),
+                        data: [],
                         backgroundColor: chartColors.orange
                     }}
                 ]
@@ -338,21 +798,21 @@ function initOverviewCharts() {{
         charts.hostResources = new Chart(hostCtx, {{
             type: 'bar',
             data: {{
-                labels: overviewChartData.host?.labels || [],
+                labels: [],
                 datasets: [
                     {{
                         label: 'VMs',
-                        data: overviewChartData.host?.vms || [],
+                        data: [],
                         backgroundColor: chartColors.blue
                     }},
                     {{
                         label: 'vCPUs (÷10)',
-                        data: (overviewChartData.host?.vcpus || []).map(v => v / 10),
+                        data: [],
                         backgroundColor: chartColors.green
                     }},
                     {{
                         label: 'Memory GB (÷10)',
-                        data: (overviewChartData.host?.memory || []).map(v => v / 10),
+                        data: [],
                         backgroundColor: chartColors.orange
                     }}
                 ]
@@ -366,22 +826,50 @@ function initOverviewCharts() {{
         }});
     }}
     
+    // Environment Comparison Bar Chart (multi-environment dashboards)
+    const environmentsCtx = document.getElementById('chart-environments');
+    if (environmentsCtx) {{
+        charts.environments = new Chart(environmentsCtx, {{
+            type: 'bar',
+            data: {{
+                labels: overviewChartData.environments?.labels || [],
+                datasets: [
+                    {{
+                        label: 'VMs',
+                        data: overviewChartData.environments?.vms || [],
+                        backgroundColor: chartColors.red
+                    }},
+                    {{
+                        label: 'vCPUs (÷10)',
+                        data: (overviewChartData.environments?.vcpus || []).map(v => v / 10),
+                        backgroundColor: chartColors.green
+                    }},
+                    {{
+                        label: 'Memory GB (÷100)',
+                        data: (overviewChartData.environments?.memory || []).map(v => v / 100),
+                        backgroundColor: chartColors.orange
+                    }}
+                ]
+            }},
+            options: {{
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {{ y: {{ beginAtZero: true }} }}
+            }}
+        }});
+    }}
+    
     // Guest OS Bar Chart
     const guestOsCtx = document.getElementById('chart-guest-os');
     if (guestOsCtx) {{
-        const labels = overviewChartData.guest_os?.labels || [];
-        const colors = labels.map(label => 
-            label.toLowerCase().includes('windows') ? chartColors.blue : chartColors.red
-        );
-        
         charts.guestOs = new Chart(guestOsCtx, {{
             type: 'bar',
             data: {{
-                labels: labels,
+                labels: [],
                 datasets: [{{
                     label: 'VM Count',
-                    data: overviewChartData.guest_os?.values || [],
-                    backgroundColor: colors
+                    data: [],
+                    backgroundColor: []
                 }}]
             }},
             options: {{
@@ -419,6 +907,34 @@ function initSizingCharts() {{
         }});
     }}
     
+    // Storage by Domain Bar Chart (provisioned vs used)
+    const storageDomainsCtx = document.getElementById('chart-storage-domains');
+    if (storageDomainsCtx) {{
+        charts.storageDomains = new Chart(storageDomainsCtx, {{
+            type: 'bar',
+            data: {{
+                labels: sizingChartData.storage_domains?.labels || [],
+                datasets: [
+                    {{
+                        label: 'Provisioned (GB)',
+                        data: sizingChartData.storage_domains?.provisioned || [],
+                        backgroundColor: chartColors.purple
+                    }},
+                    {{
+                        label: 'Used (GB)',
+                        data: sizingChartData.storage_domains?.used || [],
+                        backgroundColor: chartColors.orange
+                    }}
+                ]
+            }},
+            options: {{
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {{ y: {{ beginAtZero: true }} }}
+            }}
+        }});
+    }}
+    
     // Resources by Size Bar Chart
     const resourcesSizeCtx = document.getElementById('chart-resources-by-size');
     if (resourcesSizeCtx) {{
@@ -509,6 +1025,100 @@ function initMigrationCharts() {{
     }}
 }}
 
+// Simulated migration schedule: one floating bar per wave (hours from the start)
+function initMigrationGantt() {{
+    const schedule = migrationChartData.schedule;
+    const ganttCtx = document.getElementById('chart-migration-gantt');
+    if (!schedule || !ganttCtx) return;
+    charts.migrationGantt = new Chart(ganttCtx, {{
+        type: 'bar',
+        data: {{
+            labels: schedule.waves.map(wave => wave.label),
+            datasets: [
+                {{
+                    label: 'Hours',
+                    data: schedule.waves.map(wave => [wave.start, wave.finish]),
+                    backgroundColor: chartColors.blue
+                }}
+            ]
+        }},
+        options: {{
+            indexAxis: 'y',
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {{ legend: {{ display: false }} }},
+            scales: {{ x: {{ beginAtZero: true, title: {{ display: true, text: 'Hours from start' }} }} }}
+        }}
+    }});
+    renderMigrationVmGantt();
+}}
+
+function renderMigrationVmGantt() {{
+    const schedule = migrationChartData.schedule;
+    const ctx = document.getElementById('chart-migration-vm-gantt');
+    const select = document.getElementById('migration-gantt-wave');
+    if (!schedule || !ctx || !select) return;
+    const bars = schedule.vms[select.value];
+    if (!bars) return;
+    document.getElementById('migration-gantt-note').textContent = bars.names.length < bars.total
+        ? `(last ${{bars.names.length}} of ${{bars.total.toLocaleString()}} VMs to finish)`
+        : `(${{bars.total.toLocaleString()}} VMs)`;
+    // One row per VM: grow the chart rather than squeezing the bars
+    document.getElementById('migration-vm-gantt-container').style.height = `${{Math.max(300, bars.names.length * 14)}}px`;
+    
+    if (charts.migrationVmGantt) charts.migrationVmGantt.destroy();
+    charts.migrationVmGantt = new Chart(ctx, {{
+        type: 'bar',
+        data: {{
+            labels: bars.names,
+            datasets: [
+                {{
+                    label: 'Hours',
+                    data: bars.names.map((_, i) => [bars.start[i], bars.finish[i]]),
+                    backgroundColor: chartColors.teal
+                }}
+            ]
+        }},
+        options: {{
+            indexAxis: 'y',
+            responsive: true,
+            maintainAspectRatio: false,
+            animation: false,
+            plugins: {{ legend: {{ display: false }} }},
+            scales: {{
+                x: {{ title: {{ display: true, text: 'Hours from start' }} }},
+                y: {{ ticks: {{ autoSkip: false, font: {{ size: 10 }} }} }}
+            }}
+        }}
+    }});
+}}
+
+// Host drain plan: share of hosts, vCPUs and memory freed over time
+function initHostDrainChart() {{
+    const drain = migrationChartData.host_drain;
+    const drainCtx = document.getElementById('chart-host-drain');
+    if (!drain || !drainCtx) return;
+    const series = (values) => values.map((value, i) => ({{ x: drain.hours[i], y: value }}));
+    charts.hostDrain = new Chart(drainCtx, {{
+        type: 'line',
+        data: {{
+            datasets: [
+                {{ label: 'Hosts freed', data: series(drain.hosts), borderColor: chartColors.red, pointRadius: 0 }},
+                {{ label: 'vCPUs freed', data: series(drain.vcpus), borderColor: chartColors.blue, pointRadius: 0 }},
+                {{ label: 'Memory freed', data: series(drain.memory), borderColor: chartColors.green, pointRadius: 0 }}
+            ]
+        }},
+        options: {{
+            responsive: true,
+            maintainAspectRatio: false,
+            scales: {{
+                x: {{ type: 'linear', beginAtZero: true, title: {{ display: true, text: 'Hours from start' }} }},
+                y: {{ beginAtZero: true, max: 100, title: {{ display: true, text: '% freed' }} }}
+            }}
+        }}
+    }});
+}}
+
 function initTrendsCharts() {{
     // VM Growth Line Chart
     const vmGrowthCtx = document.getElementById('chart-vm-growth');
@@ -628,6 +1238,83 @@ function initTrendsCharts() {{
             }}
         }});
     }}
+    
+    // Snapshot History (only present when a history store is configured)
+    const history = trendsChartData.history?.total;
+    const historyCapacityCtx = document.getElementById('chart-history-capacity');
+    if (historyCapacityCtx && history) {{
+        charts.historyCapacity = new Chart(historyCapacityCtx, {{
+            type: 'line',
+            data: {{
+                labels: history.dates,
+                datasets: [
+                    {{
+                        label: 'vCPUs',
+                        data: history.vcpus,
+                        borderColor: chartColors.green,
+                        backgroundColor: 'transparent',
+                        yAxisID: 'y'
+                    }},
+                    {{
+                        label: 'Memory (GB)',
+                        data: history.memory,
+                        borderColor: chartColors.blue,
+                        backgroundColor: 'transparent',
+                        yAxisID: 'y1'
+                    }},
+                    {{
+                        label: 'Used Storage (GB)',
+                        data: history.used_storage,
+                        borderColor: chartColors.purple,
+                        backgroundColor: 'transparent',
+                        yAxisID: 'y1'
+                    }}
+                ]
+            }},
+            options: {{
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {{
+                    y: {{
+                        type: 'linear',
+                        position: 'left',
+                        beginAtZero: true,
+                        title: {{ display: true, text: 'vCPUs' }}
+                    }},
+                    y1: {{
+                        type: 'linear',
+                        position: 'right',
+                        beginAtZero: true,
+                        title: {{ display: true, text: 'GB' }},
+                        grid: {{ drawOnChartArea: false }}
+                    }}
+                }}
+            }}
+        }});
+    }}
+    
+    const historyChurnCtx = document.getElementById('chart-history-churn');
+    if (historyChurnCtx && history) {{
+        charts.historyChurn = new Chart(historyChurnCtx, {{
+            type: 'bar',
+            data: {{
+                labels: history.dates,
+                datasets: [
+                    {{ label: 'Added', data: history.added || [], backgroundColor: chartColors.green }},
+                    {{ label: 'Removed', data: history.removed || [], backgroundColor: chartColors.red }},
+                    {{ label: 'Modified', data: history.modified || [], backgroundColor: chartColors.orange }}
+                ]
+            }},
+            options: {{
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {{
+                    x: {{ stacked: true }},
+                    y: {{ stacked: true, beginAtZero: true }}
+                }}
+            }}
+        }});
+    }}
 }}
 
 function initForecastChart() {{
@@ -668,6 +1355,44 @@ function initForecastChart() {{
             }}
         }});
     }}
+
+    // Monte Carlo bands (forecast.py): P10-P90 area with the P50 line per resource
+    const bands = forecastBaseData.bands;
+    const bandsCtx = document.getElementById('chart-forecast-bands');
+    if (bands && bandsCtx) {{
+        const current = forecastBaseData.current || {{}};
+        const datasets = [];
+        [
+            ['VMs', 'vms', 1, chartColors.red],
+            ['vCPUs (÷10)', 'vcpus', 10, chartColors.green],
+            ['Memory GB (÷100)', 'memory', 100, chartColors.blue]
+        ].forEach(([label, metric, scale, color]) => {{
+            const series = index => [current[metric] || 0, ...bands.total[metric].map(band => band[index])]
+                .map(value => value / scale);
+            datasets.push(
+                {{ label: `${{label}} P10`, data: series(0), borderColor: color + '40', borderWidth: 1,
+                   pointRadius: 0, backgroundColor: 'transparent', fill: false, tension: 0.3 }},
+                {{ label: `${{label}} P90`, data: series(2), borderColor: color + '40', borderWidth: 1,
+                   pointRadius: 0, backgroundColor: color + '26', fill: '-1', tension: 0.3 }},
+                {{ label: `${{label}} P50`, data: series(1), borderColor: color, borderDash: [6, 4],
+                   backgroundColor: 'transparent', fill: false, tension: 0.3 }}
+            );
+        }});
+        charts.forecastBands = new Chart(bandsCtx, {{
+            type: 'line',
+            data: {{ labels: ['2025', ...bands.years.map(String)], datasets: datasets }},
+            options: {{
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {{
+                    legend: {{ labels: {{ filter: item => item.text.endsWith('P50') }} }}
+                }},
+                scales: {{ y: {{ beginAtZero: true }} }}
+            }}
+        }});
+    }}
+
+    renderSweepHeatmaps();
     
     // Initialize with default forecast
     applyForecast();
@@ -682,6 +1407,19 @@ function toggleCustomGrowth() {{
     customInput.disabled = scenario !== 'custom';
 }}
 
+// Projection of one cluster after `years` years with its fitted growth models
+// (forecast.fit_growth_models; the estate-wide models for clusters without a fit)
+function fittedProjection(models, cluster, years) {{
+    const fits = models.clusters[cluster.name] || models.total;
+    const factor = metric => fits[metric].growth[years - 1];
+    return {{
+        vms: Math.ceil(cluster.vms * factor('vms')),
+        vcpus: Math.ceil(cluster.vcpus * factor('vcpus')),
+        memory: Math.ceil(cluster.memory * factor('memory')),
+        growth: Math.max(factor('vcpus'), factor('memory'))
+    }};
+}}
+
 function applyForecast() {{
     const scenarioSelect = document.getElementById('growth-scenario');
     const customInput = document.getElementById('custom-growth');
@@ -694,109 +1432,306 @@ function applyForecast() {{
     
     const nodeSpec = nodeSpecSelect.value;
     const nodeSpecs = forecastBaseData.node_specs || {{
-        small: {{ vcpus: 64, memory: 512 }},
-        medium: {{ vcpus: 128, memory: 1024 }},
-        large: {{ vcpus: 256, memory: 2048 }}
+        small: {{ label: 'Small', vcpus: 64, memory: 512 }},
+        medium: {{ label: 'Medium', vcpus: 128, memory: 1024 }},
+        large: {{ label: 'Large', vcpus: 256, memory: 2048 }}
     }};
     
-    const currentVms = forecastBaseData.current?.vms || 0;
-    const currentVcpus = forecastBaseData.current?.vcpus || 0;
-    const currentMemory = forecastBaseData.current?.memory || 0;
-    
-    // Calculate projections
+    const scenario = forecastScenario(scenarioSelect.value === 'fitted', growthRate, nodeSpec, nodeSpecs);
+    const totals = scenario.totals;
     const years = [2025, 2026, 2027, 2028];
-    const projections = {{}};
-    
-    years.forEach((year, i) => {{
-        const factor = Math.pow(1 + growthRate / 100, i);
-        projections[year] = {{
-            vms: Math.ceil(currentVms * factor),
-            vcpus: Math.ceil(currentVcpus * factor),
-            memory: Math.ceil(currentMemory * factor)
-        }};
-    }});
     
     // Update year cards
-    years.forEach(year => {{
+    years.forEach((year, i) => {{
         const vmsEl = document.getElementById(`year-${{year}}-vms`);
         const vcpusEl = document.getElementById(`year-${{year}}-vcpus`);
         const memoryEl = document.getElementById(`year-${{year}}-memory`);
         
-        if (vmsEl) vmsEl.textContent = projections[year].vms.toLocaleString();
-        if (vcpusEl) vcpusEl.textContent = projections[year].vcpus.toLocaleString();
-        if (memoryEl) memoryEl.textContent = projections[year].memory.toLocaleString();
+        if (vmsEl) vmsEl.textContent = totals.vms[i].toLocaleString();
+        if (vcpusEl) vcpusEl.textContent = totals.vcpus[i].toLocaleString();
+        if (memoryEl) memoryEl.textContent = totals.memory[i].toLocaleString();
     }});
     
     // Update assumptions table
-    const growthText = `+${{growthRate}}% annually`;
+    const currentVms = totals.vms[0];
+    const firstYearGrowth = currentVms ? Math.round((totals.vms[1] / currentVms - 1) * 100) : 0;
+    const growthText = scenario.fitted
+        ? `Fitted per cluster (${{firstYearGrowth >= 0 ? '+' : ''}}${{firstYearGrowth}}% in 2026)`
+        : `+${{growthRate}}% annually`;
     const assumptionGrowth = document.getElementById('assumption-growth');
     if (assumptionGrowth) assumptionGrowth.textContent = growthText;
     
     // Update forecast chart
     if (charts.forecast) {{
-        charts.forecast.data.datasets[0].data = years.map(y => projections[y].vms);
-        charts.forecast.data.datasets[1].data = years.map(y => projections[y].vcpus / 10);
-        charts.forecast.data.datasets[2].data = years.map(y => projections[y].memory / 100);
+        charts.forecast.data.datasets[0].data = totals.vms.slice();
+        charts.forecast.data.datasets[1].data = totals.vcpus.map(value => value / 10);
+        charts.forecast.data.datasets[2].data = totals.memory.map(value => value / 100);
         charts.forecast.update();
     }}
     
-    // Update infrastructure table
-    updateInfrastructureTable(projections[2028], nodeSpec, nodeSpecs);
+    updateInfrastructureTable(scenario.clusters, nodeSpec, nodeSpecs);
+    updateForecastBands(nodeSpec);
 }}
 
-function updateInfrastructureTable(projection2028, nodeSpec, nodeSpecs) {{
-    const spec = nodeSpecs[nodeSpec];
-    const specNames = {{
-        small: 'Small (64 vCPU / 512 GB)',
-        medium: 'Medium (128 vCPU / 1024 GB)',
-        large: 'Large (256 vCPU / 2048 GB)'
-    }};
+// Totals per year (today first) and each cluster's 2028 values and recommended
+// nodes for one scenario: rows of the precomputed tables (forecast.build_forecast_lookup)
+// for the fitted scenario and the rates they cover, computed here otherwise
+function forecastScenario(fitted, growthRate, nodeSpec, nodeSpecs) {{
+    const lookup = forecastBaseData.lookup;
+    const current = forecastBaseData.current || {{}};
+    const measures = ['vms', 'vcpus', 'memory'];
+    const withCurrent = rows => Object.fromEntries(measures.map(measure => [measure, [current[measure] || 0, ...rows[measure]]]));
+    fitted = Boolean(fitted && forecastBaseData.growth_models);
     
+    if (lookup && fitted && lookup.fitted) {{
+        const table = lookup.fitted;
+        return {{
+            fitted: true,
+            totals: withCurrent(table.totals),
+            clusters: {{ ...table.projections, nodes: table.nodes[nodeSpec] }}
+        }};
+    }}
+    const index = lookup && !fitted ? growthRate - lookup.rates[0] : -1;
+    if (index >= 0 && index < lookup.rates.length) {{
+        const row = table => Object.fromEntries(measures.map(measure => [measure, table[measure][index]]));
+        return {{
+            fitted: false,
+            totals: withCurrent(row(lookup.totals)),
+            clusters: {{ ...row(lookup.projections), nodes: lookup.nodes[nodeSpec][index] }}
+        }};
+    }}
+    return computeForecastScenario(fitted, growthRate, nodeSpec, nodeSpecs);
+}}
+
+function computeForecastScenario(fitted, growthRate, nodeSpec, nodeSpecs) {{
+    const models = forecastBaseData.growth_models;
+    const current = forecastBaseData.current || {{}};
     const clusters = forecastBaseData.clusters || [];
-    const totalCurrent = forecastBaseData.current || {{}};
+    const spec = nodeSpecs[nodeSpec];
+    const placement = forecastBaseData.placement;
+    const totals = {{ vms: [], vcpus: [], memory: [] }};
+    const projections = {{ vms: [], vcpus: [], memory: [], nodes: [] }};
     
-    let totalNodes = 0;
-    let total2028Vms = 0;
-    let total2028Vcpus = 0;
-    let total2028Memory = 0;
+    // Fitted: the sum of the per-cluster projections
+    for (let i = 0; i <= 3; i++) {{
+        if (fitted && i > 0) {{
+            const year = {{ vms: 0, vcpus: 0, memory: 0 }};
+            clusters.forEach(cluster => {{
+                const projection = fittedProjection(models, cluster, i);
+                year.vms += projection.vms;
+                year.vcpus += projection.vcpus;
+                year.memory += projection.memory;
+            }});
+            Object.keys(year).forEach(measure => totals[measure].push(year[measure]));
+            continue;
+        }}
+        const factor = fitted ? 1 : Math.pow(1 + growthRate / 100, i);
+        Object.keys(totals).forEach(measure => totals[measure].push(Math.ceil((current[measure] || 0) * factor)));
+    }}
     
     clusters.forEach(cluster => {{
-        const ratio = cluster.vms / totalCurrent.vms;
-        const vms2028 = Math.ceil(projection2028.vms * ratio);
-        const vcpus2028 = Math.ceil(projection2028.vcpus * ratio);
-        const memory2028 = Math.ceil(projection2028.memory * ratio);
+        const factor = Math.pow(1 + growthRate / 100, 3);
+        const projection = fitted ? fittedProjection(models, cluster, 3) : {{
+            vms: Math.ceil(cluster.vms * factor),
+            vcpus: Math.ceil(cluster.vcpus * factor),
+            memory: Math.ceil(cluster.memory * factor),
+            growth: factor
+        }};
         
-        // Calculate nodes needed (with 1.2x overhead, minimum 3 for HA)
-        const vcpuNodes = Math.ceil((vcpus2028 * 1.2) / spec.vcpus);
-        const memoryNodes = Math.ceil((memory2028 * 1.2) / spec.memory);
-        const nodes = Math.max(3, Math.max(vcpuNodes, memoryNodes));
+        // Nodes from the bin-packing of today's VMs (placement.py), scaled with the
+        // projected growth, plus HA spares; without placement results, projected
+        // demand with 1.2x overhead over node capacity (minimum 3 for HA)
+        const packing = placement?.clusters?.[cluster.name]?.[nodeSpec];
+        let nodes;
+        if (packing) {{
+            const packed = Math.ceil(packing.packed_nodes * projection.growth);
+            nodes = packed ? Math.max(placement.min_nodes, packed + placement.ha_spare_nodes) : 0;
+        }} else {{
+            const vcpuNodes = Math.ceil((projection.vcpus * 1.2) / spec.vcpus);
+            const memoryNodes = Math.ceil((projection.memory * 1.2) / spec.memory);
+            nodes = Math.max(3, Math.max(vcpuNodes, memoryNodes));
+        }}
+        ['vms', 'vcpus', 'memory'].forEach(measure => projections[measure].push(projection[measure]));
+        projections.nodes.push(nodes);
+    }});
+    
+    return {{ fitted: fitted, totals: totals, clusters: projections }};
+}}
+
+function updateForecastBands(nodeSpec) {{
+    // Node bands of the selected spec in the last simulated year (the growth bands are static)
+    const bands = forecastBaseData.bands;
+    if (!bands) return;
+    document.querySelectorAll('#forecast-bands-table tr[data-band-cluster]').forEach(row => {{
+        const entry = row.dataset.bandCluster ? bands.clusters[row.dataset.bandCluster] : bands.total;
+        const band = entry?.nodes?.[nodeSpec]?.at(-1);
+        row.querySelector('.band-nodes').innerHTML = band
+            ? `<strong>${{band[1]}}</strong><span class="band-range">${{band[0]}} – ${{band[2]}}</span>`
+            : '—';
+    }});
+}}
+
+// Capacity sensitivity heatmaps (scenario_sweep.py): total nodes over two swept
+// parameters, the others fixed by the selects above the heatmaps
+function renderSweepHeatmaps() {{
+    const sweep = forecastBaseData.sweep;
+    if (!sweep) return;
+    const axes = sweep.axes;
+    // Row-major strides of the flat result array
+    const strides = [];
+    axes.reduceRight((stride, axis, index) => (strides[index] = stride) * axis.values.length, 1);
+    const fixed = axes.map(axis => parseInt(document.getElementById(`sweep-fixed-${{axis.name}}`).value));
+    const baselineIndex = axes.map(axis => axis.values.indexOf(axis.baseline));
+    const at = indices => sweep.nodes[indices.reduce((offset, index, axis) => offset + index * strides[axis], 0)];
+    const baseline = at(baselineIndex);
+    const nodeSpecs = forecastBaseData.node_specs || {{}};
+    const format = (axis, value) => axis.name === 'node_spec'
+        ? (nodeSpecs[value]?.label || value)
+        : ['overhead', 'cpu_overcommit', 'memory_overcommit'].includes(axis.name) ? `${{value}}x` : String(value);
+
+    document.querySelectorAll('.sweep-heatmap').forEach((container, panel) => {{
+        const x = axes.findIndex(axis => axis.name === document.getElementById(`sweep-x-${{panel}}`).value);
+        const y = axes.findIndex(axis => axis.name === document.getElementById(`sweep-y-${{panel}}`).value);
+        if (x === y) {{
+            container.innerHTML = '<div class="assumptions-note">Choose two different parameters.</div>';
+            return;
+        }}
+        const indices = fixed.slice();
+        const rows = axes[y].values.map((_, row) => axes[x].values.map((_, column) => {{
+            indices[y] = row;
+            indices[x] = column;
+            return at(indices);
+        }}));
+        const values = rows.flat();
+        const low = Math.min(...values);
+        const span = Math.max(...values) - low || 1;
+        // The baseline cell: today's rules on the heatmap axes and the fixed parameters
+        const isBaseline = (row, column) => axes.every((_, axis) =>
+            (axis === y ? row : axis === x ? column : fixed[axis]) === baselineIndex[axis]);
+
+        const header = axes[x].values.map(value => `<th>${{format(axes[x], value)}}</th>`).join('');
+        const body = rows.map((cells, row) => `<tr><th>${{format(axes[y], axes[y].values[row])}}</th>` +
+            cells.map((nodes, column) => {{
+                const share = (nodes - low) / span;
+                const change = baseline ? Math.round((nodes / baseline - 1) * 100) : 0;
+                return `<td class="${{isBaseline(row, column) ? 'sweep-baseline' : ''}}" ` +
+                    `style="background: rgba(21, 101, 192, ${{(0.08 + 0.82 * share).toFixed(2)}}); ` +
+                    `color: ${{share > 0.55 ? 'white' : '#333'}}" ` +
+                    `title="${{nodes.toLocaleString()}} nodes (${{change >= 0 ? '+' : ''}}${{change}}% vs today's rules)">` +
+                    `${{nodes.toLocaleString()}}</td>`;
+            }}).join('') + '</tr>').join('');
+        container.innerHTML = `<table><thead><tr><th>${{axes[y].label}} / ${{axes[x].label}}</th>${{header}}</tr></thead>` +
+            `<tbody>${{body}}</tbody></table>`;
+    }});
+}}
+
+// Cells of the infrastructure and environment tables, looked up once
+let forecastTableCells = null;
+
+function getForecastTableCells() {{
+    if (forecastTableCells) return forecastTableCells;
+    const rowIndex = new Map((forecastBaseData.clusters || []).map((cluster, index) => [cluster.name, index]));
+    const clusterRows = [];
+    document.querySelectorAll('#infrastructure-tbody tr[data-cluster]').forEach(row => {{
+        const index = rowIndex.get(row.dataset.cluster);
+        if (index === undefined) return;
+        clusterRows[index] = {{
+            vms: row.querySelector('.infra-2028-vms'),
+            vcpus: row.querySelector('.infra-2028-vcpus'),
+            memory: row.querySelector('.infra-2028-memory'),
+            spec: row.querySelector('.infra-node-spec'),
+            nodes: row.querySelector('.infra-nodes')
+        }};
+    }});
+    const environmentRows = Array.from(document.querySelectorAll('#environment-forecast-tbody tr'), row => ({{
+        environment: row.dataset.environment,
+        vms: row.querySelector('.env-2028-vms'),
+        vcpus: row.querySelector('.env-2028-vcpus'),
+        memory: row.querySelector('.env-2028-memory'),
+        nodes: row.querySelector('.env-nodes')
+    }}));
+    forecastTableCells = {{
+        clusters: clusterRows,
+        environments: environmentRows,
+        totals: {{
+            vms: document.getElementById('infra-total-2028-vms'),
+            vcpus: document.getElementById('infra-total-2028-vcpus'),
+            memory: document.getElementById('infra-total-2028-memory'),
+            nodes: document.getElementById('infra-total-nodes')
+        }},
+        nodeSpec: null
+    }};
+    return forecastTableCells;
+}}
+
+function updateInfrastructureTable(projections, nodeSpec, nodeSpecs) {{
+    // projections: {{vms, vcpus, memory, nodes}} arrays of 2028 values in
+    // forecastBaseData.clusters order
+    const cells = getForecastTableCells();
+    const clusters = forecastBaseData.clusters || [];
+    const placement = forecastBaseData.placement;
+    
+    // The node spec column and the packing tooltips only change with the spec
+    const specChanged = cells.nodeSpec !== nodeSpec;
+    const spec = nodeSpecs[nodeSpec];
+    const specName = `${{spec.label}} (${{spec.vcpus}} vCPU / ${{spec.memory}} GB)`;
+    cells.nodeSpec = nodeSpec;
+    
+    const environmentTotals = {{}};
+    const totals = {{ vms: 0, vcpus: 0, memory: 0, nodes: 0 }};
+    
+    clusters.forEach((cluster, index) => {{
+        const vms2028 = projections.vms[index];
+        const vcpus2028 = projections.vcpus[index];
+        const memory2028 = projections.memory[index];
+        const nodes = projections.nodes[index];
         
-        // Update row
-        const row = document.querySelector(`tr[data-cluster="${{cluster.name}}"]`);
+        const row = cells.clusters[index];
         if (row) {{
-            row.querySelector('.infra-2028-vms').textContent = vms2028.toLocaleString();
-            row.querySelector('.infra-2028-vcpus').textContent = vcpus2028.toLocaleString();
-            row.querySelector('.infra-2028-memory').textContent = memory2028.toLocaleString();
-            row.querySelector('.infra-node-spec').textContent = specNames[nodeSpec] || 'Medium';
-            row.querySelector('.infra-nodes').textContent = nodes;
+            row.vms.textContent = vms2028.toLocaleString();
+            row.vcpus.textContent = vcpus2028.toLocaleString();
+            row.memory.textContent = memory2028.toLocaleString();
+            row.nodes.textContent = nodes;
+            if (specChanged) {{
+                const packing = placement?.clusters?.[cluster.name]?.[nodeSpec];
+                row.spec.textContent = specName;
+                row.nodes.title = packing
+                    ? `Today: ${{packing.packed_nodes}} packed nodes (${{packing.heuristic}}), ` +
+                      `${{packing.vcpu_utilization}}% vCPU / ${{packing.memory_utilization}}% memory used, ` +
+                      `${{packing.bottleneck}}-bound` +
+                      (packing.oversized ? `, ${{packing.oversized}} VMs larger than a node` : '')
+                    : '';
+            }}
         }}
         
-        totalNodes += nodes;
-        total2028Vms += vms2028;
-        total2028Vcpus += vcpus2028;
-        total2028Memory += memory2028;
+        if (cluster.environment) {{
+            const env = environmentTotals[cluster.environment] ||= {{ vms: 0, vcpus: 0, memory: 0, nodes: 0 }};
+            env.vms += vms2028;
+            env.vcpus += vcpus2028;
+            env.memory += memory2028;
+            env.nodes += nodes;
+        }}
+        
+        totals.vms += vms2028;
+        totals.vcpus += vcpus2028;
+        totals.memory += memory2028;
+        totals.nodes += nodes;
     }});
     
     // Update totals
-    const totalVmsEl = document.getElementById('infra-total-2028-vms');
-    const totalVcpusEl = document.getElementById('infra-total-2028-vcpus');
-    const totalMemoryEl = document.getElementById('infra-total-2028-memory');
-    const totalNodesEl = document.getElementById('infra-total-nodes');
-    
-    if (totalVmsEl) totalVmsEl.textContent = total2028Vms.toLocaleString();
-    if (totalVcpusEl) totalVcpusEl.textContent = total2028Vcpus.toLocaleString();
-    if (totalMemoryEl) totalMemoryEl.textContent = total2028Memory.toLocaleString();
-    if (totalNodesEl) totalNodesEl.textContent = totalNodes;
+    if (cells.totals.vms) cells.totals.vms.textContent = totals.vms.toLocaleString();
+    if (cells.totals.vcpus) cells.totals.vcpus.textContent = totals.vcpus.toLocaleString();
+    if (cells.totals.memory) cells.totals.memory.textContent = totals.memory.toLocaleString();
+    if (cells.totals.nodes) cells.totals.nodes.textContent = totals.nodes;
+    
+    // Per-environment totals (each environment's clusters are sized separately)
+    cells.environments.forEach(row => {{
+        const env = environmentTotals[row.environment] || {{ vms: 0, vcpus: 0, memory: 0, nodes: 0 }};
+        row.vms.textContent = env.vms.toLocaleString();
+        row.vcpus.textContent = env.vcpus.toLocaleString();
+        row.memory.textContent = env.memory.toLocaleString();
+        row.nodes.textContent = env.nodes;
+    }});
 }}
 
 // ============================================
@@ -807,92 +1742,88 @@ function updateAllCharts() {{
     updateSizingCharts();
     updateMigrationCharts();
     updateTrendsCharts();
-}}
-
-// Helper function to count by property
-function countBy(data, prop) {{
-    return data.reduce((acc, item) => {{
-        const key = item[prop] || 'Unknown';
-        acc[key] = (acc[key] || 0) + 1;
-        return acc;
-    }}, {{}});
-}}
-
-// Helper function to sum by property
-function sumBy(data, groupProp, sumProps) {{
-    return data.reduce((acc, item) => {{
-        const key = item[groupProp] || 'Unknown';
-        if (!acc[key]) {{
-            acc[key] = {{}};
-            sumProps.forEach(p => acc[key][p] = 0);
-            acc[key].count = 0;
-        }}
-        sumProps.forEach(p => acc[key][p] += (item[p] || 0));
-        acc[key].count += 1;
-        return acc;
-    }}, {{}});
+    updateHistoryCharts();
 }}
 
 function updateOverviewCharts() {{
     // OS Family Pie Chart
     if (charts.osFamily) {{
-        const osFamilyCounts = countBy(filteredData, 'os_family');
+        const osFamilyCounts = chartCounts('os_family');
         charts.osFamily.data.labels = Object.keys(osFamilyCounts);
         charts.osFamily.data.datasets[0].data = Object.values(osFamilyCounts);
-        charts.osFamily.update();
+        highlightSelection(charts.osFamily, 'os_family');
+        renderChart(charts.osFamily);
     }}
     
     // Size Categories Bar Chart
     if (charts.sizeCategories) {{
         const sizeOrder = ['Small', 'Medium', 'Large', 'X-Large'];
-        const sizeCounts = countBy(filteredData, 'size_category');
+        const sizeCounts = chartCounts('size_category');
         charts.sizeCategories.data.labels = sizeOrder;
         charts.sizeCategories.data.datasets[0].data = sizeOrder.map(s => sizeCounts[s] || 0);
-        charts.sizeCategories.update();
+        highlightSelection(charts.sizeCategories, 'size_category');
+        renderChart(charts.sizeCategories);
     }}
     
     // Complexity Pie Chart
     if (charts.complexity) {{
         const complexityOrder = ['Low', 'Medium', 'High'];
-        const complexityCounts = countBy(filteredData, 'complexity');
+        const complexityCounts = chartCounts('complexity');
         charts.complexity.data.labels = complexityOrder;
         charts.complexity.data.datasets[0].data = complexityOrder.map(c => complexityCounts[c] || 0);
-        charts.complexity.update();
+        highlightSelection(charts.complexity, 'complexity');
+        renderChart(charts.complexity);
     }}
     
     // Cluster Resources Bar Chart
     if (charts.clusterResources) {{
-        const clusterData = sumBy(filteredData, 'cluster', ['vcpus', 'memory_gb']);
-        const clusterNames = Object.keys(clusterData);
-        charts.clusterResources.data.labels = clusterNames;
-        charts.clusterResources.data.datasets[0].data = clusterNames.map(c => clusterData[c].count);
-        charts.clusterResources.data.datasets[1].data = clusterNames.map(c => clusterData[c].vcpus / 10);
-        charts.clusterResources.data.datasets[2].data = clusterNames.map(c => clusterData[c].memory_gb / 100);
-        charts.clusterResources.update();
+        const {{ entries, otherLabel }} = topGroups(chartTotals('cluster'), selectedValue('cluster'));
+        charts.clusterResources.data.labels = entries.map(([name]) => name);
+        charts.clusterResources.data.otherLabel = otherLabel;
+        charts.clusterResources.data.datasets[0].data = entries.map(([, totals]) => totals.count);
+        charts.clusterResources.data.datasets[1].data = entries.map(([, totals]) => totals.vcpus / 10);
+        charts.clusterResources.data.datasets[2].data = entries.map(([, totals]) => totals.memory_gb / 100);
+        highlightSelection(charts.clusterResources, 'cluster');
+        renderChart(charts.clusterResources);
     }}
     
     // Host Resources Bar Chart
     if (charts.hostResources) {{
-        const hostData = sumBy(filteredData, 'host', ['vcpus', 'memory_gb']);
-        const hostNames = Object.keys(hostData);
-        charts.hostResources.data.labels = hostNames;
-        charts.hostResources.data.datasets[0].data = hostNames.map(h => hostData[h].count);
-        charts.hostResources.data.datasets[1].data = hostNames.map(h => hostData[h].vcpus / 10);
-        charts.hostResources.data.datasets[2].data = hostNames.map(h => hostData[h].memory_gb / 10);
-        charts.hostResources.update();
+        const {{ entries, otherLabel }} = topGroups(chartTotals('host'), selectedValue('host'));
+        charts.hostResources.data.labels = entries.map(([name]) => name);
+        charts.hostResources.data.otherLabel = otherLabel;
+        charts.hostResources.data.datasets[0].data = entries.map(([, totals]) => totals.count);
+        charts.hostResources.data.datasets[1].data = entries.map(([, totals]) => totals.vcpus / 10);
+        charts.hostResources.data.datasets[2].data = entries.map(([, totals]) => totals.memory_gb / 10);
+        highlightSelection(charts.hostResources, 'host');
+        renderChart(charts.hostResources);
+    }}
+    
+    // Environment Comparison Bar Chart
+    if (charts.environments) {{
+        const envData = chartTotals('environment');
+        const envNames = overviewChartData.environments.labels;
+        charts.environments.data.datasets[0].data = envNames.map(e => envData[e]?.count || 0);
+        charts.environments.data.datasets[1].data = envNames.map(e => (envData[e]?.vcpus || 0) / 10);
+        charts.environments.data.datasets[2].data = envNames.map(e => (envData[e]?.memory_gb || 0) / 100);
+        highlightSelection(charts.environments, 'environment');
+        renderChart(charts.environments);
     }}
     
     // Guest OS Bar Chart
     if (charts.guestOs) {{
-        const osCounts = countBy(filteredData, 'os_consolidated');
-        const labels = Object.keys(osCounts);
+        const {{ entries, otherLabel }} = topGroups(chartTotals('os_consolidated'), selectedValue('os_consolidated'));
+        const labels = entries.map(([name]) => name);
         const colors = labels.map(label => 
+            label === otherLabel ? chartColors.purple :
             label.toLowerCase().includes('windows') ? chartColors.blue : chartColors.red
         );
         charts.guestOs.data.labels = labels;
-        charts.guestOs.data.datasets[0].data = Object.values(osCounts);
-        charts.guestOs.data.datasets[0].backgroundColor = colors;
-        charts.guestOs.update();
+        charts.guestOs.data.otherLabel = otherLabel;
+        charts.guestOs.data.datasets[0].data = entries.map(([, totals]) => totals.count);
+        charts.guestOs.data.datasets[0].baseColor = colors;
+        highlightSelection(charts.guestOs, 'os_consolidated');
+        renderChart(charts.guestOs);
     }}
 }}
 
@@ -900,20 +1831,22 @@ function updateSizingCharts() {{
     // Size Distribution Pie
     if (charts.sizePie) {{
         const sizeOrder = ['Small', 'Medium', 'Large', 'X-Large'];
-        const sizeCounts = countBy(filteredData, 'size_category');
+        const sizeCounts = chartCounts('size_category');
         charts.sizePie.data.labels = sizeOrder;
         charts.sizePie.data.datasets[0].data = sizeOrder.map(s => sizeCounts[s] || 0);
-        charts.sizePie.update();
+        highlightSelection(charts.sizePie, 'size_category');
+        renderChart(charts.sizePie);
     }}
     
     // Resources by Size Bar Chart
     if (charts.resourcesBySize) {{
         const sizeOrder = ['Small', 'Medium', 'Large', 'X-Large'];
-        const sizeData = sumBy(filteredData, 'size_category', ['vcpus', 'memory_gb']);
+        const sizeData = chartTotals('size_category');
         charts.resourcesBySize.data.labels = sizeOrder;
         charts.resourcesBySize.data.datasets[0].data = sizeOrder.map(s => (sizeData[s]?.vcpus || 0));
         charts.resourcesBySize.data.datasets[1].data = sizeOrder.map(s => (sizeData[s]?.memory_gb || 0));
-        charts.resourcesBySize.update();
+        highlightSelection(charts.resourcesBySize, 'size_category');
+        renderChart(charts.resourcesBySize);
     }}
 }}
 
@@ -921,24 +1854,20 @@ function updateMigrationCharts() {{
     // Complexity by OS Stacked Bar
     if (charts.complexityOs) {{
         const osTypes = ['Linux', 'Windows'];
-        const complexityData = {{}};
-        
-        osTypes.forEach(os => {{
-            const osVms = filteredData.filter(vm => vm.os_family === os);
-            complexityData[os] = countBy(osVms, 'complexity');
-        }});
+        const complexityData = groupTotals('os_family', 'complexity');
         
         charts.complexityOs.data.labels = osTypes;
-        charts.complexityOs.data.datasets[0].data = osTypes.map(os => complexityData[os]?.Low || 0);
-        charts.complexityOs.data.datasets[1].data = osTypes.map(os => complexityData[os]?.Medium || 0);
-        charts.complexityOs.data.datasets[2].data = osTypes.map(os => complexityData[os]?.High || 0);
-        charts.complexityOs.update();
+        charts.complexityOs.data.datasets[0].data = osTypes.map(os => complexityData[os]?.Low?.count || 0);
+        charts.complexityOs.data.datasets[1].data = osTypes.map(os => complexityData[os]?.Medium?.count || 0);
+        charts.complexityOs.data.datasets[2].data = osTypes.map(os => complexityData[os]?.High?.count || 0);
+        highlightSelection(charts.complexityOs, 'os_family');
+        renderChart(charts.complexityOs);
     }}
     
     // Migration Waves Bar Chart
     if (charts.migrationWaves) {{
         const waveOrder = ['Wave 1 (Low)', 'Wave 2 (Medium)', 'Wave 3 (High)'];
-        const complexityCounts = countBy(filteredData, 'complexity');
+        const complexityCounts = groupCounts('complexity');
         const waveData = [
             complexityCounts['Low'] || 0,
             complexityCounts['Medium'] || 0,
@@ -946,80 +1875,76 @@ function updateMigrationCharts() {{
         ];
         charts.migrationWaves.data.labels = waveOrder;
         charts.migrationWaves.data.datasets[0].data = waveData;
-        charts.migrationWaves.update();
+        renderChart(charts.migrationWaves);
     }}
 }}
 
 function updateTrendsCharts() {{
-    // For trends charts, we need creation dates - filter data that has dates
-    const vmsWithDates = filteredData.filter(vm => vm.creation_date);
-    
-    if (vmsWithDates.length === 0) return;
-    
-    // Group by month for trends
-    const monthlyData = {{}};
-    vmsWithDates.forEach(vm => {{
-        const date = new Date(vm.creation_date);
-        const monthKey = `${{date.getFullYear()}}-${{String(date.getMonth() + 1).padStart(2, '0')}}`;
-        if (!monthlyData[monthKey]) {{
-            monthlyData[monthKey] = {{ count: 0, vcpus: 0, memory: 0 }};
-        }}
-        monthlyData[monthKey].count += 1;
-        monthlyData[monthKey].vcpus += (vm.vcpus || 0);
-        monthlyData[monthKey].memory += (vm.memory_gb || 0);
-    }});
-    
-    // Sort months
-    const months = Object.keys(monthlyData).sort();
-    
-    // Calculate cumulative data
-    let cumVms = 0, cumVcpus = 0, cumMemory = 0;
-    const cumulative = months.map(m => {{
-        cumVms += monthlyData[m].count;
-        cumVcpus += monthlyData[m].vcpus;
-        cumMemory += monthlyData[m].memory;
-        return {{ vms: cumVms, vcpus: cumVcpus, memory: cumMemory }};
-    }});
+    // Monthly and cumulative series over the global month axis, bucketed by the
+    // filter engine (VMs without a creation date are skipped)
+    const trends = filterResult?.trends;
+    const months = trendsChartData.vm_growth?.labels || [];
+    if (!trends || months.length === 0) return;
+    const monthly = trends.monthly;
+    const cumulative = trends.cumulative;
     
     // VM Growth Line Chart
     if (charts.vmGrowth) {{
         charts.vmGrowth.data.labels = months;
-        charts.vmGrowth.data.datasets[0].data = cumulative.map(c => c.vms);
-        charts.vmGrowth.update();
+        charts.vmGrowth.data.datasets[0].data = decimatedSeries(months, cumulative.count);
+        renderChart(charts.vmGrowth);
     }}
     
     // Resource Growth Dual Axis
     if (charts.resourceGrowth) {{
         charts.resourceGrowth.data.labels = months;
-        charts.resourceGrowth.data.datasets[0].data = cumulative.map(c => c.vcpus);
-        charts.resourceGrowth.data.datasets[1].data = cumulative.map(c => c.memory);
-        charts.resourceGrowth.update();
+        charts.resourceGrowth.data.datasets[0].data = decimatedSeries(months, cumulative.vcpus);
+        charts.resourceGrowth.data.datasets[1].data = decimatedSeries(months, cumulative.memory_gb);
+        renderChart(charts.resourceGrowth);
     }}
     
+    // Monthly bars, summed over consecutive months on long axes
+    const perMonth = bucketedMonths(months, [monthly.count, monthly.vcpus, monthly.memory_gb]);
+    
     // VMs Per Month Bar
     if (charts.vmsPerMonth) {{
-        charts.vmsPerMonth.data.labels = months;
-        charts.vmsPerMonth.data.datasets[0].data = months.map(m => monthlyData[m].count);
-        charts.vmsPerMonth.update();
+        charts.vmsPerMonth.data.labels = perMonth.labels;
+        charts.vmsPerMonth.data.datasets[0].data = perMonth.series[0];
+        renderChart(charts.vmsPerMonth);
     }}
     
     // Resources Per Month Bar
     if (charts.resourcesPerMonth) {{
-        charts.resourcesPerMonth.data.labels = months;
-        charts.resourcesPerMonth.data.datasets[0].data = months.map(m => monthlyData[m].vcpus);
-        charts.resourcesPerMonth.data.datasets[1].data = months.map(m => monthlyData[m].memory / 10);
-        charts.resourcesPerMonth.update();
+        charts.resourcesPerMonth.data.labels = perMonth.labels;
+        charts.resourcesPerMonth.data.datasets[0].data = perMonth.series[1];
+        charts.resourcesPerMonth.data.datasets[1].data = perMonth.series[2].map(memory => memory / 10);
+        renderChart(charts.resourcesPerMonth);
     }}
 }}
 
+function updateHistoryCharts() {{
+    // Snapshot history is recorded per cluster, so only the cluster filter applies
+    if (!charts.historyCapacity) return;
+    const history = trendsChartData.history;
+    const clusterFilter = document.getElementById('filter-cluster').value;
+    const series = (clusterFilter !== 'all' && history.by_cluster?.[clusterFilter]) || history.total;
+    
+    charts.historyCapacity.data.labels = series.dates;
+    charts.historyCapacity.data.datasets[0].data = series.vcpus;
+    charts.historyCapacity.data.datasets[1].data = series.memory;
+    charts.historyCapacity.data.datasets[2].data = series.used_storage;
+    renderChart(charts.historyCapacity);
+}}
+
 // ============================================
 // INITIALIZATION
 // ============================================
 document.addEventListener('DOMContentLoaded', function() {{
     initCharts();
+    enableChartFilters();
     applyFilters();
 }});
-'''
+{diagnostics_script}'''
 
 
 def collect_chart_configs(data, tab_configs):
@@ -1038,7 +1963,8 @@ def collect_chart_configs(data, tab_configs):
         'sizing': tab_configs.get('sizing', {}),
         'migration': tab_configs.get('migration', {}),
         'trends': tab_configs.get('trends', {}),
-        'forecast': tab_configs.get('forecast', {})
+        'forecast': tab_configs.get('forecast', {}),
+        'display': tab_configs.get('display', {})
     }
 
 
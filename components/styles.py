@@ -105,6 +105,66 @@ body {
     border-color: #CC0000;
 }
 
+.chart-filters {
+    display: flex;
+    flex-wrap: wrap;
+    gap: 6px;
+}
+
+.chart-filters:empty {
+    display: none;
+}
+
+.filter-chip {
+    padding: 6px 10px;
+    border: 1px solid #CC0000;
+    border-radius: 14px;
+    background: #fff5f5;
+    color: #CC0000;
+    font-size: 12px;
+    cursor: pointer;
+}
+
+.filter-query {
+    flex-basis: 100%;
+}
+
+.filter-query input {
+    padding: 8px 12px;
+    border: 1px solid #ddd;
+    border-radius: 4px;
+    font-size: 14px;
+    font-family: monospace;
+}
+
+.filter-query input:focus {
+    outline: none;
+    border-color: #CC0000;
+}
+
+.query-error {
+    font-size: 12px;
+    color: #CC0000;
+}
+
+.range-inputs {
+    display: flex;
+    gap: 4px;
+}
+
+.range-inputs input {
+    padding: 8px 6px;
+    border: 1px solid #ddd;
+    border-radius: 4px;
+    font-size: 14px;
+    width: 80px;
+}
+
+.range-inputs input:focus {
+    outline: none;
+    border-color: #CC0000;
+}
+
 .reset-btn {
     background: #CC0000;
     color: white;
@@ -329,6 +389,36 @@ body {
     color: #333;
 }
 
+th.sortable {
+    cursor: pointer;
+    user-select: none;
+}
+
+th.sortable:hover {
+    color: #333;
+}
+
+th.sort-asc::after {
+    content: ' \\25B2';
+}
+
+th.sort-desc::after {
+    content: ' \\25BC';
+}
+
+.table-search {
+    padding: 6px 10px;
+    border: 1px solid #ddd;
+    border-radius: 4px;
+    font-size: 13px;
+    min-width: 260px;
+}
+
+.table-search:focus {
+    outline: none;
+    border-color: #CC0000;
+}
+
 .table-wrapper {
     overflow-x: auto;
 }
@@ -371,6 +461,16 @@ tr:hover {
     background: #fafafa;
 }
 
+/* Inventory rows are windowed, so they need one fixed height */
+#inventory-tbody .vm-row td {
+    white-space: nowrap;
+}
+
+#inventory-tbody .inventory-spacer td {
+    padding: 0;
+    border: none;
+}
+
 .table-footer {
     padding: 12px 20px;
     background: #fafafa;
@@ -706,6 +806,95 @@ tr:hover {
     font-style: italic;
 }
 
+/* ============================================
+   FORECAST BANDS (Monte Carlo)
+   ============================================ */
+.band-cell strong {
+    display: block;
+}
+
+.band-range {
+    display: block;
+    font-size: 12px;
+    color: #888;
+}
+
+/* ============================================
+   MIGRATION SCHEDULE (Gantt)
+   ============================================ */
+.chart-title select {
+    margin-left: 6px;
+    padding: 4px 8px;
+    border: 1px solid #ddd;
+    border-radius: 4px;
+    font-size: 14px;
+    background: white;
+    cursor: pointer;
+}
+
+.chart-title .text-muted {
+    font-size: 13px;
+    font-weight: normal;
+}
+
+/* ============================================
+   CAPACITY SENSITIVITY HEATMAPS
+   ============================================ */
+.sweep-controls {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(160px, 1fr));
+    gap: 12px;
+    padding: 15px 20px;
+}
+
+.sweep-control {
+    display: flex;
+    flex-direction: column;
+    gap: 4px;
+}
+
+.sweep-control label {
+    font-size: 12px;
+    color: #666;
+    text-transform: uppercase;
+    font-weight: 500;
+}
+
+.sweep-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(420px, 1fr));
+    gap: 20px;
+    padding: 0 20px 15px;
+}
+
+.sweep-axes {
+    font-size: 13px;
+    color: #666;
+    margin-bottom: 8px;
+}
+
+.sweep-heatmap {
+    overflow-x: auto;
+}
+
+.sweep-heatmap table {
+    border-collapse: collapse;
+    font-size: 12px;
+}
+
+.sweep-heatmap th,
+.sweep-heatmap td {
+    padding: 6px 8px;
+    text-align: center;
+    white-space: nowrap;
+}
+
+.sweep-heatmap td.sweep-baseline {
+    outline: 2px solid #f44336;
+    outline-offset: -2px;
+    font-weight: bold;
+}
+
 /* ============================================
    RESPONSIVE DESIGN
    ============================================ */
@@ -830,6 +1019,58 @@ tr:hover {
     display: none !important;
 }
 
+/* ============================================
+   DIAGNOSTICS PANEL (--diagnostics)
+   ============================================ */
+.diagnostics-toggle {
+    position: fixed;
+    right: 20px;
+    bottom: 20px;
+    z-index: 200;
+    background: #333;
+    color: white;
+    border: none;
+    padding: 8px 14px;
+    border-radius: 4px;
+    cursor: pointer;
+    font-size: 13px;
+}
+
+.diagnostics-panel {
+    position: fixed;
+    right: 20px;
+    bottom: 60px;
+    z-index: 200;
+    width: 480px;
+    max-height: 70vh;
+    overflow-y: auto;
+    background: white;
+    border-radius: 8px;
+    box-shadow: 0 4px 16px rgba(0,0,0,0.2);
+    padding: 12px 16px;
+    font-size: 12px;
+}
+
+.diagnostics-actions {
+    display: flex;
+    gap: 8px;
+    align-items: center;
+}
+
+.diagnostics-actions strong {
+    margin-right: auto;
+}
+
+.diagnostics-panel h4 {
+    margin: 12px 0 4px;
+}
+
+.diagnostics-panel td,
+.diagnostics-panel th {
+    padding: 2px 8px 2px 0;
+    text-align: left;
+}
+
 /* ============================================
    PRINT STYLES
    ============================================ */
@@ -838,6 +1079,8 @@ tr:hover {
     .tabs,
     .reset-btn,
     .apply-btn,
+    .diagnostics-toggle,
+    .diagnostics-panel,
     .config-panel {
         display: none;
     }
@@ -6,16 +6,39 @@ Displays growth projections and infrastructure sizing recommendations.
 """
 
 
-def generate_config_panel():
-    """Generate the forecast configuration panel."""
-    return '''            <div class="config-panel">
+# Node specs when the data has no placement results (see placement.NODE_SPECS)
+DEFAULT_NODE_SPECS = {
+    'small': {'label': 'Small', 'cores': 32, 'vcpus': 64, 'memory': 512},
+    'medium': {'label': 'Medium', 'cores': 64, 'vcpus': 128, 'memory': 1024},
+    'large': {'label': 'Large', 'cores': 128, 'vcpus': 256, 'memory': 2048}
+}
+
+
+def get_node_specs(data):
+    """Node specs offered on the Forecast tab."""
+    return (data.get('placement') or {}).get('node_specs') or DEFAULT_NODE_SPECS
+
+
+def generate_config_panel(node_specs, growth_models=None):
+    """Generate the forecast configuration panel (the fitted scenario is the default when available)."""
+    fitted_option = ''
+    if growth_models:
+        first_year = (growth_models['total']['vms']['growth'][0] - 1) * 100
+        fitted_option = f'''
+                            <option value="fitted" selected>Fitted to history ({first_year:+.0f}% in {growth_models['years'][0]}, per cluster)</option>'''
+    spec_options = ''.join(
+        f'''
+                            <option value="{name}"{' selected' if name == 'medium' else ''}>{spec['label']}: {spec['cores']} cores / {spec['vcpus']} vCPU / {spec['memory']} GB RAM</option>'''
+        for name, spec in node_specs.items()
+    )
+    return f'''            <div class="config-panel">
                 <div class="config-title">Forecast Configuration</div>
                 <div class="config-grid">
                     <div class="config-group">
                         <label>Growth Scenario</label>
-                        <select id="growth-scenario" onchange="toggleCustomGrowth()">
+                        <select id="growth-scenario" onchange="toggleCustomGrowth()">{fitted_option}
                             <option value="5">Conservative (+5% annually)</option>
-                            <option value="15" selected>Typical (+15% annually)</option>
+                            <option value="15"{'' if growth_models else ' selected'}>Typical (+15% annually)</option>
                             <option value="25">Aggressive (+25% annually)</option>
                             <option value="custom">Custom</option>
                         </select>
@@ -26,10 +49,7 @@ def generate_config_panel():
                     </div>
                     <div class="config-group">
                         <label>Node Specification</label>
-                        <select id="node-spec">
-                            <option value="small">Small: 32 cores / 64 vCPU / 512 GB RAM</option>
-                            <option value="medium" selected>Medium: 64 cores / 128 vCPU / 1024 GB RAM</option>
-                            <option value="large">Large: 128 cores / 256 vCPU / 2048 GB RAM</option>
+                        <select id="node-spec">{spec_options}
                         </select>
                     </div>
                 </div>
@@ -38,8 +58,19 @@ def generate_config_panel():
 '''
 
 
-def generate_assumptions_table(stats):
+def generate_assumptions_table(stats, placement=None):
     """Generate the forecast assumptions table."""
+    placement = placement or {}
+    overhead = placement.get('overhead', 1.2)
+    min_nodes = placement.get('min_nodes', 3)
+    spare_nodes = placement.get('ha_spare_nodes', 0)
+    spare_note = f" plus {spare_nodes} spare node(s) per cluster" if spare_nodes else ''
+    sizing_note = (
+        "Each cluster's VMs are bin-packed by vCPU and memory onto the node spec; "
+        "the packed node count grows with the VM projection"
+        if placement.get('clusters') else
+        "Projected vCPUs and memory divided by node capacity"
+    )
     return f'''            <div class="table-container">
                 <div class="table-header">
                     <div class="table-title">Forecast Assumptions</div>
@@ -75,15 +106,21 @@ def generate_assumptions_table(stats):
                             </tr>
                             <tr>
                                 <td>Overhead Factor</td>
-                                <td>1.2x (20%)</td>
+                                <td>{overhead}x ({round((overhead - 1) * 100)}%)</td>
                                 <td>—</td>
                                 <td class="assumptions-note">Added buffer for scheduling, overhead, and burst capacity</td>
                             </tr>
                             <tr>
                                 <td>Minimum Nodes</td>
-                                <td>3</td>
+                                <td>{min_nodes}</td>
                                 <td>—</td>
-                                <td class="assumptions-note">High availability requirement</td>
+                                <td class="assumptions-note">High availability requirement{spare_note}</td>
+                            </tr>
+                            <tr>
+                                <td>Node Sizing</td>
+                                <td>{'Bin-packing' if placement.get('clusters') else 'Capacity ratio'}</td>
+                                <td>—</td>
+                                <td class="assumptions-note">{sizing_note}</td>
                             </tr>
                         </tbody>
                     </table>
@@ -180,6 +217,152 @@ def generate_forecast_chart():
 '''
 
 
+def format_band(band, unit=''):
+    """A [P10, P50, P90] band as the median with the P10-P90 range beneath it."""
+    low, median, high = band
+    return f'<strong>{median:,}{unit}</strong><span class="band-range">{low:,}{unit} – {high:,}{unit}</span>'
+
+
+def generate_bands_section(bands):
+    """Generate the Monte Carlo band chart and the per-cluster band table."""
+    if not bands:
+        return ''
+    year = bands['years'][-1]
+
+    rows = ''
+    for cluster_name, entry in bands['clusters'].items():
+        history = f"{entry['history_months']} months"
+        if entry['pooled']:
+            history += ' (estate-wide rates)'
+        rows += f'''                            <tr data-band-cluster="{cluster_name}">
+                                <td><span class="badge badge-cluster">{cluster_name}</span></td>
+                                <td>{history}</td>
+                                <td class="band-cell">{format_band(entry['annual_growth'], '%')}</td>
+                                <td class="band-cell">{format_band(entry['vms'][-1])}</td>
+                                <td class="band-cell">{format_band(entry['vcpus'][-1])}</td>
+                                <td class="band-cell">{format_band(entry['memory'][-1])}</td>
+                                <td class="band-cell band-nodes">—</td>
+                            </tr>
+'''
+    total = bands['total']
+
+    return f'''            <div class="charts-grid">
+                <div class="chart-card full-width">
+                    <div class="chart-title">Simulated Growth (P10–P90 band, P50 line)</div>
+                    <div class="chart-container tall">
+                        <canvas id="chart-forecast-bands"></canvas>
+                    </div>
+                </div>
+            </div>
+            <div class="table-container">
+                <div class="table-header">
+                    <div class="table-title">Simulated {year} Range by Cluster</div>
+                </div>
+                <div class="table-wrapper">
+                    <table id="forecast-bands-table">
+                        <thead>
+                            <tr>
+                                <th>Cluster</th>
+                                <th>History Sampled</th>
+                                <th>Annual VM Growth</th>
+                                <th>{year} VMs</th>
+                                <th>{year} vCPUs</th>
+                                <th>{year} Memory (GB)</th>
+                                <th>Recommended Nodes</th>
+                            </tr>
+                        </thead>
+                        <tbody id="forecast-bands-tbody">
+{rows}                        </tbody>
+                        <tfoot>
+                            <tr data-band-cluster="" style="font-weight: bold; background: #f8f8f8;">
+                                <td>TOTAL</td>
+                                <td>—</td>
+                                <td>—</td>
+                                <td class="band-cell">{format_band(total['vms'][-1])}</td>
+                                <td class="band-cell">{format_band(total['vcpus'][-1])}</td>
+                                <td class="band-cell">{format_band(total['memory'][-1])}</td>
+                                <td class="band-cell band-nodes">—</td>
+                            </tr>
+                        </tfoot>
+                    </table>
+                </div>
+                <div class="assumptions-note">
+                    {bands['simulations']:,} simulations; each year compounds the growth of 12 months drawn from
+                    the {bands['window_months']} months up to {bands['last_month']}. Median, with the P10–P90 range beneath it.
+                </div>
+            </div>
+'''
+
+
+def generate_growth_models_table(growth_models):
+    """Generate the table of fitted growth models per cluster and OS family."""
+    if not growth_models:
+        return ''
+    years = growth_models['years']
+    
+    def cells(fits):
+        vms = fits['vms']
+        error = f"{vms['error']}%" if vms['error'] is not None else '—'
+        growth = ''.join(
+            f"<td>{(fits[measure]['growth'][0] - 1) * 100:+.1f}%</td>" for measure in ['vms', 'vcpus', 'memory']
+        )
+        return f"<td>{vms['model'].capitalize()}</td><td>{error}</td>{growth}<td>{(vms['growth'][-1] - 1) * 100:+.1f}%</td>"
+    
+    rows = ''
+    for name, fits in growth_models['clusters'].items():
+        rows += f'''                            <tr>
+                                <td><span class="badge badge-cluster">{name}</span></td>
+                                <td>Cluster</td>
+                                {cells(fits)}
+                            </tr>
+'''
+    for name, fits in growth_models['os_families'].items():
+        rows += f'''                            <tr>
+                                <td><strong>{name}</strong></td>
+                                <td>OS family</td>
+                                {cells(fits)}
+                            </tr>
+'''
+    
+    return f'''            <div class="table-container">
+                <div class="table-header">
+                    <div class="table-title">Fitted Growth Models</div>
+                </div>
+                <div class="table-wrapper">
+                    <table id="growth-models-table">
+                        <thead>
+                            <tr>
+                                <th>Series</th>
+                                <th>Type</th>
+                                <th>VM Model</th>
+                                <th>Backtest Error</th>
+                                <th>{years[0]} VMs</th>
+                                <th>{years[0]} vCPUs</th>
+                                <th>{years[0]} Memory</th>
+                                <th>VMs by {years[-1]}</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+{rows}                        </tbody>
+                        <tfoot>
+                            <tr style="font-weight: bold; background: #f8f8f8;">
+                                <td>TOTAL</td>
+                                <td>Estate</td>
+                                {cells(growth_models['total'])}
+                            </tr>
+                        </tfoot>
+                    </table>
+                </div>
+                <div class="assumptions-note">
+                    Linear, exponential and seasonal models fitted to the last {growth_models['fit_months']} months
+                    up to {growth_models['last_month']}, per series (VMs, vCPUs, memory); each keeps the model with the
+                    lowest error forecasting {growth_models['backtest_horizon']} months ahead from
+                    {growth_models['backtest_origins']} earlier starting points. Growth is relative to today.
+                </div>
+            </div>
+'''
+
+
 def generate_infrastructure_table(data):
     """Generate the infrastructure sizing table."""
     distributions = data.get('distributions', {})
@@ -235,6 +418,185 @@ def generate_infrastructure_table(data):
 '''
 
 
+def generate_environment_forecast_table(environments):
+    """Generate the per-environment 2028 sizing table (multi-environment dashboards)."""
+    rows = ''
+    for env in environments:
+        rows += f'''                            <tr data-environment="{env.get('name', '')}">
+                                <td><strong>{env.get('name', '')}</strong></td>
+                                <td>{env.get('forecast', {}).get('vms', 0)}</td>
+                                <td class="env-2028-vms">—</td>
+                                <td class="env-2028-vcpus">—</td>
+                                <td class="env-2028-memory">—</td>
+                                <td class="env-nodes">—</td>
+                            </tr>
+'''
+    
+    return f'''            <div class="table-container">
+                <div class="table-header">
+                    <div class="table-title">Infrastructure Sizing for 2028 by Environment</div>
+                </div>
+                <div class="table-wrapper">
+                    <table id="environment-forecast-table">
+                        <thead>
+                            <tr>
+                                <th>Environment</th>
+                                <th>Current VMs</th>
+                                <th>2028 VMs</th>
+                                <th>2028 vCPUs</th>
+                                <th>2028 Memory (GB)</th>
+                                <th>Recommended Nodes</th>
+                            </tr>
+                        </thead>
+                        <tbody id="environment-forecast-tbody">
+{rows}                        </tbody>
+                    </table>
+                </div>
+            </div>
+'''
+
+
+def generate_sweep_section(sweep, node_specs):
+    """Generate the capacity sensitivity heatmaps (scenario_sweep.py; filled by renderSweepHeatmaps)."""
+    if not sweep:
+        return ''
+    
+    def value_label(axis, value):
+        if axis['name'] == 'node_spec':
+            return node_specs.get(value, {}).get('label', value)
+        return f"{value}x" if axis['name'] in ('overhead', 'cpu_overcommit', 'memory_overcommit') else str(value)
+    
+    fixed = ''
+    for axis in sweep['axes']:
+        options = ''.join(
+            f'''<option value="{index}"{' selected' if value == axis['baseline'] else ''}>{value_label(axis, value)}</option>'''
+            for index, value in enumerate(axis['values'])
+        )
+        fixed += f'''
+                    <div class="sweep-control">
+                        <label for="sweep-fixed-{axis['name']}">{axis['label']}</label>
+                        <select id="sweep-fixed-{axis['name']}" onchange="renderSweepHeatmaps()">{options}</select>
+                    </div>'''
+    
+    def axis_select(select_id, selected):
+        options = ''.join(
+            f'''<option value="{axis['name']}"{' selected' if axis['name'] == selected else ''}>{axis['label']}</option>'''
+            for axis in sweep['axes']
+        )
+        return f'<select id="{select_id}" onchange="renderSweepHeatmaps()">{options}</select>'
+    
+    panels = ''
+    for index, (x_axis, y_axis) in enumerate([('growth', 'overhead'), ('cpu_overcommit', 'memory_overcommit')]):
+        panels += f'''
+                    <div class="sweep-panel">
+                        <div class="sweep-axes">
+                            Rows {axis_select(f'sweep-y-{index}', y_axis)}
+                            Columns {axis_select(f'sweep-x-{index}', x_axis)}
+                        </div>
+                        <div class="sweep-heatmap" id="sweep-heatmap-{index}"></div>
+                    </div>'''
+    
+    return f'''            <div class="table-container">
+                <div class="table-header">
+                    <div class="table-title">Capacity Sensitivity: Total Nodes in {sweep['year']}</div>
+                </div>
+                <div class="sweep-controls">{fixed}
+                </div>
+                <div class="sweep-grid">{panels}
+                </div>
+                <div class="assumptions-note">
+                    {len(sweep['nodes']):,} parameter combinations over {sweep['clusters']} clusters. Each cluster needs its
+                    projected vCPUs and memory times the overhead factor, over the node's vCPUs and memory times the
+                    overcommit ratios, plus the spare nodes (at least {sweep['min_nodes']} nodes). Parameters not on a
+                    heatmap's rows or columns use the values selected above; the outlined cell is today's sizing rules.
+                    Sized on total capacity rather than bin-packing.
+                </div>
+            </div>
+'''
+
+
+def format_node_mix(mix, sku_labels):
+    """Node mix of the cost optimizer as '12 × label + 2 × label'."""
+    return ' + '.join(f"{nodes} × {sku_labels.get(sku, sku)}" for sku, nodes in mix.items())
+
+
+def generate_cost_table(node_costs):
+    """Generate the table of cheapest node mixes per cluster from the SKU catalog."""
+    if not node_costs:
+        return ''
+    years = node_costs['years']
+    sku_labels = {sku['name']: sku['label'] for sku in node_costs['skus']}
+    
+    def money(value):
+        return f"{value:,.0f}"
+    
+    rows = ''
+    for name, entry in node_costs['clusters'].items():
+        if entry['cost'] is None:
+            cells = f'<td colspan="{len(years) + 4}">No catalog SKU holds the largest VM</td>'
+        else:
+            single = entry['single']
+            cells = ''.join(f"<td>{money(cost)}</td>" for cost in entry['cost'])
+            cells += (f"<td>{format_node_mix(entry['mix'][-1], sku_labels)}</td>"
+                      f"<td>{entry['nodes'][-1]}</td>"
+                      f"<td>{single['nodes']} × {sku_labels.get(single['sku'], single['sku'])}</td>"
+                      f"<td>{money(single['cost'] - entry['cost'][-1])}</td>")
+        rows += f'''                            <tr>
+                                <td><span class="badge badge-cluster">{name}</span></td>
+                                {cells}
+                            </tr>
+'''
+    
+    total = node_costs['total']
+    skus = ', '.join(
+        f"{sku['label']} ({sku['vcpus']} vCPU / {sku['memory']} GB, {money(sku['price'])})"
+        for sku in node_costs['skus']
+    )
+    unsized = (f" {total['unsized']} clusters have a VM larger than every SKU and are left out of the totals."
+               if total['unsized'] else '')
+    scenario = 'the fitted growth models' if node_costs['scenario'] == 'fitted' else node_costs['scenario']
+    
+    return f'''            <div class="table-container">
+                <div class="table-header">
+                    <div class="table-title">Node Cost Optimization ({node_costs['currency']} per {node_costs['price_period']})</div>
+                </div>
+                <div class="table-wrapper">
+                    <table id="node-cost-table">
+                        <thead>
+                            <tr>
+                                <th>Cluster</th>
+                                {''.join(f"<th>{year} Cost</th>" for year in years)}
+                                <th>{years[-1]} Node Mix</th>
+                                <th>Nodes</th>
+                                <th>Best Single SKU</th>
+                                <th>Saving vs Single SKU</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+{rows}                        </tbody>
+                        <tfoot>
+                            <tr style="font-weight: bold; background: #f8f8f8;">
+                                <td>TOTAL</td>
+                                {''.join(f"<td>{money(cost)}</td>" for cost in total['cost'])}
+                                <td>—</td>
+                                <td>{total['nodes'][-1]}</td>
+                                <td>{money(total['single_cost'])}</td>
+                                <td>{money(total['single_cost'] - total['cost'][-1])}</td>
+                            </tr>
+                        </tfoot>
+                    </table>
+                </div>
+                <div class="assumptions-note">
+                    Cheapest mix of at most two SKUs from {node_costs['source']} per cluster and year, for demand
+                    grown with {scenario}: usable capacity is each SKU divided by the {node_costs['overhead']}x
+                    overhead, plus {node_costs['ha_spare_nodes']} spare node as large as the mix's largest SKU, at least
+                    {node_costs['min_nodes']} nodes, and every SKU must hold the cluster's largest VM. Sized on total
+                    vCPUs and memory rather than bin-packing.{unsized} SKUs: {skus}.
+                </div>
+            </div>
+'''
+
+
 def generate_tab_forecast(data):
     """
     Generate complete HTML for the Forecasting tab.
@@ -247,11 +609,17 @@ def generate_tab_forecast(data):
     """
     stats = data.get('stats', {})
     
-    html = generate_config_panel()
-    html += generate_assumptions_table(stats)
+    html = generate_config_panel(get_node_specs(data), data.get('growth_models'))
+    html += generate_assumptions_table(stats, data.get('placement'))
     html += generate_year_cards(stats)
     html += generate_forecast_chart()
+    html += generate_bands_section(data.get('forecast_bands'))
+    html += generate_growth_models_table(data.get('growth_models'))
     html += generate_infrastructure_table(data)
+    if data.get('environments'):
+        html += generate_environment_forecast_table(data['environments'])
+    html += generate_sweep_section(data.get('capacity_sweep'), get_node_specs(data))
+    html += generate_cost_table(data.get('node_costs'))
     
     return html
 
@@ -263,11 +631,17 @@ def get_forecast_base_data(data):
     stats = data.get('stats', {})
     distributions = data.get('distributions', {})
     cluster_data = distributions.get('by_cluster', {})
+    cluster_environment = {
+        cluster: env['name']
+        for env in data.get('environments', [])
+        for cluster in env.get('clusters', [])
+    }
     
     clusters = []
     for cluster_name, cluster_stats in cluster_data.items():
         clusters.append({
             'name': cluster_name,
+            'environment': cluster_environment.get(cluster_name),
             'vms': cluster_stats.get('vm_count', 0),
             'vcpus': cluster_stats.get('num_of_cpus', 0),
             'memory': cluster_stats.get('mem_size_GB', 0)
@@ -280,11 +654,12 @@ def get_forecast_base_data(data):
             'memory': stats.get('total_memory_gb', 0)
         },
         'clusters': clusters,
-        'node_specs': {
-            'small': {'vcpus': 64, 'memory': 512},
-            'medium': {'vcpus': 128, 'memory': 1024},
-            'large': {'vcpus': 256, 'memory': 2048}
-        }
+        'node_specs': get_node_specs(data),
+        'placement': data.get('placement'),
+        'bands': data.get('forecast_bands'),
+        'growth_models': data.get('growth_models'),
+        'lookup': data.get('forecast_lookup'),
+        'sweep': data.get('capacity_sweep')
     }
 
 
@@ -2,7 +2,7 @@
 tab_inventory.py
 ----------------
 Tab 6: VM Inventory
-Displays the full VM inventory table with filtering and sorting.
+Displays the full VM inventory table with filtering, search and sorting.
 """
 
 
@@ -43,21 +43,50 @@ def get_utilization_badge(utilization):
     return 'badge-util-high'
 
 
+# Inventory columns: (header, VM list field the column sorts by)
+INVENTORY_COLUMNS = [
+    ('VM Name', 'vm_name'),
+    ('Cluster', 'cluster'),
+    ('Guest OS', 'guest_os'),
+    ('Host', 'host'),
+    ('Status', 'status'),
+    ('Memory (GB)', 'memory_gb'),
+    ('vCPUs', 'vcpus'),
+    ('Storage (GB)', 'storage_gb'),
+    ('Utilization', 'utilization'),
+    ('Size Category', 'size_category'),
+    ('Migration Complexity', 'complexity')
+]
+
+
 def generate_inventory_table(vm_list):
     """Generate the VM inventory table HTML."""
+    # Environment column only for multi-environment dashboards
+    show_environment = bool(vm_list) and 'environment' in vm_list[0]
+    columns = ([('Environment', 'environment')] if show_environment else []) + INVENTORY_COLUMNS
+    headers = ''.join(
+        f'\n                                <th class="sortable" data-sort="{field}" onclick="sortInventory(\'{field}\')">{label}</th>'
+        for label, field in columns
+    )
+    
     rows = ''
     for vm in vm_list:
         status_class, status_text = get_status_badge(vm.get('status', ''))
         complexity_class = get_complexity_badge(vm.get('complexity', ''))
         size_class = get_size_badge(vm.get('size_category', ''))
         util_class = get_utilization_badge(vm.get('utilization', 0))
+        environment_cell = (
+            f"\n                                <td>{vm.get('environment', '')}</td>"
+            if show_environment else ''
+        )
         
         rows += f'''                            <tr class="vm-row" 
                                 data-cluster="{vm.get('cluster', '')}"
                                 data-osfamily="{vm.get('os_family', '')}"
                                 data-status="{vm.get('status', '')}"
                                 data-complexity="{vm.get('complexity', '')}"
-                                data-host="{vm.get('host', '')}">
+                                data-host="{vm.get('host', '')}"
+                                data-environment="{vm.get('environment', '')}">{environment_cell}
                                 <td>{vm.get('vm_name', '')}</td>
                                 <td><span class="badge badge-cluster">{vm.get('cluster', '')}</span></td>
                                 <td>{vm.get('guest_os', '')}</td>
@@ -67,8 +96,8 @@ def generate_inventory_table(vm_list):
                                 <td>{vm.get('vcpus', 0)}</td>
                                 <td>{vm.get('storage_gb', 0):,.0f}</td>
                                 <td><span class="badge {util_class}">{vm.get('utilization', 0):.1f}%</span></td>
-                                <td><span class="badge {size_class}">{vm.get('size_category', '')}</span></td>
-                                <td><span class="badge {complexity_class}">{vm.get('complexity', '')}</span></td>
+                                <td><span class="badge {size_class}" title="Rule: {vm.get('size_rule', '')}">{vm.get('size_category', '')}</span></td>
+                                <td><span class="badge {complexity_class}" title="Rule: {vm.get('complexity_rule', '')}">{vm.get('complexity', '')}</span></td>
                             </tr>
 '''
     
@@ -77,22 +106,13 @@ def generate_inventory_table(vm_list):
     return f'''            <div class="table-container">
                 <div class="table-header">
                     <div class="table-title">VM Inventory</div>
+                    <input type="search" id="inventory-search" class="table-search"
+                           placeholder="Search name, guest OS or host..." oninput="scheduleInventorySearch()">
                 </div>
                 <div class="table-wrapper scrollable">
                     <table id="inventory-table">
                         <thead>
-                            <tr>
-                                <th>VM Name</th>
-                                <th>Cluster</th>
-                                <th>Guest OS</th>
-                                <th>Host</th>
-                                <th>Status</th>
-                                <th>Memory (GB)</th>
-                                <th>vCPUs</th>
-                                <th>Storage (GB)</th>
-                                <th>Utilization</th>
-                                <th>Size Category</th>
-                                <th>Migration Complexity</th>
+                            <tr>{headers}
                             </tr>
                         </thead>
                         <tbody id="inventory-tbody">
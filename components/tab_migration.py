@@ -2,9 +2,18 @@
 tab_migration.py
 ----------------
 Tab 3: Migration Planning
-Displays complexity analysis, migration waves, and pre-migration checklist.
+Displays complexity analysis, migration waves, the simulated migration
+schedule, the host drain plan, and pre-migration checklist.
 """
 
+import html
+
+
+# VMs per wave in the per-VM Gantt chart (the last to finish)
+GANTT_MAX_VMS = 150
+# Points of the host drain curve (every n-th host, always the last)
+DRAIN_CURVE_POINTS = 500
+
 
 def generate_complexity_cards(distributions):
     """Generate the complexity summary cards."""
@@ -33,12 +42,26 @@ def generate_complexity_cards(distributions):
 '''
 
 
-def generate_migration_waves_table(waves):
-    """Generate the migration waves table."""
+def describe_wave_plan(plan):
+    """One-line summary of the wave planner settings under the planned waves table."""
+    units = {'cluster': 'whole clusters', 'host': 'whole RHV hosts'}.get(plan.get('keep_together'), 'single VMs')
+    extra = plan['waves'] - plan['requested_waves']
+    opened = f" ({extra} more than the {plan['requested_waves']} requested, to stay within the caps)" if extra > 0 else ''
+    return (f"{plan['waves']} waves{opened} planned from {plan['units']:,} units ({units}) in complexity order; "
+            f"the largest wave carries {plan['balance']}x an even share of VMs, TB, vCPUs or hours. "
+            f"Waves marked over cap hold a unit larger than a cap on its own.")
+
+
+def generate_migration_waves_table(waves, plan=None):
+    """Generate the migration waves table (the planned waves when the wave planner ran)."""
+    title = 'Planned Migration Waves' if plan else 'Suggested Migration Waves'
+    note = f'''
+                <div class="assumptions-note">{describe_wave_plan(plan)}</div>''' if plan else ''
     rows = ''
     for wave in waves:
+        over_cap = ' <span class="badge badge-high">over cap</span>' if wave.get('over_cap') else ''
         rows += f'''                        <tr>
-                            <td><strong>Wave {wave.get('wave', '')}</strong></td>
+                            <td><strong>Wave {wave.get('wave', '')}</strong>{over_cap}</td>
                             <td>
                                 <strong>{wave.get('name', '')}</strong><br>
                                 <span class="text-muted">{wave.get('description', '')}</span>
@@ -52,7 +75,7 @@ def generate_migration_waves_table(waves):
     
     return f'''            <div class="table-container">
                 <div class="table-header">
-                    <div class="table-title">Suggested Migration Waves</div>
+                    <div class="table-title">{title}</div>
                 </div>
                 <div class="table-wrapper">
                     <table id="migration-waves-table">
@@ -67,6 +90,196 @@ def generate_migration_waves_table(waves):
                             </tr>
                         </thead>
                         <tbody>
+{rows}                        </tbody>
+                    </table>
+                </div>{note}
+            </div>
+'''
+
+
+def format_hours(hours):
+    """Format a duration in hours, with days for long durations."""
+    if hours >= 48:
+        return f"{hours:,.1f} h ({hours / 24:,.1f} days)"
+    return f"{hours:,.1f} h"
+
+
+def generate_schedule_section(schedule, waves):
+    """Generate the simulated wave durations table and Gantt charts."""
+    if not schedule or not schedule['waves']:
+        return ''
+    names = {wave.get('wave'): wave.get('name', '') for wave in waves}
+    settings = schedule['settings']
+    
+    rows = ''
+    options = ''
+    for wave in schedule['waves']:
+        rows += f'''                        <tr>
+                            <td><strong>Wave {wave['wave']}</strong> <span class="text-muted">{names.get(wave['wave'], '')}</span></td>
+                            <td>{wave['vm_count']:,}</td>
+                            <td>{wave['transfer_gb']:,.0f}</td>
+                            <td>{format_hours(wave['start_hours'])}</td>
+                            <td>{format_hours(wave['finish_hours'])}</td>
+                            <td><strong>{format_hours(wave['hours'])}</strong></td>
+                            <td>{wave['peak_transfers']}</td>
+                        </tr>
+'''
+        options += f'''                        <option value="{wave['wave']}">Wave {wave['wave']}</option>
+'''
+    
+    return f'''            <div class="charts-grid">
+                <div class="chart-card">
+                    <div class="chart-title">Simulated Wave Timeline</div>
+                    <div class="chart-container">
+                        <canvas id="chart-migration-gantt"></canvas>
+                    </div>
+                </div>
+                <div class="chart-card">
+                    <div class="chart-title">
+                        VM Transfers in
+                        <select id="migration-gantt-wave" onchange="renderMigrationVmGantt()">
+{options}                        </select>
+                        <span class="text-muted" id="migration-gantt-note"></span>
+                    </div>
+                    <div class="chart-container" id="migration-vm-gantt-container">
+                        <canvas id="chart-migration-vm-gantt"></canvas>
+                    </div>
+                </div>
+            </div>
+            <div class="table-container">
+                <div class="table-header">
+                    <div class="table-title">Simulated Wave Durations <span class="text-muted">(total {format_hours(schedule['total_hours'])})</span></div>
+                </div>
+                <div class="table-wrapper">
+                    <table id="migration-schedule-table">
+                        <thead>
+                            <tr>
+                                <th>Wave</th>
+                                <th>VMs</th>
+                                <th>Transfer (GB)</th>
+                                <th>Start</th>
+                                <th>Finish</th>
+                                <th>Duration</th>
+                                <th>Peak Transfers</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+{rows}                        </tbody>
+                    </table>
+                </div>
+                <div class="assumptions-note">
+                    Discrete-event simulation of the waves back to back: {settings['concurrency']} concurrent VM
+                    migrations, each copying its used storage at up to {settings['transfer_rate_mbps']} MB/s, within
+                    {settings['host_bandwidth_mbps']:,} MB/s per RHV host and {settings['domain_bandwidth_mbps']:,} MB/s
+                    per storage domain, plus {settings['overhead_minutes']} minutes of conversion and start-up per VM.
+                    Largest VMs start first within a wave.
+                </div>
+            </div>
+'''
+
+
+def generate_host_drain_section(drain):
+    """Generate the host drain chart and the table of the first hosts to drain."""
+    if not drain:
+        return ''
+    totals = drain['totals']
+    settings = drain['settings']
+    weights = ', '.join(f"{level} {weight:g}x" for level, weight in settings['complexity_weights'].items())
+    
+    rows = ''
+    for host in drain['hosts']:
+        rows += f'''                        <tr>
+                            <td>{host['order']}</td>
+                            <td><strong>{html.escape(host['host'])}</strong></td>
+                            <td><span class="badge badge-cluster">{html.escape(host['cluster'])}</span></td>
+                            <td><span class="badge badge-{host['complexity'].lower()}">{host['complexity']}</span></td>
+                            <td>{host['vm_count']:,}</td>
+                            <td>{host['vcpus']:,}</td>
+                            <td>{host['memory_gb']:,}</td>
+                            <td>{host['used_gb']:,.0f}</td>
+                            <td>{format_hours(host['start_hours'])} → {format_hours(host['finish_hours'])}</td>
+                            <td>{host['freed_hosts']:,} / {totals['hosts']:,}</td>
+                            <td>{host['freed_vcpus_pct']}%</td>
+                            <td>{host['freed_memory_pct']}%</td>
+                        </tr>
+'''
+    
+    listed = len(drain['hosts'])
+    return f'''            <div class="charts-grid">
+                <div class="chart-card full-width">
+                    <div class="chart-title">Host Drain: Capacity Freed Over Time</div>
+                    <div class="chart-container">
+                        <canvas id="chart-host-drain"></canvas>
+                    </div>
+                </div>
+            </div>
+            <div class="table-container">
+                <div class="table-header">
+                    <div class="table-title">Host Drain Order <span class="text-muted">({listed if listed < totals['hosts'] else 'all'} of {totals['hosts']:,} hosts; half drained after {format_hours(totals['half_hosts_hours'])}, all after {format_hours(totals['hours'])})</span></div>
+                </div>
+                <div class="table-wrapper">
+                    <table id="host-drain-table">
+                        <thead>
+                            <tr>
+                                <th>#</th>
+                                <th>Host</th>
+                                <th>Cluster</th>
+                                <th>Complexity</th>
+                                <th>VMs</th>
+                                <th>vCPUs</th>
+                                <th>Memory (GB)</th>
+                                <th>Used (GB)</th>
+                                <th>Drain</th>
+                                <th>Hosts Freed</th>
+                                <th>vCPUs Freed</th>
+                                <th>Memory Freed</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+{rows}                        </tbody>
+                    </table>
+                </div>
+                <div class="assumptions-note">
+                    All VMs of a host migrate together and the host is free once they have moved. Hosts are drained in
+                    {settings['lanes']} parallel lanes at {settings['rate_mbps']:,.0f} MB/s each, cheapest first: transfer time
+                    of the used storage plus {settings['overhead_minutes']} minutes per VM, weighted by the host's most
+                    complex VM ({weights}).
+                </div>
+            </div>
+'''
+
+
+def generate_rules_table(rules, rule_counts):
+    """Generate the table of active classification rules and how many VMs each matched."""
+    rows = ''
+    for rule_set, title in [('size', 'Size'), ('complexity', 'Complexity')]:
+        counts = rule_counts.get(rule_set, {})
+        for rule in rules.get(rule_set, []):
+            rows += f'''                        <tr>
+                            <td>{title}</td>
+                            <td><strong>{rule.get('name', '')}</strong></td>
+                            <td><code>{html.escape(rule.get('when', ''))}</code></td>
+                            <td>{rule.get('category', '')}</td>
+                            <td>{counts.get(rule.get('name'), 0)}</td>
+                        </tr>
+'''
+    
+    return f'''            <div class="table-container">
+                <div class="table-header">
+                    <div class="table-title">Classification Rules <span class="text-muted">({rules.get('source', '')}, first match wins)</span></div>
+                </div>
+                <div class="table-wrapper">
+                    <table id="classification-rules-table">
+                        <thead>
+                            <tr>
+                                <th>Rule Set</th>
+                                <th>Rule</th>
+                                <th>Condition</th>
+                                <th>Category</th>
+                                <th>VMs</th>
+                            </tr>
+                        </thead>
+                        <tbody>
 {rows}                        </tbody>
                     </table>
                 </div>
@@ -168,12 +381,71 @@ def generate_tab_migration(data):
     distributions = data.get('distributions', {})
     waves = data.get('migration_waves', [])
     
-    html = generate_complexity_cards(distributions)
-    html += generate_charts_section()
-    html += generate_migration_waves_table(waves)
-    html += generate_checklist()
+    content = generate_complexity_cards(distributions)
+    content += generate_charts_section()
+    content += generate_migration_waves_table(waves, data.get('wave_plan'))
+    content += generate_schedule_section(data.get('migration_schedule'), waves)
+    content += generate_host_drain_section(data.get('host_drain'))
+    if data.get('classification_rules'):
+        content += generate_rules_table(data['classification_rules'], data.get('rule_counts', {}))
+    content += generate_checklist()
     
-    return html
+    return content
+
+
+def get_schedule_chart_data(schedule):
+    """
+    Gantt data for the simulated schedule: one bar per wave, and per wave the
+    GANTT_MAX_VMS VMs that finish last, in start order.
+    """
+    if not schedule or not schedule['waves']:
+        return None
+    vms = schedule['vms']
+    by_wave = {}
+    for index, wave in enumerate(vms['waves']):
+        by_wave.setdefault(wave, []).append(index)
+    
+    vm_bars = {}
+    for wave, indices in by_wave.items():
+        shown = sorted(indices, key=lambda i: vms['finish_hours'][i])[-GANTT_MAX_VMS:]
+        shown.sort(key=lambda i: vms['start_hours'][i])
+        vm_bars[wave] = {
+            'total': len(indices),
+            'names': [vms['names'][i] for i in shown],
+            'start': [vms['start_hours'][i] for i in shown],
+            'finish': [vms['finish_hours'][i] for i in shown]
+        }
+    
+    return {
+        'waves': [
+            {'label': f"Wave {wave['wave']}", 'start': wave['start_hours'], 'finish': wave['finish_hours']}
+            for wave in schedule['waves']
+        ],
+        'vms': vm_bars
+    }
+
+
+def get_host_drain_chart_data(drain):
+    """Host drain curve as percentages of hosts, vCPUs and memory freed over time."""
+    if not drain:
+        return None
+    curve = drain['curve']
+    totals = drain['totals']
+    count = len(curve['hours'])
+    step = max(1, -(-count // DRAIN_CURVE_POINTS))
+    points = list(range(step - 1, count, step))
+    if points[-1] != count - 1:
+        points.append(count - 1)
+    
+    def percent(value, total):
+        return round(value / total * 100, 1) if total else 0
+    
+    return {
+        'hours': [curve['hours'][i] for i in points],
+        'hosts': [percent(i + 1, totals['hosts']) for i in points],
+        'vcpus': [percent(curve['vcpus'][i], totals['vcpus']) for i in points],
+        'memory': [percent(curve['memory_gb'][i], totals['memory_gb']) for i in points]
+    }
 
 
 def get_migration_chart_configs(data):
@@ -196,6 +468,8 @@ def get_migration_chart_configs(data):
     wave_memory = [w.get('memory_gb', 0) for w in waves]
     
     return {
+        'schedule': get_schedule_chart_data(data.get('migration_schedule')),
+        'host_drain': get_host_drain_chart_data(data.get('host_drain')),
         'complexity_os': {
             'labels': os_types,
             'low': low_values,
@@ -227,5 +501,5 @@ if __name__ == '__main__':
         }
     }
     
-    html = generate_tab_migration(mock_data)
-    print(f"Migration tab HTML generated: {len(html)} characters")
+    page = generate_tab_migration(mock_data)
+    print(f"Migration tab HTML generated: {len(page)} characters")
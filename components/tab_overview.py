@@ -93,6 +93,65 @@ def generate_charts_section():
 '''
 
 
+def generate_environment_comparison(environments):
+    """Generate the side-by-side environment comparison table and chart."""
+    rows = ''
+    for env in environments:
+        stats = env.get('stats', {})
+        complexity = env.get('distributions', {}).get('complexity', {})
+        waves = {w.get('wave'): w.get('vm_count', 0) for w in env.get('migration_waves', [])}
+        wave_cells = ''.join(f'<td>{waves.get(wave, 0)}</td>' for wave in [1, 2, 3, 4])
+        rows += f'''                        <tr data-environment="{env.get('name', '')}">
+                            <td><strong>{env.get('name', '')}</strong><br><span class="text-muted">{env.get('source', '')}</span></td>
+                            <td>{stats.get('total_vms', 0):,}</td>
+                            <td>{stats.get('running_vms', 0):,}</td>
+                            <td>{stats.get('clusters', 0)} / {stats.get('hosts', 0)}</td>
+                            <td>{stats.get('total_vcpus', 0):,}</td>
+                            <td>{stats.get('total_memory_gb', 0):,}</td>
+                            <td>{stats.get('total_storage_used_gb', 0):,.0f} / {stats.get('total_storage_provisioned_gb', 0):,.0f}</td>
+                            <td>{complexity.get('Low', 0)} / {complexity.get('Medium', 0)} / {complexity.get('High', 0)}</td>
+                            {wave_cells}
+                        </tr>
+'''
+    
+    return f'''            <div class="charts-grid">
+                <div class="chart-card full-width">
+                    <div class="chart-title">Environment Comparison</div>
+                    <div class="chart-container">
+                        <canvas id="chart-environments"></canvas>
+                    </div>
+                </div>
+            </div>
+            <div class="table-container">
+                <div class="table-header">
+                    <div class="table-title">Environment Comparison</div>
+                </div>
+                <div class="table-wrapper">
+                    <table id="environment-table">
+                        <thead>
+                            <tr>
+                                <th>Environment</th>
+                                <th>VMs</th>
+                                <th>Running</th>
+                                <th>Clusters / Hosts</th>
+                                <th>vCPUs</th>
+                                <th>Memory (GB)</th>
+                                <th>Storage Used / Provisioned (GB)</th>
+                                <th>Complexity L / M / H</th>
+                                <th>Wave 1</th>
+                                <th>Wave 2</th>
+                                <th>Wave 3</th>
+                                <th>Wave 4</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+{rows}                        </tbody>
+                    </table>
+                </div>
+            </div>
+'''
+
+
 def generate_tab_overview(data):
     """
     Generate complete HTML for the Overview tab.
@@ -106,6 +165,8 @@ def generate_tab_overview(data):
     stats = data.get('stats', {})
     
     html = generate_stat_cards(stats)
+    if data.get('environments'):
+        html += generate_environment_comparison(data['environments'])
     html += generate_charts_section()
     
     return html
@@ -131,24 +192,11 @@ def get_overview_chart_configs(data):
     complexity_data = distributions.get('complexity', {})
     complexity_values = [complexity_data.get(c, 0) for c in complexity_order]
     
-    # Cluster data
-    cluster_data = distributions.get('by_cluster', {})
-    cluster_names = list(cluster_data.keys())
-    cluster_vms = [cluster_data[c].get('vm_count', 0) for c in cluster_names]
-    cluster_vcpus = [cluster_data[c].get('num_of_cpus', 0) for c in cluster_names]
-    cluster_memory = [cluster_data[c].get('mem_size_GB', 0) for c in cluster_names]
-    
-    # Host data
-    host_data = distributions.get('by_host', {})
-    host_names = list(host_data.keys())
-    host_vms = [host_data[h].get('vm_count', 0) for h in host_names]
-    host_vcpus = [host_data[h].get('num_of_cpus', 0) for h in host_names]
-    host_memory = [host_data[h].get('mem_size_GB', 0) for h in host_names]
+    # Cluster, host and guest OS charts are filled in the browser from the filter
+    # engine (top-N bucketed), so they have no static config
     
-    # Guest OS consolidated data
-    os_consolidated = distributions.get('os_consolidated', {})
-    os_names = list(os_consolidated.keys())
-    os_counts = list(os_consolidated.values())
+    # Environment comparison (multi-environment dashboards only)
+    environments = data.get('environments', [])
     
     return {
         'os_family': {
@@ -163,21 +211,11 @@ def get_overview_chart_configs(data):
             'labels': complexity_order,
             'values': complexity_values
         },
-        'cluster': {
-            'labels': cluster_names,
-            'vms': cluster_vms,
-            'vcpus': cluster_vcpus,
-            'memory': cluster_memory
-        },
-        'host': {
-            'labels': host_names,
-            'vms': host_vms,
-            'vcpus': host_vcpus,
-            'memory': host_memory
-        },
-        'guest_os': {
-            'labels': os_names,
-            'values': os_counts
+        'environments': {
+            'labels': [env['name'] for env in environments],
+            'vms': [env['stats'].get('total_vms', 0) for env in environments],
+            'vcpus': [env['stats'].get('total_vcpus', 0) for env in environments],
+            'memory': [env['stats'].get('total_memory_gb', 0) for env in environments]
         }
     }
 
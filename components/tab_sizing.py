@@ -2,9 +2,16 @@
 tab_sizing.py
 -------------
 Tab 2: Sizing Analysis
-Displays VM sizing details, categories, and resource requirements.
+Displays VM sizing details, categories, resource requirements, and the
+storage domain analysis with its PVC capacity plan.
 """
 
+import html
+
+
+# Storage domains in the provisioned vs used chart (largest transfer first)
+STORAGE_CHART_DOMAINS = 20
+
 
 def generate_stat_cards(stats):
     """Generate the sizing stat cards HTML."""
@@ -81,6 +88,110 @@ def generate_size_details_table(size_details):
 '''
 
 
+def generate_storage_section(storage_plan):
+    """Generate the storage domain chart and tables and the PVC capacity plan."""
+    if not storage_plan or not storage_plan['domains']:
+        return ''
+    totals = storage_plan['totals']
+    
+    domain_rows = ''
+    for domain in storage_plan['domains']:
+        domain_rows += f'''                        <tr>
+                            <td><strong>{html.escape(domain['domain'])}</strong></td>
+                            <td><code>{html.escape(domain['storage_class'])}</code></td>
+                            <td>{domain['vm_count']:,}</td>
+                            <td>{domain['provisioned_gb']:,.0f}</td>
+                            <td>{domain['used_gb']:,.0f}</td>
+                            <td>{domain['used_pct']}%</td>
+                            <td>{domain['rate_mbps']:,.0f} MB/s</td>
+                            <td>{domain['hours']:,.1f} h</td>
+                        </tr>
+'''
+    
+    class_rows = ''
+    for storage_class in storage_plan['classes']:
+        backing = 'used' if storage_class['thin'] else 'requested'
+        class_rows += f'''                        <tr>
+                            <td><strong>{html.escape(storage_class['label'])}</strong><br><code>{html.escape(storage_class['name'])}</code></td>
+                            <td>{storage_class['volume_mode']}</td>
+                            <td>{storage_class['domains']}</td>
+                            <td>{storage_class['vm_count']:,}</td>
+                            <td>{storage_class['requested_gb']:,.0f}</td>
+                            <td>{storage_class['raw_gb']:,.0f} <span class="text-muted">({backing} × {storage_class['replicas']:g})</span></td>
+                            <td>{storage_class['throughput_mbps']:,.0f} MB/s</td>
+                            <td>{storage_class['hours']:,.1f} h</td>
+                        </tr>
+'''
+    
+    return f'''            <div class="charts-grid">
+                <div class="chart-card full-width">
+                    <div class="chart-title">Storage by Domain (GB)</div>
+                    <div class="chart-container">
+                        <canvas id="chart-storage-domains"></canvas>
+                    </div>
+                </div>
+            </div>
+            <div class="table-container">
+                <div class="table-header">
+                    <div class="table-title">Storage Domains <span class="text-muted">({totals['domains']} domains, {totals['used_gb']:,.0f} of {totals['provisioned_gb']:,.0f} GB used)</span></div>
+                </div>
+                <div class="table-wrapper">
+                    <table id="storage-domains-table">
+                        <thead>
+                            <tr>
+                                <th>Storage Domain</th>
+                                <th>Storage Class</th>
+                                <th>VMs</th>
+                                <th>Provisioned (GB)</th>
+                                <th>Used (GB)</th>
+                                <th>Used</th>
+                                <th>Throughput</th>
+                                <th>Transfer Time</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+{domain_rows}                        </tbody>
+                    </table>
+                </div>
+                <div class="assumptions-note">
+                    Transfer time copies the used storage at the slower of the domain's read bandwidth
+                    ({storage_plan['domain_bandwidth_mbps']:,} MB/s) and its storage class's write throughput, as if
+                    the domain migrated alone.
+                </div>
+            </div>
+            <div class="table-container">
+                <div class="table-header">
+                    <div class="table-title">PVC Capacity Plan <span class="text-muted">({totals['requested_gb']:,.0f} GB requested, {totals['raw_gb']:,.0f} GB raw; at least {totals['hours']:,.1f} h of transfer)</span></div>
+                </div>
+                <div class="table-wrapper">
+                    <table id="pvc-plan-table">
+                        <thead>
+                            <tr>
+                                <th>Storage Class</th>
+                                <th>Volume Mode</th>
+                                <th>Domains</th>
+                                <th>VMs</th>
+                                <th>Requested (GB)</th>
+                                <th>Raw Capacity (GB)</th>
+                                <th>Throughput</th>
+                                <th>Transfer Time</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+{class_rows}                        </tbody>
+                    </table>
+                </div>
+                <div class="assumptions-note">
+                    Storage domains map to storage classes through {storage_plan['source']}. PVCs request the
+                    provisioned disk size, plus {storage_plan['filesystem_overhead'] * 100:g}% filesystem overhead on
+                    Filesystem volume mode; raw capacity is the used (thin) or requested storage times the backend
+                    replicas. The domains of a storage class share its write throughput, and storage classes
+                    migrate in parallel.
+                </div>
+            </div>
+'''
+
+
 def generate_charts_section():
     """Generate the chart containers for the sizing tab."""
     return '''            <div class="charts-grid">
@@ -113,11 +224,12 @@ def generate_tab_sizing(data):
     stats = data.get('stats', {})
     size_details = data.get('size_details', [])
     
-    html = generate_stat_cards(stats)
-    html += generate_charts_section()
-    html += generate_size_details_table(size_details)
+    content = generate_stat_cards(stats)
+    content += generate_charts_section()
+    content += generate_size_details_table(size_details)
+    content += generate_storage_section(data.get('storage_plan'))
     
-    return html
+    return content
 
 
 def get_sizing_chart_configs(data):
@@ -131,7 +243,15 @@ def get_sizing_chart_configs(data):
     vcpus = [d.get('total_vcpus', 0) for d in size_details]
     memory = [d.get('total_memory', 0) for d in size_details]
     
+    storage_plan = data.get('storage_plan') or {}
+    domains = storage_plan.get('domains', [])[:STORAGE_CHART_DOMAINS]
+    
     return {
+        'storage_domains': {
+            'labels': [d['domain'] for d in domains],
+            'provisioned': [d['provisioned_gb'] for d in domains],
+            'used': [d['used_gb'] for d in domains]
+        },
         'size_pie': {
             'labels': labels,
             'values': vm_counts
@@ -161,5 +281,5 @@ if __name__ == '__main__':
         ]
     }
     
-    html = generate_tab_sizing(mock_data)
-    print(f"Sizing tab HTML generated: {len(html)} characters")
+    page = generate_tab_sizing(mock_data)
+    print(f"Sizing tab HTML generated: {len(page)} characters")
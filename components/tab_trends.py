@@ -70,6 +70,32 @@ def generate_charts_section():
 '''
 
 
+def generate_history_section(history):
+    """Generate the observed capacity charts backed by the snapshot store."""
+    if not history:
+        return ''
+    
+    dates = history.get('total', {}).get('dates', [])
+    first = dates[0] if dates else 'N/A'
+    last = dates[-1] if dates else 'N/A'
+    
+    return f'''            <div class="charts-grid">
+                <div class="chart-card full-width">
+                    <div class="chart-title">Observed Capacity Over Time ({history.get('runs', 0)} snapshots, {first} → {last})</div>
+                    <div class="chart-container">
+                        <canvas id="chart-history-capacity"></canvas>
+                    </div>
+                </div>
+                <div class="chart-card full-width">
+                    <div class="chart-title">VM Churn Per Snapshot (Added / Removed / Modified)</div>
+                    <div class="chart-container">
+                        <canvas id="chart-history-churn"></canvas>
+                    </div>
+                </div>
+            </div>
+'''
+
+
 def generate_tab_trends(data):
     """
     Generate complete HTML for the Growth Trends tab.
@@ -84,6 +110,7 @@ def generate_tab_trends(data):
     
     html = generate_stat_cards(stats)
     html += generate_charts_section()
+    html += generate_history_section(data.get('snapshot_history'))
     
     return html
 
@@ -93,13 +120,15 @@ def get_trends_chart_configs(data):
     Generate JavaScript chart configuration objects for Trends tab.
     """
     trends = data.get('growth_trends', {})
+    history = data.get('snapshot_history')
     
     if not trends:
         return {
             'vm_growth': {'labels': [], 'values': []},
             'resource_growth': {'labels': [], 'vcpus': [], 'memory': []},
             'vms_per_month': {'labels': [], 'values': []},
-            'resources_per_month': {'labels': [], 'vcpus': [], 'memory': []}
+            'resources_per_month': {'labels': [], 'vcpus': [], 'memory': []},
+            'history': history
         }
     
     return {
@@ -120,7 +149,8 @@ def get_trends_chart_configs(data):
             'labels': trends.get('months', []),
             'vcpus': trends.get('monthly_vcpus', []),
             'memory': trends.get('monthly_memory', [])
-        }
+        },
+        'history': history
     }
 
 
@@ -5,11 +5,23 @@ Loads RHV Excel export and transforms data for dashboard generation.
 All tabs consume data from this module.
 """
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from collections import defaultdict
+import os
 import re
 
+from rules import load_rules, apply_rules, describe_rules, describe_size_ranges
+from placement import vm_shapes, simulate_placement
+from forecast import simulate_forecast, fit_growth_models, build_forecast_lookup
+from node_catalog import load_catalog, optimize_node_costs
+from scenario_sweep import sweep_capacity
+from migration_sim import simulate_migration
+from wave_planner import plan_waves
+from host_drain import plan_host_drain
+from storage_domains import load_storage_map, plan_storage
+
 
 # Column mapping: expected name -> possible variations in Excel
 COLUMN_MAPPING = {
@@ -26,6 +38,81 @@ COLUMN_MAPPING = {
     'creation_date': ['creation_date', 'created', 'create_date']
 }
 
+# Dimensions of the aggregate table all dashboard aggregates are derived from
+AGGREGATE_DIMENSIONS = [
+    'cluster_name', 'vm_host', 'storage_pool_name', 'status', 'os_family', 'os_consolidated',
+    'size_category', 'complexity', 'size_rule', 'complexity_rule', 'month'
+]
+AGGREGATE_MEASURES = ['num_of_cpus', 'mem_size_GB', 'storage_size_GB', 'used_size_GB']
+
+# Browser filter cube: dashboard field -> aggregate table column
+CUBE_FIELDS = {
+    'cluster': 'cluster_name',
+    'host': 'vm_host',
+    'status': 'status',
+    'os_family': 'os_family',
+    'os_consolidated': 'os_consolidated',
+    'size_category': 'size_category',
+    'complexity': 'complexity',
+    'month': 'month'
+}
+CUBE_MEASURES = {
+    'count': 'vm_count',
+    'vcpus': 'num_of_cpus',
+    'memory_gb': 'mem_size_GB',
+    'storage_gb': 'storage_size_GB',
+    'used_gb': 'used_size_GB'
+}
+# Cuboids materialized for the browser. Every cuboid carries all filter fields;
+# creation month gets its own cuboid because host x month is the sparse corner.
+CUBE_CUBOIDS = [
+    ['cluster', 'host', 'status', 'os_family', 'os_consolidated', 'size_category', 'complexity'],
+    ['cluster', 'host', 'status', 'os_family', 'complexity', 'month']
+]
+
+# Cube size guard: above this many cells, or cells per VM, the dashboard scans VMs instead
+CUBE_MAX_CELLS = 50000
+CUBE_MAX_CELLS_PER_VM = 0.5
+
+# Suggested migration waves in order; os_family None matches every OS family.
+# Wave criteria are built from the complexity rules (see _wave_criteria).
+MIGRATION_WAVES = [
+    {
+        'wave': 1,
+        'name': 'Pilot - Low Complexity Linux',
+        'description': 'RHEL 8/9 VMs with standard sizing',
+        'complexity': 'Low',
+        'os_family': 'Linux'
+    },
+    {
+        'wave': 2,
+        'name': 'Linux Extended',
+        'description': 'RHEL 7 and large Linux VMs',
+        'complexity': 'Medium',
+        'os_family': 'Linux'
+    },
+    {
+        'wave': 3,
+        'name': 'Windows Standard',
+        'description': 'Windows VMs with standard sizing',
+        'complexity': 'Medium',
+        'os_family': 'Windows'
+    },
+    {
+        'wave': 4,
+        'name': 'High Complexity',
+        'description': 'Large Windows VMs requiring special attention',
+        'complexity': 'High',
+        'os_family': None
+    }
+]
+
+# Source columns compared between snapshots to detect modified VMs
+SNAPSHOT_COMPARE_COLUMNS = [
+    'cluster_name', 'storage_pool_name', 'guest_os', 'vm_host', 'status',
+    'mem_size_GB', 'num_of_cpus', 'storage_size_GB', 'used_size_GB', 'creation_date'
+]
+
 
 def find_column(df_columns, expected_name):
     """Find matching column from possible variations."""
@@ -62,6 +149,10 @@ def clean_data(df):
         mem_threshold = df['mem_size_GB'].quantile(0.99) * 10
         df = df[df['mem_size_GB'] <= mem_threshold]
     
+    # Older exports may not list the storage domain
+    if 'storage_pool_name' not in df.columns:
+        df['storage_pool_name'] = np.nan
+    
     # Ensure numeric columns
     df['mem_size_GB'] = pd.to_numeric(df['mem_size_GB'], errors='coerce').fillna(0).astype(int)
     df['num_of_cpus'] = pd.to_numeric(df['num_of_cpus'], errors='coerce').fillna(0).astype(int)
@@ -112,87 +203,142 @@ def get_consolidated_os(guest_os):
     return os_str
 
 
-def get_size_category(mem_gb, vcpus):
+def add_derived_fields(df, rules=None):
     """
-    Categorize VM by size.
-    Small: ≤8 GB RAM, ≤4 vCPU
-    Medium: ≤32 GB RAM, ≤8 vCPU
-    Large: ≤64 GB RAM, ≤16 vCPU
-    X-Large: >64 GB RAM or >16 vCPU
+    Add computed fields to dataframe.
+    Size category and complexity come from the classification rules
+    (rules.load_rules(), default_rules.toml unless another file is given).
     """
-    if mem_gb > 64 or vcpus > 16:
-        return 'X-Large'
-    if mem_gb > 32 or vcpus > 8:
-        return 'Large'
-    if mem_gb > 8 or vcpus > 4:
-        return 'Medium'
-    return 'Small'
+    if rules is None:
+        rules = load_rules()
+    
+    # OS parsing runs once per distinct guest OS string
+    guest_os = df['guest_os']
+    distinct = pd.Series(guest_os.dropna().unique())
+    df['os_family'] = guest_os.map(dict(zip(distinct, distinct.map(get_os_family)))).fillna('Unknown')
+    df['os_consolidated'] = guest_os.map(dict(zip(distinct, distinct.map(get_consolidated_os)))).fillna('Unknown')
+    
+    apply_rules(df, rules)
+    
+    storage = df['storage_size_GB'].to_numpy(dtype=float)
+    used = df['used_size_GB'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        efficiency = np.where(storage > 0, (used / storage) * 100, 0)
+    df['storage_efficiency'] = [round(value, 1) for value in efficiency.tolist()]
+    return df
 
 
-def get_migration_complexity(guest_os, os_family, mem_gb, vcpus):
+def compute_aggregates(df):
     """
-    Determine migration complexity.
-    Low: Linux VMs (RHEL 8/9) with standard sizing
-    Medium: Windows VMs, RHEL 7, or large VMs (>64GB or >16 vCPU)
-    High: Large Windows VMs (>64GB RAM or >16 vCPU)
+    Group VMs by every dashboard dimension into a compact aggregate table.
+    One row per distinct dimension combination with VM count and resource sums.
     """
-    is_large = mem_gb > 64 or vcpus > 16
-    is_rhel7 = 'rhel 7' in str(guest_os).lower() or 'rhel7' in str(guest_os).lower()
-    
-    if os_family == 'Windows':
-        if is_large:
-            return 'High'
-        return 'Medium'
-    
-    # Linux
-    if is_rhel7:
-        return 'Medium'
-    if is_large:
-        return 'Medium'
-    
-    return 'Low'
-
-
-def add_derived_fields(df):
-    """Add computed fields to dataframe."""
-    df['os_family'] = df['guest_os'].apply(get_os_family)
-    df['os_consolidated'] = df['guest_os'].apply(get_consolidated_os)
-    df['size_category'] = df.apply(lambda r: get_size_category(r['mem_size_GB'], r['num_of_cpus']), axis=1)
-    df['complexity'] = df.apply(
-        lambda r: get_migration_complexity(r['guest_os'], r['os_family'], r['mem_size_GB'], r['num_of_cpus']), 
-        axis=1
-    )
-    df['storage_efficiency'] = df.apply(
-        lambda r: round((r['used_size_GB'] / r['storage_size_GB']) * 100, 1) if r['storage_size_GB'] > 0 else 0,
-        axis=1
-    )
-    return df
+    months = df['creation_date'].dt.strftime('%Y-%m')
+    grouped = df.assign(month=months).groupby(AGGREGATE_DIMENSIONS, dropna=False, sort=False)
+    aggregates = grouped[AGGREGATE_MEASURES].sum()
+    aggregates.insert(0, 'vm_count', grouped.size())
+    return aggregates.reset_index()
+
+
+def merge_aggregates(*tables, subtract=()):
+    """Add (and optionally subtract) aggregate tables cell by cell."""
+    value_columns = ['vm_count'] + AGGREGATE_MEASURES
+    parts = [t for t in tables if len(t) > 0]
+    parts += [t.assign(**{c: -t[c] for c in value_columns}) for t in subtract if len(t) > 0]
+    if not parts:
+        return tables[0].iloc[0:0]
+    
+    merged = pd.concat(parts, ignore_index=True).groupby(
+        AGGREGATE_DIMENSIONS, dropna=False, sort=False
+    )[value_columns].sum().reset_index()
+    return merged[merged['vm_count'] > 0].reset_index(drop=True)
+
+
+def _cell_hashes(aggregates):
+    """Hash the dimension tuple of every aggregate cell into one uint64."""
+    return pd.util.hash_pandas_object(aggregates[AGGREGATE_DIMENSIONS], index=False).to_numpy()
+
+
+def index_aggregates(aggregates):
+    """Aggregate table indexed by its dimension tuple (hashed), one row per cell."""
+    return aggregates.set_axis(pd.Index(_cell_hashes(aggregates), name='cell'))
+
+
+def flatten_aggregates(cells):
+    """Plain aggregate table from an indexed one, without cells left empty by patches."""
+    return cells[cells['vm_count'] > 0].reset_index(drop=True)
+
+
+def patch_aggregates(cells, incoming=None, outgoing=None):
+    """
+    Add incoming and subtract outgoing aggregate rows on an indexed table.
+    
+    Only the touched cells are looked up (hash lookup on the dimension tuple)
+    and updated, and new combinations are appended, so the table is never
+    regrouped. Cells a patch empties stay as zero rows, where VMs moving back
+    land again, until they make up half of the table; flatten_aggregates()
+    leaves them out.
+    """
+    value_columns = ['vm_count'] + AGGREGATE_MEASURES
+    parts = [t for t in [incoming] if t is not None and len(t) > 0]
+    if outgoing is not None and len(outgoing) > 0:
+        parts.append(outgoing.assign(**{c: -outgoing[c] for c in value_columns}))
+    if not parts:
+        return cells
+    
+    delta = index_aggregates(pd.concat(parts, ignore_index=True).groupby(
+        AGGREGATE_DIMENSIONS, dropna=False, sort=False
+    )[value_columns].sum().reset_index())
+    position = cells.index.get_indexer(delta.index)
+    found = position >= 0
+    
+    values = {}
+    for column in value_columns:
+        values[column] = cells[column].to_numpy(copy=True)
+        values[column][position[found]] += delta[column].to_numpy()[found]
+    patched = cells.assign(**values)
+    
+    new_cells = delta[~found]
+    new_cells = new_cells[new_cells['vm_count'] > 0]
+    if len(new_cells) > 0:
+        patched = pd.concat([patched, new_cells])
+    
+    empty = patched['vm_count'].to_numpy() <= 0
+    if empty.sum() * 2 > len(patched):
+        patched = patched[~empty]
+    return patched
+
+
+def get_date_range(df):
+    """Return (first, last) VM creation dates, or None when no dates are known."""
+    dates = df['creation_date'].dropna()
+    if len(dates) == 0:
+        return None
+    return dates.min(), dates.max()
 
 
-def compute_statistics(df):
+def compute_statistics(aggregates, date_range=None):
     """Compute aggregate statistics for dashboard."""
+    status_counts = aggregates.groupby('status')['vm_count'].sum()
     stats = {
-        'total_vms': len(df),
-        'total_vcpus': int(df['num_of_cpus'].sum()),
-        'total_memory_gb': int(df['mem_size_GB'].sum()),
-        'total_storage_provisioned_gb': round(df['storage_size_GB'].sum(), 2),
-        'total_storage_used_gb': round(df['used_size_GB'].sum(), 2),
-        'clusters': df['cluster_name'].nunique(),
-        'hosts': df['vm_host'].nunique(),
-        'running_vms': len(df[df['status'] == 'On']),
-        'stopped_vms': len(df[df['status'] == 'Off']),
+        'total_vms': int(aggregates['vm_count'].sum()),
+        'total_vcpus': int(aggregates['num_of_cpus'].sum()),
+        'total_memory_gb': int(aggregates['mem_size_GB'].sum()),
+        'total_storage_provisioned_gb': round(float(aggregates['storage_size_GB'].sum()), 2),
+        'total_storage_used_gb': round(float(aggregates['used_size_GB'].sum()), 2),
+        'clusters': int(aggregates['cluster_name'].nunique()),
+        'hosts': int(aggregates['vm_host'].nunique()),
+        'running_vms': int(status_counts.get('On', 0)),
+        'stopped_vms': int(status_counts.get('Off', 0)),
     }
     
     # Date statistics
-    valid_dates = df[df['creation_date'].notna()]['creation_date']
-    if len(valid_dates) > 0:
-        stats['first_vm_date'] = valid_dates.min().strftime('%Y-%m-%d')
-        stats['last_vm_date'] = valid_dates.max().strftime('%Y-%m-%d')
+    if date_range is not None:
+        stats['first_vm_date'] = date_range[0].strftime('%Y-%m-%d')
+        stats['last_vm_date'] = date_range[1].strftime('%Y-%m-%d')
         
         # Monthly VM creation stats
-        df_with_dates = df[df['creation_date'].notna()].copy()
-        df_with_dates['month'] = df_with_dates['creation_date'].dt.to_period('M')
-        monthly_counts = df_with_dates.groupby('month').size()
+        monthly_counts = aggregates.groupby('month')['vm_count'].sum()
         
         if len(monthly_counts) > 0:
             stats['avg_vms_per_month'] = round(monthly_counts.mean(), 1)
@@ -202,148 +348,156 @@ def compute_statistics(df):
     return stats
 
 
-def compute_distributions(df):
+def _count_by(aggregates, column):
+    """Sum VM counts per value of one dimension, largest first."""
+    counts = aggregates.groupby(column)['vm_count'].sum()
+    return counts.sort_values(ascending=False, kind='stable').to_dict()
+
+
+def compute_distributions(aggregates):
     """Compute distribution data for charts."""
     distributions = {}
     
     # OS Family distribution
-    distributions['os_family'] = df['os_family'].value_counts().to_dict()
+    distributions['os_family'] = _count_by(aggregates, 'os_family')
     
     # Consolidated OS distribution
-    distributions['os_consolidated'] = df['os_consolidated'].value_counts().to_dict()
+    distributions['os_consolidated'] = _count_by(aggregates, 'os_consolidated')
     
     # Size category distribution
-    distributions['size_category'] = df['size_category'].value_counts().to_dict()
+    distributions['size_category'] = _count_by(aggregates, 'size_category')
     
     # Complexity distribution
-    distributions['complexity'] = df['complexity'].value_counts().to_dict()
+    distributions['complexity'] = _count_by(aggregates, 'complexity')
     
     # Status distribution
-    distributions['status'] = df['status'].value_counts().to_dict()
+    distributions['status'] = _count_by(aggregates, 'status')
     
     # Cluster distribution
-    cluster_stats = df.groupby('cluster_name').agg({
-        'vm_name': 'count',
-        'num_of_cpus': 'sum',
-        'mem_size_GB': 'sum',
-        'storage_size_GB': 'sum',
-        'used_size_GB': 'sum'
-    }).rename(columns={'vm_name': 'vm_count'})
+    cluster_stats = aggregates.groupby('cluster_name')[
+        ['vm_count', 'num_of_cpus', 'mem_size_GB', 'storage_size_GB', 'used_size_GB']
+    ].sum()
     distributions['by_cluster'] = cluster_stats.to_dict('index')
     
     # Host distribution
-    host_stats = df.groupby('vm_host').agg({
-        'vm_name': 'count',
-        'num_of_cpus': 'sum',
-        'mem_size_GB': 'sum'
-    }).rename(columns={'vm_name': 'vm_count'})
+    host_stats = aggregates.groupby('vm_host')[['vm_count', 'num_of_cpus', 'mem_size_GB']].sum()
     distributions['by_host'] = host_stats.to_dict('index')
     
+    # Storage domain distribution (provisioned vs used)
+    domain_stats = aggregates.assign(
+        storage_pool_name=aggregates['storage_pool_name'].fillna('Unknown')
+    ).groupby('storage_pool_name')[['vm_count', 'storage_size_GB', 'used_size_GB']].sum()
+    distributions['by_storage_domain'] = domain_stats.to_dict('index')
+    
     return distributions
 
 
-def compute_size_category_details(df):
-    """Compute detailed breakdown by size category."""
-    size_order = ['Small', 'Medium', 'Large', 'X-Large']
-    size_specs = {
-        'Small': {'cpu_range': '≤4', 'mem_range': '≤8 GB'},
-        'Medium': {'cpu_range': '≤8', 'mem_range': '≤32 GB'},
-        'Large': {'cpu_range': '≤16', 'mem_range': '≤64 GB'},
-        'X-Large': {'cpu_range': '>16', 'mem_range': '>64 GB'}
-    }
+def compute_size_category_details(aggregates, rules=None):
+    """
+    Compute detailed breakdown by size category.
+    Categories and their vCPU / memory ranges come from the size rules,
+    smallest first (reverse rule order), then any category no rule assigns.
+    """
+    if rules is None:
+        rules = load_rules()
+    size_ranges = describe_size_ranges(rules)
+    by_size = aggregates.groupby('size_category')[['vm_count'] + AGGREGATE_MEASURES].sum()
+    size_order = list(size_ranges)[::-1] + [size for size in by_size.index if size not in size_ranges]
     
     details = []
     for size in size_order:
-        subset = df[df['size_category'] == size]
-        if len(subset) > 0:
+        if size in by_size.index and by_size.at[size, 'vm_count'] > 0:
+            subset = by_size.loc[size]
+            labels = size_ranges.get(size, {})
             details.append({
                 'category': size,
-                'cpu_range': size_specs[size]['cpu_range'],
-                'mem_range': size_specs[size]['mem_range'],
-                'vm_count': len(subset),
-                'total_vcpus': int(subset['num_of_cpus'].sum()),
-                'total_memory': int(subset['mem_size_GB'].sum()),
-                'total_storage': round(subset['storage_size_GB'].sum(), 2)
+                'cpu_range': labels.get('cpu_range') or '—',
+                'mem_range': labels.get('mem_range') or '—',
+                'vm_count': int(subset['vm_count']),
+                'total_vcpus': int(subset['num_of_cpus']),
+                'total_memory': int(subset['mem_size_GB']),
+                'total_storage': round(float(subset['storage_size_GB']), 2)
             })
     
     return details
 
 
-def compute_migration_waves(df):
-    """Generate suggested migration waves."""
+def _wave_totals(subset):
+    """Sum VM count, vCPUs and memory for the aggregate cells of one wave."""
+    return {
+        'vm_count': int(subset['vm_count'].sum()),
+        'vcpus': int(subset['num_of_cpus'].sum()),
+        'memory_gb': int(subset['mem_size_GB'].sum())
+    }
+
+
+def _wave_masks(frame):
+    """Boolean mask per entry of MIGRATION_WAVES over aggregate cells or VM rows."""
+    masks = []
+    for wave in MIGRATION_WAVES:
+        mask = frame['complexity'] == wave['complexity']
+        if wave['os_family'] is not None:
+            mask &= frame['os_family'] == wave['os_family']
+        masks.append(mask)
+    return masks
+
+
+def _wave_criteria(wave, subset, rules):
+    """Wave criteria: OS family, complexity and the conditions of the complexity rules that fired."""
+    fired = set(subset.loc[subset['vm_count'] > 0, 'complexity_rule'])
+    conditions = []
+    for entry in rules['complexity']:
+        if entry['name'] in fired and entry['when'] and entry['when'] not in conditions:
+            conditions.append(entry['when'])
+    criteria = f"{wave['os_family'] or 'Any OS'}, {wave['complexity']} complexity"
+    return f"{criteria} ({'; '.join(conditions)})" if conditions else criteria
+
+
+def compute_migration_waves(aggregates, rules=None):
+    """Generate suggested migration waves (criteria from the complexity rules)."""
+    if rules is None:
+        rules = load_rules()
     waves = []
-    
-    # Wave 1: Low complexity Linux VMs (RHEL 8/9, small/medium)
-    wave1 = df[(df['complexity'] == 'Low') & (df['os_family'] == 'Linux')]
-    if len(wave1) > 0:
-        waves.append({
-            'wave': 1,
-            'name': 'Pilot - Low Complexity Linux',
-            'description': 'RHEL 8/9 VMs with standard sizing',
-            'criteria': 'Linux, Low complexity, Small/Medium size',
-            'vm_count': len(wave1),
-            'vcpus': int(wave1['num_of_cpus'].sum()),
-            'memory_gb': int(wave1['mem_size_GB'].sum())
-        })
-    
-    # Wave 2: Medium complexity Linux (RHEL 7, large Linux)
-    wave2 = df[(df['complexity'] == 'Medium') & (df['os_family'] == 'Linux')]
-    if len(wave2) > 0:
-        waves.append({
-            'wave': 2,
-            'name': 'Linux Extended',
-            'description': 'RHEL 7 and large Linux VMs',
-            'criteria': 'Linux, Medium complexity (RHEL 7 or >64GB/>16 vCPU)',
-            'vm_count': len(wave2),
-            'vcpus': int(wave2['num_of_cpus'].sum()),
-            'memory_gb': int(wave2['mem_size_GB'].sum())
-        })
-    
-    # Wave 3: Medium complexity Windows (standard Windows)
-    wave3 = df[(df['complexity'] == 'Medium') & (df['os_family'] == 'Windows')]
-    if len(wave3) > 0:
-        waves.append({
-            'wave': 3,
-            'name': 'Windows Standard',
-            'description': 'Windows VMs with standard sizing',
-            'criteria': 'Windows, ≤64GB RAM, ≤16 vCPU',
-            'vm_count': len(wave3),
-            'vcpus': int(wave3['num_of_cpus'].sum()),
-            'memory_gb': int(wave3['mem_size_GB'].sum())
-        })
-    
-    # Wave 4: High complexity (large Windows)
-    wave4 = df[df['complexity'] == 'High']
-    if len(wave4) > 0:
-        waves.append({
-            'wave': 4,
-            'name': 'High Complexity',
-            'description': 'Large Windows VMs requiring special attention',
-            'criteria': 'Windows, >64GB RAM or >16 vCPU',
-            'vm_count': len(wave4),
-            'vcpus': int(wave4['num_of_cpus'].sum()),
-            'memory_gb': int(wave4['mem_size_GB'].sum())
-        })
+    for wave, mask in zip(MIGRATION_WAVES, _wave_masks(aggregates)):
+        subset = aggregates[mask]
+        if subset['vm_count'].sum() > 0:
+            waves.append({
+                'wave': wave['wave'],
+                'name': wave['name'],
+                'description': wave['description'],
+                'criteria': _wave_criteria(wave, subset, rules),
+                **_wave_totals(subset)
+            })
     
     return waves
 
 
-def compute_growth_trends(df):
+def migration_wave_numbers(df):
+    """Suggested wave per VM (0 for VMs outside the waves)."""
+    masks = _wave_masks(df)
+    return pd.Series(
+        np.select([m.to_numpy(dtype=bool) for m in masks], [w['wave'] for w in MIGRATION_WAVES], 0),
+        index=df.index
+    )
+
+
+def migration_transfers(df):
+    """Per-VM transfer list for the migration simulator and wave planner."""
+    columns = [
+        'vm_name', 'cluster_name', 'vm_host', 'storage_pool_name', 'complexity', 'os_family',
+        'num_of_cpus', 'mem_size_GB', 'used_size_GB'
+    ]
+    return df[columns].assign(wave=migration_wave_numbers(df))
+
+
+def compute_growth_trends(aggregates):
     """Compute historical growth data for trend charts."""
-    df_dated = df[df['creation_date'].notna()].copy()
-    if len(df_dated) == 0:
+    dated = aggregates[aggregates['month'].notna()]
+    if dated['vm_count'].sum() == 0:
         return None
     
-    df_dated = df_dated.sort_values('creation_date')
-    df_dated['month'] = df_dated['creation_date'].dt.to_period('M')
-    
     # Monthly aggregations
-    monthly = df_dated.groupby('month').agg({
-        'vm_name': 'count',
-        'num_of_cpus': 'sum',
-        'mem_size_GB': 'sum',
-        'storage_size_GB': 'sum'
-    }).rename(columns={'vm_name': 'vm_count'})
+    monthly = dated.groupby('month')[['vm_count', 'num_of_cpus', 'mem_size_GB', 'storage_size_GB']].sum()
     
     # Cumulative values
     monthly['cumulative_vms'] = monthly['vm_count'].cumsum()
@@ -364,67 +518,351 @@ def compute_growth_trends(df):
     return trends
 
 
-def compute_complexity_by_os(df):
+def compute_complexity_by_os(aggregates):
     """Compute complexity breakdown by OS type for stacked chart."""
+    counts = aggregates.groupby(['os_consolidated', 'complexity'])['vm_count'].sum()
     result = {}
-    for os_type in df['os_consolidated'].unique():
-        subset = df[df['os_consolidated'] == os_type]
+    for os_type in aggregates['os_consolidated'].dropna().unique():
         result[os_type] = {
-            'Low': len(subset[subset['complexity'] == 'Low']),
-            'Medium': len(subset[subset['complexity'] == 'Medium']),
-            'High': len(subset[subset['complexity'] == 'High'])
+            'Low': int(counts.get((os_type, 'Low'), 0)),
+            'Medium': int(counts.get((os_type, 'Medium'), 0)),
+            'High': int(counts.get((os_type, 'High'), 0))
         }
     return result
 
 
 def prepare_vm_list(df):
     """Prepare VM list for inventory table (as list of dicts)."""
-    vm_list = []
-    for _, row in df.iterrows():
-        vm_list.append({
-            'vm_name': str(row['vm_name']),
-            'cluster': str(row['cluster_name']),
-            'guest_os': str(row['guest_os']),
-            'host': str(row['vm_host']),
-            'status': str(row['status']),
-            'memory_gb': int(row['mem_size_GB']),
-            'vcpus': int(row['num_of_cpus']),
-            'storage_gb': round(row['storage_size_GB'], 2),
-            'used_gb': round(row['used_size_GB'], 2),
-            'utilization': round(row['storage_efficiency'], 1),
-            'size_category': row['size_category'],
-            'complexity': row['complexity'],
-            'os_family': row['os_family'],
-            'os_consolidated': row['os_consolidated'],
-            'creation_date': row['creation_date'].strftime('%Y-%m-%d') if pd.notna(row['creation_date']) else ''
-        })
-    return vm_list
-
-
-def process_excel(filepath):
+    columns = {
+        'vm_name': df['vm_name'].map(str),
+        'cluster': df['cluster_name'].fillna('').map(str),
+        'guest_os': df['guest_os'].fillna('').map(str),
+        'host': df['vm_host'].fillna('').map(str),
+        'status': df['status'].fillna('').map(str),
+        'storage_domain': df['storage_pool_name'].fillna('').map(str),
+        'memory_gb': df['mem_size_GB'].astype(int),
+        'vcpus': df['num_of_cpus'].astype(int),
+        'storage_gb': df['storage_size_GB'].round(2),
+        'used_gb': df['used_size_GB'].round(2),
+        'utilization': df['storage_efficiency'].round(1),
+        'size_category': df['size_category'],
+        'complexity': df['complexity'],
+        'size_rule': df['size_rule'],
+        'complexity_rule': df['complexity_rule'],
+        'os_family': df['os_family'],
+        'os_consolidated': df['os_consolidated'],
+        'creation_date': df['creation_date'].dt.strftime('%Y-%m-%d').fillna('')
+    }
+    keys = list(columns)
+    rows = zip(*(series.tolist() for series in columns.values()))
+    return [dict(zip(keys, values)) for values in rows]
+
+
+def snapshot_keys(df):
+    """Join key for snapshots: vm_name, suffixed with an occurrence number for duplicate names."""
+    names = df['vm_name'].map(str).reset_index(drop=True)
+    duplicated = names.duplicated()
+    if duplicated.any():
+        occurrence = names.groupby(names).cumcount()
+        names = names.where(~duplicated, names + '\x1f' + occurrence.astype(str))
+    return pd.Index(names)
+
+
+def _row_hashes(df, columns):
+    """Hash the compared source columns of every row into one uint64 per VM."""
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+def build_snapshot(df, aggregates, rules=None):
+    """Bundle a processed frame with its aggregates and join/hash indexes."""
+    if rules is None:
+        rules = load_rules()
+    columns = [c for c in SNAPSHOT_COMPARE_COLUMNS if c in df.columns]
+    return {
+        'df': df,
+        'cells': index_aggregates(aggregates),
+        'keys': snapshot_keys(df),
+        'hash_columns': columns,
+        'row_hashes': _row_hashes(df, columns),
+        'rules_fingerprint': rules['fingerprint'],
+        'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def apply_snapshot_delta(snapshot, current_df, rules=None):
+    """
+    Update a processed snapshot with a freshly cleaned export.
+    
+    VMs are hash-joined on vm_name and classified as added, removed or
+    modified (by comparing row hashes of the source columns). Derived fields
+    are recomputed only for added/modified rows and the indexed aggregate
+    table is patched by subtracting outgoing rows and adding incoming ones
+    (see patch_aggregates).
+    
+    If the classification rules changed since the snapshot was built, the
+    snapshot is re-classified first so unchanged VMs pick up the new rules.
+    
+    Returns:
+        (snapshot, change_summary) - the updated snapshot for the new export
+    """
+    if rules is None:
+        rules = load_rules()
+    cells = snapshot.get('cells')
+    if cells is None:
+        # Snapshots saved before the cell index hold the flat aggregate table
+        aggregates = snapshot['aggregates']
+        if all(column in aggregates.columns for column in AGGREGATE_DIMENSIONS):
+            cells = index_aggregates(aggregates)
+    # Re-derive when the rules changed, or the snapshot predates an aggregate dimension
+    if cells is None or snapshot.get('rules_fingerprint') != rules['fingerprint']:
+        reclassified = add_derived_fields(snapshot['df'].copy(), rules)
+        cells = index_aggregates(compute_aggregates(reclassified))
+        snapshot = {**snapshot, 'df': reclassified}
+    
+    previous_df = snapshot['df']
+    current_df = current_df.reset_index(drop=True)
+    current_keys = snapshot_keys(current_df)
+    
+    columns = [c for c in SNAPSHOT_COMPARE_COLUMNS if c in current_df.columns]
+    current_hashes = _row_hashes(current_df, columns)
+    previous_hashes = snapshot['row_hashes']
+    if columns != snapshot['hash_columns']:
+        previous_hashes = _row_hashes(previous_df.reindex(columns=columns), columns)
+    
+    # Hash join: position of each current VM in the previous snapshot (-1 = added)
+    previous_pos = snapshot['keys'].get_indexer(current_keys)
+    added = np.flatnonzero(previous_pos < 0)
+    common = np.flatnonzero(previous_pos >= 0)
+    matched = np.zeros(len(previous_df), dtype=bool)
+    matched[previous_pos[common]] = True
+    removed = np.flatnonzero(~matched)
+    
+    unchanged = current_hashes[common] == previous_hashes[previous_pos[common]]
+    modified = common[~unchanged]
+    
+    # Re-derive only what changed
+    incoming = current_df.iloc[np.concatenate([added, modified])]
+    outgoing = previous_df.iloc[np.concatenate([removed, previous_pos[modified]])]
+    if len(incoming) > 0:
+        incoming = add_derived_fields(incoming.copy(), rules)
+    
+    patched = patch_aggregates(
+        cells,
+        compute_aggregates(incoming) if len(incoming) > 0 else None,
+        compute_aggregates(outgoing) if len(outgoing) > 0 else None
+    )
+    
+    # Rebuild the frame in the order of the new export
+    kept = previous_df.iloc[previous_pos[common[unchanged]]].set_axis(common[unchanged])
+    df = pd.concat([kept, incoming]).sort_index()
+    
+    change_summary = {
+        'previous_vms': len(previous_df),
+        'current_vms': len(current_df),
+        'added': len(added),
+        'removed': len(removed),
+        'modified': len(modified),
+        'unchanged': int(unchanged.sum()),
+        'vcpus_delta': int(patched['num_of_cpus'].sum() - cells['num_of_cpus'].sum()),
+        'memory_gb_delta': int(patched['mem_size_GB'].sum() - cells['mem_size_GB'].sum()),
+        'storage_gb_delta': round(float(patched['storage_size_GB'].sum() - cells['storage_size_GB'].sum()), 2),
+        'added_vms': sorted(current_df['vm_name'].iloc[added].map(str).unique().tolist()),
+        'removed_vms': sorted(previous_df['vm_name'].iloc[removed].map(str).unique().tolist()),
+        'modified_vms': sorted(current_df['vm_name'].iloc[modified].map(str).unique().tolist())
+    }
+    
+    updated = {
+        'df': df.reset_index(drop=True),
+        'cells': patched,
+        'keys': current_keys,
+        'hash_columns': columns,
+        'row_hashes': current_hashes,
+        'rules_fingerprint': rules['fingerprint'],
+        'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    return updated, change_summary
+
+
+def load_snapshot(snapshot_path):
+    """Load a snapshot saved by save_snapshot(), or None if there is none yet."""
+    if not snapshot_path or not os.path.exists(snapshot_path):
+        return None
+    return pd.read_pickle(snapshot_path)
+
+
+def save_snapshot(snapshot_path, snapshot):
+    """Cache a processed snapshot for the next delta run."""
+    pd.to_pickle(snapshot, snapshot_path)
+
+
+def load_processed_frame(filepath, snapshot_path=None, rules_path=None):
+    """
+    Load, clean and derive the VM frame and its aggregate table.
+    
+    With snapshot_path, the export is applied as a delta against the cached
+    snapshot (when one exists) and the snapshot is updated afterwards.
+    rules_path selects the classification rules file (default_rules.toml).
+    
+    Returns:
+        (df, aggregates, change_summary) - change_summary is None without a previous snapshot
+    """
+    rules = load_rules(rules_path)
+    df = clean_data(load_excel(filepath))
+    previous = load_snapshot(snapshot_path)
+    
+    if previous is None:
+        df = add_derived_fields(df, rules)
+        snapshot = build_snapshot(df, compute_aggregates(df), rules)
+        change_summary = None
+    else:
+        snapshot, change_summary = apply_snapshot_delta(previous, df, rules)
+    
+    if snapshot_path:
+        save_snapshot(snapshot_path, snapshot)
+    
+    return snapshot['df'], flatten_aggregates(snapshot['cells']), change_summary
+
+
+def compute_rule_counts(aggregates):
+    """VM count per classification rule that fired."""
+    return {
+        'size': {str(k): int(v) for k, v in aggregates.groupby('size_rule')['vm_count'].sum().items()},
+        'complexity': {str(k): int(v) for k, v in aggregates.groupby('complexity_rule')['vm_count'].sum().items()}
+    }
+
+
+def build_filter_cube(aggregates, cluster_environment=None, max_cells=CUBE_MAX_CELLS):
+    """
+    Sparse, dictionary-coded cube of the aggregate table for the browser.
+    
+    Each cuboid in CUBE_CUBOIDS has one cell per occurring combination of its
+    fields, stored column-wise as integer codes into each field's value list
+    (-1 = missing), with VM count and resource sums per cell. Stat cards and
+    charts then sum cells instead of scanning every VM.
+    
+    Args:
+        aggregates: Aggregate table (compute_aggregates / merge_aggregates)
+        cluster_environment: Optional cluster -> environment mapping, adds an
+            'environment' field (multi-environment dashboards)
+        max_cells: Size guard per cuboid, see also CUBE_MAX_CELLS_PER_VM
+        
+    Returns:
+        {'cuboids': [...]} without the cuboids that tripped the guard, or None
+    """
+    total_vms = aggregates['vm_count'].sum()
+    cuboids = []
+    for fields in CUBE_CUBOIDS:
+        cells = aggregates.groupby([CUBE_FIELDS[f] for f in fields], dropna=False, sort=False)[
+            list(CUBE_MEASURES.values())
+        ].sum().reset_index()
+        if len(cells) > max_cells or len(cells) > CUBE_MAX_CELLS_PER_VM * total_vms:
+            continue
+        
+        dimensions = {}
+        for field in fields:
+            codes, values = pd.factorize(cells[CUBE_FIELDS[field]])
+            dimensions[field] = {'values': [str(v) for v in values], 'codes': codes.tolist()}
+        if cluster_environment:
+            codes, values = pd.factorize(cells['cluster_name'].map(cluster_environment))
+            dimensions['environment'] = {'values': [str(v) for v in values], 'codes': codes.tolist()}
+        
+        measures = {'count': cells['vm_count'].astype(int).tolist()}
+        for field, column in list(CUBE_MEASURES.items())[1:]:
+            measures[field] = cells[column].round(2).tolist()
+        
+        cuboids.append({'cells': len(cells), 'dimensions': dimensions, 'measures': measures})
+    
+    return {'cuboids': cuboids} if cuboids else None
+
+
+def summarize_aggregates(aggregates, date_range=None, rules=None):
+    """Build every dashboard block that derives from the aggregate table (and the rules) alone."""
+    return {
+        'stats': compute_statistics(aggregates, date_range),
+        'distributions': compute_distributions(aggregates),
+        'size_details': compute_size_category_details(aggregates, rules),
+        'migration_waves': compute_migration_waves(aggregates, rules),
+        'growth_trends': compute_growth_trends(aggregates),
+        'growth_models': fit_growth_models(aggregates),
+        'complexity_by_os': compute_complexity_by_os(aggregates),
+        'rule_counts': compute_rule_counts(aggregates),
+        'unique_clusters': sorted(aggregates['cluster_name'].dropna().unique().tolist()),
+        'unique_hosts': sorted(aggregates['vm_host'].dropna().unique().tolist()),
+        'unique_os': sorted(aggregates['os_consolidated'].dropna().unique().tolist())
+    }
+
+
+def apply_wave_plan(data, transfers, wave_plan=None):
+    """
+    Simulate the migration schedule. With a wave_plan (wave_planner.plan_waves
+    options) the planned waves replace the suggested ones first.
+    """
+    if wave_plan:
+        plan = plan_waves(transfers, **wave_plan)
+        data['migration_waves'] = plan['waves']
+        data['wave_plan'] = plan['settings']
+        transfers = transfers.assign(wave=plan['assignment'])
+    data['migration_schedule'] = simulate_migration(transfers)
+
+
+def add_planning_data(data, shapes, aggregates, transfers, rules, catalog_path=None, wave_plan=None,
+                      storage_map_path=None):
+    """
+    Add the placement, forecast, cost, sweep, migration and storage blocks to
+    summarized dashboard data (single export and merged environments alike).
+    catalog_path selects the node SKU catalog of the cost optimizer (default_catalog.toml);
+    wave_plan enables the wave planner (see apply_wave_plan); storage_map_path selects
+    the storage domain -> storage class map (default_storage_map.toml).
+    """
+    data['placement'] = simulate_placement(shapes)
+    data['forecast_bands'] = simulate_forecast(aggregates, data['placement'])
+    data['forecast_lookup'] = build_forecast_lookup(
+        shapes, data['stats'], data['distributions']['by_cluster'], data['placement'], data['growth_models']
+    )
+    data['node_costs'] = optimize_node_costs(
+        shapes, data['distributions']['by_cluster'], load_catalog(catalog_path), data['growth_models']
+    )
+    data['capacity_sweep'] = sweep_capacity(data['distributions']['by_cluster'], data['placement']['node_specs'])
+    apply_wave_plan(data, transfers, wave_plan)
+    data['host_drain'] = plan_host_drain(transfers)
+    data['storage_plan'] = plan_storage(
+        data['distributions']['by_storage_domain'], load_storage_map(storage_map_path)
+    )
+    data['classification_rules'] = describe_rules(rules)
+    data['generated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return data
+
+
+def build_dashboard_data(df, aggregates, rules_path=None, catalog_path=None, wave_plan=None,
+                         storage_map_path=None):
+    """
+    Assemble the dictionary consumed by dashboard tabs from a processed frame.
+    catalog_path, wave_plan and storage_map_path: see add_planning_data.
+    """
+    rules = load_rules(rules_path)
+    data = summarize_aggregates(aggregates, get_date_range(df), rules)
+    data['vm_list'] = prepare_vm_list(df)
+    data['filter_cube'] = build_filter_cube(aggregates)
+    return add_planning_data(
+        data, vm_shapes(df), aggregates, migration_transfers(df), rules,
+        catalog_path, wave_plan, storage_map_path
+    )
+
+
+def process_excel(filepath, snapshot_path=None, rules_path=None, catalog_path=None, wave_plan=None,
+                  storage_map_path=None):
     """
     Main entry point: Load and process Excel file.
     Returns a dictionary with all data needed by dashboard tabs.
+    
+    When snapshot_path is given, only rows changed since the cached snapshot
+    are reprocessed and a 'change_summary' entry is added. catalog_path,
+    wave_plan and storage_map_path: see add_planning_data.
     """
-    # Load and clean
-    df = load_excel(filepath)
-    df = clean_data(df)
-    df = add_derived_fields(df)
-    
-    # Build output data structure
-    data = {
-        'stats': compute_statistics(df),
-        'distributions': compute_distributions(df),
-        'size_details': compute_size_category_details(df),
-        'migration_waves': compute_migration_waves(df),
-        'growth_trends': compute_growth_trends(df),
-        'complexity_by_os': compute_complexity_by_os(df),
-        'vm_list': prepare_vm_list(df),
-        'unique_clusters': sorted(df['cluster_name'].unique().tolist()),
-        'unique_hosts': sorted(df['vm_host'].unique().tolist()),
-        'unique_os': sorted(df['os_consolidated'].unique().tolist()),
-        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
+    df, aggregates, change_summary = load_processed_frame(filepath, snapshot_path, rules_path)
+    data = build_dashboard_data(df, aggregates, rules_path, catalog_path, wave_plan, storage_map_path)
+    if change_summary is not None:
+        data['change_summary'] = change_summary
     
     return data
 
@@ -0,0 +1,207 @@
+"""
+environments.py
+---------------
+Multi-environment comparison across several RHV exports.
+Each export is processed in its own worker process; the parent only merges
+the precomputed aggregate tables, VM shape counts, transfer lists and VM lists,
+never the raw rows.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from data_processor import (
+    load_processed_frame,
+    get_date_range,
+    prepare_vm_list,
+    merge_aggregates,
+    summarize_aggregates,
+    build_filter_cube,
+    migration_transfers,
+    add_planning_data
+)
+from rules import load_rules
+from placement import vm_shapes
+
+
+# Separator between environment and cluster name in the merged view
+ENVIRONMENT_SEPARATOR = ' / '
+
+
+def parse_environment_spec(spec):
+    """
+    Split an input of the form NAME=PATH into (name, path).
+    Without a NAME the file name (without extension) is used.
+    """
+    name, sep, path = spec.partition('=')
+    if sep and name and not os.path.exists(spec):
+        return name, path
+    return os.path.splitext(os.path.basename(spec))[0], spec
+
+
+def qualify_cluster(environment, cluster):
+    """Cluster name as shown in the merged view."""
+    return f"{environment}{ENVIRONMENT_SEPARATOR}{cluster}"
+
+
+def _qualify_names(environment, names):
+    """Qualify a column of cluster, host or storage domain names, leaving missing ones missing."""
+    return names.where(names.isna(), environment + ENVIRONMENT_SEPARATOR + names.astype(str))
+
+
+def check_environment_names(specs):
+    """Raise ValueError when two (name, path) specs share an environment name."""
+    names = [name for name, _ in specs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate environment name(s): {', '.join(duplicates)}; "
+                         f"give each export its own NAME=path")
+
+
+def process_environment(name, filepath, rules_path=None):
+    """
+    Process one export (runs inside a worker process).
+
+    Returns:
+        Dictionary with the environment name, aggregate table, VM shape counts
+        (placement), migration transfer list, creation date range and
+        prepared VM list
+    """
+    df, aggregates, _ = load_processed_frame(filepath, rules_path=rules_path)
+    return {
+        'name': name,
+        'source': os.path.basename(filepath),
+        'aggregates': aggregates,
+        'shapes': vm_shapes(df),
+        'transfers': migration_transfers(df),
+        'date_range': get_date_range(df),
+        'vm_list': prepare_vm_list(df)
+    }
+
+
+def process_environments(specs, rules_path=None, max_workers=None):
+    """
+    Process several exports in parallel.
+
+    Args:
+        specs: List of (name, path) tuples with distinct names
+        rules_path: Classification rules file (default: default_rules.toml)
+        max_workers: Worker processes (default: one per export, capped at CPU count)
+
+    Returns:
+        List of process_environment() results in input order
+    """
+    check_environment_names(specs)
+    if len(specs) == 1:
+        return [process_environment(*specs[0], rules_path)]
+
+    if max_workers is None:
+        max_workers = min(len(specs), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(process_environment, name, path, rules_path) for name, path in specs]
+        return [future.result() for future in futures]
+
+
+def _merged_date_range(results):
+    """Earliest and latest creation date across all environments."""
+    ranges = [r['date_range'] for r in results if r['date_range'] is not None]
+    if not ranges:
+        return None
+    return min(r[0] for r in ranges), max(r[1] for r in ranges)
+
+
+def summarize_environment(result, rules=None):
+    """Per-environment comparison block (stats, distributions, waves, forecast base)."""
+    summary = summarize_aggregates(result['aggregates'], result['date_range'], rules)
+    stats = summary['stats']
+    return {
+        'name': result['name'],
+        'source': result['source'],
+        'clusters': [qualify_cluster(result['name'], c) for c in summary['unique_clusters']],
+        'stats': stats,
+        'distributions': {
+            key: summary['distributions'][key]
+            for key in ['os_family', 'size_category', 'complexity', 'status']
+        },
+        'migration_waves': [
+            {key: wave[key] for key in ['wave', 'name', 'vm_count', 'vcpus', 'memory_gb']}
+            for wave in summary['migration_waves']
+        ],
+        'forecast': {
+            'vms': stats['total_vms'],
+            'vcpus': stats['total_vcpus'],
+            'memory': stats['total_memory_gb']
+        }
+    }
+
+
+def merge_environments(results, rules_path=None, catalog_path=None, wave_plan=None, storage_map_path=None):
+    """
+    Merge processed environments into one dashboard data dictionary.
+
+    Cluster, host and storage domain names are qualified with their
+    environment so same-named ones in different exports stay apart (they are
+    different machines); every merged block is rebuilt from the
+    combined aggregate table. The result also carries an 'environments' list
+    with each environment's own summary for side-by-side comparison.
+    catalog_path, wave_plan and storage_map_path: see
+    data_processor.add_planning_data.
+    """
+    qualified = []
+    shapes = []
+    transfers = []
+    vm_list = []
+    for result in results:
+        name = result['name']
+        aggregates = result['aggregates'].copy()
+        for column in ['cluster_name', 'vm_host', 'storage_pool_name']:
+            aggregates[column] = _qualify_names(name, aggregates[column])
+        qualified.append(aggregates)
+        env_shapes = result['shapes'].copy()
+        env_shapes['cluster_name'] = _qualify_names(name, env_shapes['cluster_name'])
+        shapes.append(env_shapes)
+        env_transfers = result['transfers'].copy()
+        for column in ['cluster_name', 'vm_host', 'storage_pool_name']:
+            env_transfers[column] = _qualify_names(name, env_transfers[column])
+        transfers.append(env_transfers)
+
+        for vm in result['vm_list']:
+            vm_list.append({
+                **vm,
+                'cluster': qualify_cluster(name, vm['cluster']) if vm['cluster'] else '',
+                'host': qualify_cluster(name, vm['host']) if vm['host'] else '',
+                'storage_domain': qualify_cluster(name, vm['storage_domain']) if vm['storage_domain'] else '',
+                'environment': name
+            })
+
+    rules = load_rules(rules_path)
+    merged = merge_aggregates(*qualified)
+    data = summarize_aggregates(merged, _merged_date_range(results), rules)
+    data['vm_list'] = vm_list
+    data['environments'] = [summarize_environment(result, rules) for result in results]
+    data['filter_cube'] = build_filter_cube(merged, {
+        cluster: env['name'] for env in data['environments'] for cluster in env['clusters']
+    })
+    return add_planning_data(
+        data, pd.concat(shapes, ignore_index=True), merged, pd.concat(transfers, ignore_index=True), rules,
+        catalog_path, wave_plan, storage_map_path
+    )
+
+
+# For testing
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Usage: python environments.py [NAME=]<excel_file> [NAME=]<excel_file> ...")
+        sys.exit(1)
+
+    results = process_environments([parse_environment_spec(arg) for arg in sys.argv[1:]])
+    data = merge_environments(results)
+    print(f"Merged {len(results)} environments: {data['stats']['total_vms']} VMs, "
+          f"{data['stats']['clusters']} clusters")
+    for env in data['environments']:
+        print(f"  {env['name']}: {env['stats']['total_vms']} VMs, "
+              f"{env['stats']['total_vcpus']} vCPUs, {env['stats']['total_memory_gb']} GB")
@@ -0,0 +1,555 @@
+"""
+forecast.py
+-----------
+Monte Carlo capacity forecast with confidence bands.
+
+Each cluster's monthly VM, vCPU and memory additions (the per-cluster version
+of the series behind compute_growth_trends) give one relative growth rate per
+month: what was created that month over what existed before it. Each simulated
+year draws 12 calendar months from the trailing window (with replacement) and
+compounds the rates of those months. A drawn month applies to every cluster
+and all three resources at once, so busy months hit the whole estate together
+and the estate-wide band is not averaged away. Clusters with too little
+history (and months before a cluster existed) use the estate-wide rates.
+
+All simulations of all clusters run as NumPy array operations; only the
+P10/P50/P90 of each year are kept for the dashboard.
+
+fit_growth_models fits linear, exponential and seasonal models to the same
+monthly series per cluster, per OS family and for the whole estate, and keeps
+the model with the lowest rolling-origin backtest error for each series. All
+series are fitted at once: each model is a few matrix products over a
+(series x months) array.
+
+build_forecast_lookup precomputes the Forecast tab for every scenario (annual
+growth 0-100% and the fitted models), so the browser only looks values up.
+"""
+
+import numpy as np
+import pandas as pd
+
+from placement import grown_packed_nodes
+
+
+# Forecast resource -> aggregate table column
+MEASURES = {'vms': 'vm_count', 'vcpus': 'num_of_cpus', 'memory': 'mem_size_GB'}
+
+# One forecast year per 12 months after the export, labelled like the Forecast tab
+FORECAST_YEARS = (2026, 2027, 2028)
+SIMULATIONS = 2000
+# Trailing months whose growth rates are sampled
+WINDOW_MONTHS = 24
+# Clusters with fewer months of history use the estate-wide rates
+MIN_HISTORY_MONTHS = 6
+PERCENTILES = (10, 50, 90)
+# Fixed seed: regenerating a dashboard from the same export shows the same bands
+SEED = 2025
+
+GROWTH_MODELS = ('linear', 'exponential', 'seasonal')
+# Series the growth models are fitted to: dashboard section -> aggregate table column
+MODEL_GROUPINGS = {'clusters': 'cluster_name', 'os_families': 'os_family'}
+# Trailing months each model is fitted on (at least MIN_FIT_MONTHS)
+FIT_MONTHS = 24
+MIN_FIT_MONTHS = 12
+# Rolling-origin backtest: forecast up to 12 months ahead from 4 origins, 3 months apart
+BACKTEST_HORIZON = 12
+BACKTEST_ORIGINS = 4
+BACKTEST_STEP = 3
+
+# Scenario lookup: annual growth rates (%) precomputed for the Forecast tab
+LOOKUP_RATES = range(0, 101)
+# Rates at which the grown clusters are bin-packed; node counts at the rates
+# in between are interpolated along the growth factor (packed node counts are
+# close to linear in it, see placement.grown_packed_nodes)
+PACKED_RATES = (0, 50, 100)
+# Annual growth (%) of the 'Typical' scenario, the default without fitted models
+DEFAULT_GROWTH_RATE = 15
+
+
+def monthly_series(aggregates, by='cluster_name'):
+    """
+    Monthly additions per group on a gap-free month axis.
+
+    Args:
+        aggregates: Aggregate table (see data_processor.compute_aggregates)
+        by: Grouping column
+
+    Returns:
+        (groups, months, series, current): group names, 'YYYY-MM' month labels,
+        {measure: array (groups, months)} of additions and {measure: array
+        (groups,)} of current totals (including VMs without a creation date);
+        None when no VM has a creation date
+    """
+    columns = list(MEASURES.values())
+    totals = aggregates.groupby(by, sort=True)[columns].sum()
+    dated = aggregates[aggregates['month'].notna()]
+    if len(totals) == 0 or dated['vm_count'].sum() == 0:
+        return None
+
+    months = pd.period_range(dated['month'].min(), dated['month'].max(), freq='M').strftime('%Y-%m')
+    table = dated.groupby([by, 'month'])[columns].sum()
+    series = {}
+    for measure, column in MEASURES.items():
+        series[measure] = (
+            table[column].unstack(fill_value=0)
+            .reindex(index=totals.index, columns=months, fill_value=0)
+            .to_numpy(dtype=float)
+        )
+    current = {measure: totals[column].to_numpy(dtype=float) for measure, column in MEASURES.items()}
+    return [str(group) for group in totals.index], list(months), series, current
+
+
+def growth_rates(series, window=WINDOW_MONTHS):
+    """
+    Monthly log growth rates over the trailing window.
+
+    Args:
+        series: {measure: array (groups, months)} of monthly additions
+        window: Trailing months to keep
+
+    Returns:
+        ({measure: array (groups, window)} of log(1 + added / existing),
+        bool array (groups, window) of months with VMs before them)
+    """
+    rates = {}
+    existing = np.cumsum(series['vms'], axis=1) - series['vms']
+    valid = existing[:, -window:] > 0
+    for measure, added in series.items():
+        before = np.cumsum(added, axis=1) - added
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.log1p(np.where(before > 0, added / before, 0))
+        rates[measure] = np.where(valid, rate[:, -window:], 0)
+    return rates, valid
+
+
+def _percentiles(ordered, transform=None):
+    """
+    PERCENTILES of rows sorted along the last axis, interpolated like np.percentile.
+    A monotonic transform keeps the order, so it is applied to the few samples
+    the interpolation reads instead of to every simulation.
+    """
+    positions = np.array(PERCENTILES) / 100 * (ordered.shape[-1] - 1)
+    below = np.floor(positions).astype(int)
+    above = np.ceil(positions).astype(int)
+    weight = positions - below
+    low, high = ordered[..., below], ordered[..., above]
+    if transform is not None:
+        low, high = transform(low), transform(high)
+    return low * (1 - weight) + high * weight
+
+
+def _node_counts(packed, demand, placement):
+    """Packed nodes scaled by demand growth, plus HA spares (clusters without VMs stay at 0)."""
+    scaled = np.ceil(packed * demand - 1e-9) + placement['ha_spare_nodes']
+    return np.where(packed > 0, np.maximum(placement['min_nodes'], scaled), 0)
+
+
+def simulate_forecast(aggregates, placement=None, simulations=SIMULATIONS, window=WINDOW_MONTHS,
+                      years=FORECAST_YEARS, seed=SEED):
+    """
+    Simulate VM, vCPU, memory and node growth per cluster.
+
+    Args:
+        aggregates: Aggregate table (see data_processor.compute_aggregates)
+        placement: simulate_placement() result; node counts scale its packed
+            nodes with the larger of the vCPU and memory growth
+        simulations: Number of simulated futures
+        window: Trailing months whose growth rates are sampled
+        years: Labels of the forecast years (12 months each)
+        seed: Random seed
+
+    Returns:
+        JSON-friendly dictionary with the simulation settings, 'total' and
+        'clusters': {cluster: bands}, where bands hold [P10, P50, P90] per year
+        for 'vms', 'vcpus', 'memory' and 'nodes' ({spec: ...}), the first
+        year's 'annual_growth' percentiles and the months of history used;
+        None when no VM has a creation date
+    """
+    monthly = monthly_series(aggregates)
+    if monthly is None:
+        return None
+    clusters, months, series, current = monthly
+    window = min(window, len(months))
+
+    # Row 0: estate-wide rates (the compute_growth_trends series), then one row per cluster
+    pooled = {measure: added.sum(axis=0, keepdims=True) for measure, added in series.items()}
+    rates, valid = growth_rates(
+        {measure: np.vstack([pooled[measure], series[measure]]) for measure in MEASURES}, window
+    )
+    history = valid.sum(axis=1)
+    if history[0] == 0:
+        return None
+
+    # Per sampled month and cluster: the cluster's own rate, or the estate-wide one
+    sampled_months = np.flatnonzero(valid[0])
+    own = ((history[1:] >= MIN_HISTORY_MONTHS)[:, None] & valid[1:])[:, sampled_months]
+    cluster_rates = {
+        measure: np.where(own, rate[1:, sampled_months], rate[:1, sampled_months]).T
+        for measure, rate in rates.items()
+    }
+
+    placement = placement or {}
+    packed = {
+        spec: np.array([
+            (placement['clusters'].get(cluster) or {}).get(spec, {}).get('packed_nodes', 0)
+            for cluster in clusters
+        ], dtype=float)
+        for spec in placement.get('node_specs') or {}
+    }
+
+    rng = np.random.default_rng(seed)
+    log_growth = {measure: np.zeros((simulations, len(clusters))) for measure in MEASURES}
+    # name -> one (clusters, 3) / (3,) band array per year
+    cluster_bands = {name: [] for name in [*MEASURES, *packed]}
+    total_bands = {name: [] for name in cluster_bands}
+    annual_growth = None
+    for _ in years:
+        # How often each month is drawn per simulation; the year's log growth of
+        # every cluster is then one matrix product with the monthly rates
+        draws = rng.integers(0, len(sampled_months), (simulations, 12))
+        offsets = np.arange(simulations)[:, None] * len(sampled_months)
+        counts = np.bincount((draws + offsets).ravel(), minlength=simulations * len(sampled_months))
+        counts = counts.reshape(simulations, len(sampled_months)).astype(float)
+        for measure in MEASURES:
+            log_growth[measure] += counts @ cluster_rates[measure]
+
+        # Values and node counts grow monotonically with log growth, so one sort per
+        # resource orders every derived quantity of a cluster as well
+        ordered = {measure: np.sort(log_growth[measure].T, axis=1) for measure in MEASURES}
+        demand = np.exp(np.maximum(log_growth['vcpus'], log_growth['memory']))
+        ordered_demand = np.sort(demand.T, axis=1)
+        for measure in MEASURES:
+            scale = current[measure][:, None]
+            cluster_bands[measure].append(_percentiles(ordered[measure], lambda x: scale * np.exp(x)))
+            total = np.exp(log_growth[measure]) @ current[measure]
+            total_bands[measure].append(_percentiles(np.sort(total)))
+        for spec, spec_packed in packed.items():
+            cluster_bands[spec].append(_percentiles(
+                ordered_demand, lambda x: _node_counts(spec_packed[:, None], x, placement)
+            ))
+            total = _node_counts(spec_packed, demand, placement).sum(axis=1)
+            total_bands[spec].append(_percentiles(np.sort(total)))
+        if annual_growth is None:
+            annual_growth = np.round(_percentiles(ordered['vms'], lambda x: np.expm1(x) * 100), 1).tolist()
+
+    def entry(values):
+        return {**{measure: values[measure] for measure in MEASURES},
+                'nodes': {spec: values[spec] for spec in packed}}
+
+    # (clusters, years, 3) / (years, 3) nested lists
+    cluster_values = {name: np.rint(np.stack(bands, axis=1)).astype(int).tolist()
+                      for name, bands in cluster_bands.items()}
+    total_values = {name: np.rint(np.stack(bands)).astype(int).tolist() for name, bands in total_bands.items()}
+    result = {}
+    for position, cluster in enumerate(clusters):
+        result[cluster] = {
+            **entry({name: values[position] for name, values in cluster_values.items()}),
+            'annual_growth': annual_growth[position],
+            'history_months': int(history[position + 1]),
+            'pooled': bool(history[position + 1] < MIN_HISTORY_MONTHS)
+        }
+
+    return {
+        'simulations': simulations,
+        'window_months': window,
+        'last_month': months[-1],
+        'years': list(years),
+        'percentiles': list(PERCENTILES),
+        'total': entry(total_values),
+        'clusters': result
+    }
+
+
+def _model_forecasts(stock, added, calendar, horizon):
+    """
+    Forecast the stock of every series with each growth model.
+
+    Args:
+        stock: array (series, months) of cumulative VMs/vCPUs/memory over the fit window
+        added: array (series, months) of monthly additions over the same window
+        calendar: Month of year (0-11) of the fit window months and the months after it
+        horizon: Months to forecast
+
+    Returns:
+        {model: array (series, horizon)}, each forecast continuing from the last
+        observed stock; NaN where a model does not apply
+    """
+    months = stock.shape[1]
+    t = np.arange(months) - (months - 1) / 2
+    steps = np.arange(1, horizon + 1)
+    last = stock[:, -1:]
+
+    # linear: least-squares monthly slope of the stock
+    slope = stock @ t / (t @ t)
+    # exponential: least-squares slope of the log stock (series that stayed above zero)
+    positive = (stock > 0).all(axis=1, keepdims=True)
+    log_slope = np.log(np.where(positive, stock, 1)) @ t / (t @ t)
+    # seasonal: mean additions per calendar month (the overall mean for months not in the window)
+    onehot = np.eye(12)[calendar[:months]]
+    seen = onehot.sum(axis=0)
+    profile = np.where(seen > 0, added @ onehot / np.maximum(seen, 1), added.mean(axis=1, keepdims=True))
+
+    return {
+        'linear': last + slope[:, None] * steps,
+        'exponential': np.where(positive, last * np.exp(log_slope[:, None] * steps), np.nan),
+        'seasonal': last + np.cumsum(profile[:, calendar[months:months + horizon]], axis=1)
+    }
+
+
+def _backtest_errors(stock, added, calendar, horizon):
+    """
+    Rolling-origin backtest: mean absolute percentage error of each model's
+    forecasts against the actual stock, averaged over the origins.
+
+    Returns:
+        ({model: array (series,)} errors, NaN where a model failed or nothing
+        could be scored; number of origins used)
+    """
+    total_months = stock.shape[1]
+    errors = {model: np.zeros(len(stock)) for model in GROWTH_MODELS}
+    origins = 0
+    for k in range(BACKTEST_ORIGINS):
+        origin = total_months - horizon - k * BACKTEST_STEP
+        fit = min(FIT_MONTHS, origin)
+        if fit < MIN_FIT_MONTHS:
+            break
+        window = slice(origin - fit, origin)
+        predicted = _model_forecasts(stock[:, window], added[:, window], calendar[origin - fit:], horizon)
+        actual = stock[:, origin:origin + horizon]
+        scored = actual > 0
+        with np.errstate(invalid='ignore'):
+            for model, forecast in predicted.items():
+                ape = np.abs(forecast - actual) / np.where(scored, actual, 1)
+                errors[model] += np.where(scored, ape, 0).sum(axis=1) / scored.sum(axis=1)
+        origins += 1
+    return {model: error / max(origins, 1) for model, error in errors.items()}, origins
+
+
+def fit_growth_models(aggregates, years=FORECAST_YEARS):
+    """
+    Fit growth models to the monthly VM, vCPU and memory series of every
+    cluster, every OS family and the whole estate, and pick the model with the
+    lowest backtest error for each series.
+
+    Args:
+        aggregates: Aggregate table (see data_processor.compute_aggregates)
+        years: Labels of the forecast years (12 months each)
+
+    Returns:
+        JSON-friendly dictionary with the fit settings, 'total', 'clusters' and
+        'os_families': {group: {measure: fit}}, where a fit holds the chosen
+        'model', its backtest 'error' (%), every model's 'errors' and the
+        'growth' factor over today's value for each year; None when the history
+        is too short to backtest
+    """
+    blocks = []
+    for section, column in MODEL_GROUPINGS.items():
+        monthly = monthly_series(aggregates, column)
+        if monthly is None:
+            return None
+        names, months, series, _ = monthly
+        blocks.append((section, names, series))
+    # The estate-wide series: the compute_growth_trends monthly series on a gap-free axis
+    estate = {measure: added.sum(axis=0, keepdims=True) for measure, added in blocks[0][2].items()}
+    blocks.append(('total', [None], estate))
+
+    # One row per (group, measure), all fitted at once
+    rows = [(section, name, measure) for section, names, series in blocks
+            for measure in MEASURES for name in names]
+    added = np.vstack([series[measure] for _, _, series in blocks for measure in MEASURES])
+    stock = np.cumsum(added, axis=1)
+    total_months = stock.shape[1]
+    horizon = min(BACKTEST_HORIZON, total_months - MIN_FIT_MONTHS)
+    if horizon < 1:
+        return None
+    first_month = int(months[0][5:7]) - 1
+    calendar = (first_month + np.arange(total_months + 12 * len(years))) % 12
+
+    errors, origins = _backtest_errors(stock, added, calendar, horizon)
+    scores = np.vstack([np.nan_to_num(errors[model], nan=np.inf) for model in GROWTH_MODELS])
+    choice = np.argmin(scores, axis=0)
+
+    fit = min(FIT_MONTHS, total_months)
+    forecasts = _model_forecasts(stock[:, -fit:], added[:, -fit:], calendar[total_months - fit:], 12 * len(years))
+    stacked = np.stack([forecasts[model] for model in GROWTH_MODELS])
+    chosen = stacked[choice, np.arange(len(rows))][:, 11::12]
+    last = stock[:, -1:]
+    growth = np.where(last > 0, chosen / np.where(last > 0, last, 1), 1.0)
+
+    result = {'total': {}, **{section: {} for section in MODEL_GROUPINGS}}
+    for row, (section, name, measure) in enumerate(rows):
+        target = result[section] if name is None else result[section].setdefault(name, {})
+        row_errors = {model: (None if np.isnan(errors[model][row]) else round(float(errors[model][row]) * 100, 2))
+                      for model in GROWTH_MODELS}
+        model = GROWTH_MODELS[choice[row]]
+        target[measure] = {
+            'model': model,
+            'error': row_errors[model],
+            'errors': row_errors,
+            'growth': np.round(growth[row], 4).tolist()
+        }
+
+    return {
+        'models': list(GROWTH_MODELS),
+        'fit_months': fit,
+        'backtest_origins': origins,
+        'backtest_horizon': horizon,
+        'last_month': months[-1],
+        'years': list(years),
+        **result
+    }
+
+
+def cluster_growth(clusters, growth_models=None, years=FORECAST_YEARS, rate=DEFAULT_GROWTH_RATE):
+    """
+    Growth factors over today per cluster and forecast year.
+
+    Args:
+        clusters: Cluster names
+        growth_models: fit_growth_models() result; each cluster grows with its
+            own fitted models (the estate-wide ones without a fit)
+        years: Forecast years (without growth models)
+        rate: Annual growth (%) of every cluster without growth models
+
+    Returns:
+        {measure: array (clusters, years)}
+    """
+    if not growth_models:
+        factors = (1 + rate / 100) ** np.arange(1, len(years) + 1)
+        return {measure: np.tile(factors, (len(clusters), 1)) for measure in MEASURES}
+    fits = [growth_models['clusters'].get(cluster) or growth_models['total'] for cluster in clusters]
+    return {
+        measure: np.array([fit[measure]['growth'] for fit in fits], dtype=float).reshape(len(clusters), -1)
+        for measure in MEASURES
+    }
+
+
+def _recommended_nodes(packed, placement):
+    """Packed nodes plus HA spares, at least the minimum cluster size (0 for no VMs)."""
+    packed = np.asarray(packed, dtype=float)
+    nodes = np.maximum(placement['min_nodes'], packed + placement['ha_spare_nodes'])
+    return np.where(packed > 0, nodes, 0).astype(int)
+
+
+def build_forecast_lookup(shapes, stats, by_cluster, placement, growth_models=None,
+                          rates=LOOKUP_RATES, years=FORECAST_YEARS):
+    """
+    Precompute the Forecast tab for every growth scenario, so switching
+    scenarios in the browser is a table lookup.
+
+    Args:
+        shapes: vm_shapes() frame (cluster_name, num_of_cpus, mem_size_GB, vm_count)
+        stats: compute_statistics() result (today's totals for the year cards)
+        by_cluster: distributions['by_cluster']; its order is the row order of
+            the infrastructure table
+        placement: simulate_placement() result (node specs and sizing rules)
+        growth_models: fit_growth_models() result, for the fitted scenario
+        rates: Annual growth rates (%), consecutive integers
+        years: Labels of the forecast years
+
+    Returns:
+        JSON-friendly dictionary with 'rates', 'years', 'clusters' (row order) and
+        - 'totals': {measure: [rate][year]} projected totals
+        - 'projections': {measure: [rate][cluster]} last-year values per cluster
+        - 'nodes': {spec: [rate][cluster]} recommended nodes in the last year
+        - 'fitted': the same blocks for the fitted scenario without the rate
+          axis, or None without growth models
+    """
+    clusters = list(by_cluster)
+    current = {'vms': stats['total_vms'], 'vcpus': stats['total_vcpus'], 'memory': stats['total_memory_gb']}
+    rates = np.asarray(list(rates), dtype=float)
+    factors = (1 + rates[:, None] / 100) ** np.arange(1, len(years) + 1)
+    cluster_current = {
+        measure: np.array([by_cluster[cluster][column] for cluster in clusters], dtype=float)
+        for measure, column in MEASURES.items()
+    }
+
+    lookup = {
+        'rates': rates.astype(int).tolist(),
+        'years': list(years),
+        'clusters': clusters,
+        'totals': {measure: np.ceil(current[measure] * factors).astype(int).tolist() for measure in MEASURES},
+        'projections': {
+            measure: np.ceil(cluster_current[measure] * factors[:, -1:]).astype(int).tolist()
+            for measure in MEASURES
+        },
+        'nodes': {},
+        'fitted': None
+    }
+
+    # Fitted scenario: each cluster's own models (the estate-wide ones without a fit)
+    fitted_growth = None
+    if growth_models:
+        fitted_growth = cluster_growth(clusters, growth_models)
+        fitted_values = {measure: np.ceil(cluster_current[measure][:, None] * growth)
+                         for measure, growth in fitted_growth.items()}
+        lookup['fitted'] = {
+            'totals': {measure: values.sum(axis=0).astype(int).tolist() for measure, values in fitted_values.items()},
+            'projections': {measure: values[:, -1].astype(int).tolist() for measure, values in fitted_values.items()},
+            'nodes': {}
+        }
+
+    # Bin-pack each cluster grown to the packed rates (and its fitted demand growth)
+    packed_factors = (1 + np.asarray(PACKED_RATES) / 100) ** len(years)
+    cluster_shapes = dict(tuple(shapes.groupby('cluster_name', sort=False)))
+    for spec_name, spec in placement['node_specs'].items():
+        packed = np.zeros((len(rates), len(clusters)))
+        fitted_packed = np.zeros(len(clusters))
+        for position, cluster in enumerate(clusters):
+            if cluster not in cluster_shapes:
+                continue
+            grown = packed_factors[1:].tolist()
+            if fitted_growth is not None:
+                grown.append(max(fitted_growth['vcpus'][position, -1], fitted_growth['memory'][position, -1]))
+            counts = grown_packed_nodes(cluster_shapes[cluster], spec, grown, placement['overhead'])
+            curve = [placement['clusters'][cluster][spec_name]['packed_nodes'], *counts[:len(packed_factors) - 1]]
+            packed[:, position] = np.ceil(np.interp(factors[:, -1], packed_factors, curve) - 1e-9)
+            if fitted_growth is not None:
+                fitted_packed[position] = counts[-1]
+        lookup['nodes'][spec_name] = _recommended_nodes(packed, placement).tolist()
+        if lookup['fitted']:
+            lookup['fitted']['nodes'][spec_name] = _recommended_nodes(fitted_packed, placement).tolist()
+
+    return lookup
+
+
+# For testing
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(3)
+    month_axis = pd.period_range('2018-01', '2025-06', freq='M').strftime('%Y-%m')
+    rows = []
+    for i in range(60):
+        cluster = f'CLU-{i:02d}'
+        start = 0 if i < 55 else len(month_axis) - 3
+        for month in month_axis[start:]:
+            vms = int(rng.poisson(4 + i % 7))
+            rows.append({'cluster_name': cluster, 'os_family': ['Linux', 'Windows'][i % 2],
+                         'month': month, 'vm_count': vms,
+                         'num_of_cpus': vms * 4, 'mem_size_GB': vms * int(rng.choice([8, 16]))})
+    frame = pd.DataFrame(rows)
+
+    start = time.perf_counter()
+    bands = simulate_forecast(frame)
+    elapsed = time.perf_counter() - start
+    print(f"{bands['simulations']} simulations x {len(bands['clusters'])} clusters x "
+          f"{len(bands['years'])} years in {elapsed:.2f}s")
+    for year, vms in zip(bands['years'], bands['total']['vms']):
+        print(f"  {year}: VMs P10/P50/P90 {vms}")
+    for cluster in ['CLU-00', 'CLU-59']:
+        entry = bands['clusters'][cluster]
+        print(f"  {cluster}: growth {entry['annual_growth']}% "
+              f"({entry['history_months']} months{', estate-wide rates' if entry['pooled'] else ''})")
+
+    # Half the clusters create most VMs in December: the seasonal model should win there
+    december = frame['month'].str.endswith('-12') & frame['cluster_name'].isin([f'CLU-{i:02d}' for i in range(0, 60, 2)])
+    frame.loc[december, ['vm_count', 'num_of_cpus', 'mem_size_GB']] *= 12
+    start = time.perf_counter()
+    models = fit_growth_models(frame)
+    elapsed = time.perf_counter() - start
+    chosen = pd.Series([fits['vms']['model'] for fits in models['clusters'].values()]).value_counts()
+    print(f"Fitted {len(models['models'])} models to {3 * (len(models['clusters']) + len(models['os_families']) + 1)} "
+          f"series in {elapsed:.2f}s ({models['backtest_origins']} backtest origins): {chosen.to_dict()}")
+    for name, fits in [('estate', models['total']), ('CLU-00', models['clusters']['CLU-00'])]:
+        print(f"  {name}: VMs {fits['vms']['model']} ({fits['vms']['error']}% error), growth {fits['vms']['growth']}")
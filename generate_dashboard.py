@@ -5,18 +5,36 @@ generate_dashboard.py
 Main orchestrator for RHV to OpenShift Virtualization Migration Dashboard.
 
 Usage:
-    python generate_dashboard.py <input_excel> [output_html]
+    python generate_dashboard.py <input_excel> [output_html] [--delta SNAPSHOT] [--history DB]
+    python generate_dashboard.py [NAME=]<input_excel> [NAME=]<input_excel> ... [-o output_html]
     
 Example:
     python generate_dashboard.py RHV-NP-ENV.xlsx dashboard.html
+    python generate_dashboard.py RHV-NP-ENV.xlsx --delta rhv_snapshot.pkl --history rhv_history.db
+    python generate_dashboard.py NonProd=RHV-NP-ENV.xlsx Prod=RHV-PROD-ENV.xlsx -o comparison.html
+    python generate_dashboard.py RHV-NP-ENV.xlsx --rules customer_rules.toml
+    python generate_dashboard.py RHV-NP-ENV.xlsx --top-n 30 --max-points 60
+    python generate_dashboard.py RHV-NP-ENV.xlsx --diagnostics
+    python generate_dashboard.py RHV-NP-ENV.xlsx --catalog node_skus.toml
+    python generate_dashboard.py RHV-NP-ENV.xlsx --plan-waves 8 --wave-max-tb 40 --keep-together cluster
+    python generate_dashboard.py RHV-NP-ENV.xlsx --storage-map storage_classes.toml
 """
 
+import argparse
+import json
 import sys
 import os
 from datetime import datetime
 
 # Import data processor
-from data_processor import process_excel
+from data_processor import load_processed_frame, build_dashboard_data
+from snapshot_store import open_store, parse_taken_at, check_snapshot_order, append_snapshot, get_history_data
+from environments import (
+    parse_environment_spec,
+    check_environment_names,
+    process_environments,
+    merge_environments
+)
 
 # Import components
 from components import (
@@ -34,17 +52,37 @@ from components import (
     generate_tab_forecast,
     get_forecast_base_data,
     generate_tab_inventory,
-    generate_scripts
+    generate_scripts,
+    get_filter_engine_data
 )
 
 
-def generate_dashboard(input_file, output_file=None):
+def generate_dashboard(input_file, output_file=None, snapshot_path=None, history_db=None,
+                       snapshot_date=None, rules_path=None, chart_display=None, diagnostics=False,
+                       catalog_path=None, wave_plan=None, storage_map_path=None):
     """
     Generate the complete HTML dashboard from an Excel file.
     
     Args:
         input_file: Path to RHV Excel export
         output_file: Path for output HTML (optional, defaults to input name + .html)
+        snapshot_path: Snapshot cache for delta processing (optional). Only VMs
+            changed since the cached snapshot are reprocessed, and a change
+            summary is written next to the output HTML.
+        history_db: SQLite snapshot store (optional). The run is appended and
+            the recorded capacity history is plotted on the Trends tab.
+        snapshot_date: Timestamp recorded for the run in history_db (default now,
+            not older than the latest recorded run)
+        rules_path: Size/complexity rules file (optional, default default_rules.toml)
+        chart_display: Chart size limits overriding components.scripts.DEFAULT_CHART_DISPLAY
+            (optional: top_n, max_points, animation_threshold)
+        diagnostics: Add the diagnostics panel (timing spans, dataset sizes, heap)
+        catalog_path: Node SKU catalog for the cost optimizer (optional, default
+            default_catalog.toml)
+        wave_plan: Wave planner options (optional, see wave_planner.plan_waves);
+            the planned waves replace the suggested ones
+        storage_map_path: RHV storage domain -> OpenShift storage class map
+            (optional, default default_storage_map.toml)
         
     Returns:
         Path to generated HTML file
@@ -59,12 +97,88 @@ def generate_dashboard(input_file, output_file=None):
     print(f"Output: {output_file}")
     print("-" * 50)
     
+    # Reject an out-of-order history run before anything is processed
+    if history_db:
+        conn = open_store(history_db)
+        taken_at = parse_taken_at(snapshot_date)
+        check_snapshot_order(conn, taken_at)
+    
     # Step 1: Process Excel data
     print("Step 1/4: Processing Excel data...")
-    data = process_excel(input_file)
+    df, aggregates, changes = load_processed_frame(input_file, snapshot_path, rules_path)
+    data = build_dashboard_data(df, aggregates, rules_path, catalog_path, wave_plan, storage_map_path)
     print(f"  ✓ Loaded {data['stats']['total_vms']} VMs")
     print(f"  ✓ {data['stats']['total_vcpus']} vCPUs, {data['stats']['total_memory_gb']} GB Memory")
     
+    if changes is not None:
+        data['change_summary'] = changes
+        changes_file = f"{os.path.splitext(output_file)[0]}_changes.json"
+        with open(changes_file, 'w', encoding='utf-8') as f:
+            json.dump(changes, f, indent=2)
+        print(f"  ✓ Delta vs snapshot: +{changes['added']} added, -{changes['removed']} removed, "
+              f"~{changes['modified']} modified ({changes['unchanged']} unchanged)")
+        print(f"  ✓ Change summary saved to: {changes_file}")
+    elif snapshot_path:
+        print(f"  ✓ No previous snapshot, created: {snapshot_path}")
+    
+    if history_db:
+        run = append_snapshot(conn, df, aggregates, taken_at, os.path.basename(input_file))
+        data['snapshot_history'] = get_history_data(conn, data['unique_clusters'])
+        conn.close()
+        print(f"  ✓ Recorded run {run['run_id']} in {history_db} "
+              f"({data['snapshot_history']['runs']} snapshots in history)")
+    
+    return render_dashboard(data, output_file, chart_display, diagnostics)
+
+
+def generate_comparison_dashboard(input_specs, output_file=None, rules_path=None, chart_display=None,
+                                  diagnostics=False, catalog_path=None, wave_plan=None,
+                                  storage_map_path=None):
+    """
+    Generate one dashboard comparing several RHV exports.
+    
+    Args:
+        input_specs: List of export paths, each optionally prefixed NAME=
+            (the environment name defaults to the file name)
+        output_file: Path for output HTML (optional, defaults to
+            <first input>_comparison_dashboard.html)
+        rules_path: Size/complexity rules file (optional, default default_rules.toml)
+        chart_display: Chart size limits (optional, see generate_dashboard)
+        diagnostics: Add the diagnostics panel (optional, see generate_dashboard)
+        catalog_path: Node SKU catalog (optional, see generate_dashboard)
+        wave_plan: Wave planner options (optional, see generate_dashboard)
+        storage_map_path: Storage class map (optional, see generate_dashboard)
+        
+    Returns:
+        Path to generated HTML file
+    """
+    specs = [parse_environment_spec(spec) for spec in input_specs]
+    
+    if output_file is None:
+        base_name = os.path.splitext(os.path.basename(specs[0][1]))[0]
+        output_file = f"{base_name}_comparison_dashboard.html"
+    
+    for name, path in specs:
+        print(f"Processing: {path} ({name})")
+    print(f"Output: {output_file}")
+    print("-" * 50)
+    
+    # Step 1: Process every export in parallel, then merge their aggregates
+    print(f"Step 1/4: Processing {len(specs)} environments...")
+    data = merge_environments(
+        process_environments(specs, rules_path), rules_path, catalog_path, wave_plan, storage_map_path
+    )
+    for env in data['environments']:
+        print(f"  ✓ {env['name']}: {env['stats']['total_vms']} VMs, "
+              f"{env['stats']['total_vcpus']} vCPUs, {env['stats']['total_memory_gb']} GB Memory")
+    print(f"  ✓ Combined: {data['stats']['total_vms']} VMs across {data['stats']['clusters']} clusters")
+    
+    return render_dashboard(data, output_file, chart_display, diagnostics)
+
+
+def render_dashboard(data, output_file, chart_display=None, diagnostics=False):
+    """Render processed dashboard data to an HTML file (steps 2-4)."""
+    
     # Step 2: Generate tab HTML content
     print("Step 2/4: Generating tab content...")
     tabs = {
@@ -84,7 +198,8 @@ def generate_dashboard(input_file, output_file=None):
         'sizing': get_sizing_chart_configs(data),
         'migration': get_migration_chart_configs(data),
         'trends': get_trends_chart_configs(data),
-        'forecast': get_forecast_base_data(data)
+        'forecast': get_forecast_base_data(data),
+        'display': chart_display or {}
     }
     print(f"  ✓ Prepared chart data for all tabs")
     
@@ -105,8 +220,9 @@ def generate_dashboard(input_file, output_file=None):
     html_parts.append(wrap_tab_content('forecast', tabs['forecast']))
     html_parts.append(wrap_tab_content('inventory', tabs['inventory']))
     
-    # Generate JavaScript
-    scripts = generate_scripts(data, chart_configs)
+    # Filter engine data (VM list + filter cube) and JavaScript
+    html_parts.append(get_filter_engine_data(data))
+    scripts = generate_scripts(data, chart_configs, diagnostics)
     
     # Base end (close content wrapper, scripts, close html)
     html_parts.append(get_base_end(scripts))
@@ -126,6 +242,122 @@ def generate_dashboard(input_file, output_file=None):
     return output_file
 
 
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Generate the RHV to OpenShift Virtualization migration dashboard.'
+    )
+    parser.add_argument(
+        'inputs', nargs='+', metavar='input',
+        help='RHV Excel export(s); several exports (optionally NAME=path) build a comparison '
+             'dashboard. A trailing .html argument is taken as the output file'
+    )
+    parser.add_argument('-o', '--output', dest='output_file',
+                        help='Output HTML (default: <input>_dashboard.html)')
+    parser.add_argument(
+        '--delta', metavar='SNAPSHOT', dest='snapshot_path',
+        help='Snapshot cache file: reprocess only VMs changed since the previous run'
+    )
+    parser.add_argument(
+        '--history', metavar='DB', dest='history_db',
+        help='SQLite snapshot store: record this run and plot capacity history on the Trends tab'
+    )
+    parser.add_argument(
+        '--snapshot-date', metavar='YYYY-MM-DD', dest='snapshot_date',
+        help='Date (or ISO 8601 timestamp) recorded for this run in the history store, not older '
+             'than its latest run (default: now)'
+    )
+    parser.add_argument(
+        '--rules', metavar='FILE', dest='rules_path',
+        help='Size category / complexity rules (TOML or YAML, default: default_rules.toml)'
+    )
+    parser.add_argument(
+        '--catalog', metavar='FILE', dest='catalog_path',
+        help='Node SKU catalog for the cost optimizer (TOML or YAML, default: default_catalog.toml)'
+    )
+    parser.add_argument(
+        '--storage-map', metavar='FILE', dest='storage_map_path',
+        help='RHV storage domain -> OpenShift storage class map (TOML or YAML, '
+             'default: default_storage_map.toml)'
+    )
+    parser.add_argument(
+        '--plan-waves', metavar='N', dest='plan_waves', type=int,
+        help='Replace the suggested waves with N balanced waves (more if the caps below need them)'
+    )
+    parser.add_argument('--wave-max-vms', metavar='N', dest='max_vms', type=int,
+                        help='Planned waves: at most N VMs per wave')
+    parser.add_argument('--wave-max-tb', metavar='TB', dest='max_tb', type=float,
+                        help='Planned waves: at most TB of used storage transferred per wave')
+    parser.add_argument('--wave-max-vcpus', metavar='N', dest='max_vcpus', type=int,
+                        help='Planned waves: at most N vCPUs landed per wave')
+    parser.add_argument('--wave-max-hours', metavar='H', dest='max_hours', type=float,
+                        help='Planned waves: maintenance window hours per wave (estimated transfer time)')
+    parser.add_argument(
+        '--keep-together', choices=['cluster', 'host'], dest='keep_together',
+        help='Planned waves: move every cluster or RHV host in a single wave'
+    )
+    parser.add_argument(
+        '--top-n', metavar='N', dest='top_n', type=int,
+        help='Bars shown in host, guest OS and cluster charts; the rest are grouped as Other '
+             '(default: 20)'
+    )
+    parser.add_argument(
+        '--max-points', metavar='N', dest='max_points', type=int,
+        help='Points per trend series before it is downsampled (default: 120)'
+    )
+    parser.add_argument(
+        '--animation-threshold', metavar='N', dest='animation_threshold', type=int,
+        help='Charts with more data points than this update without animation (default: 500)'
+    )
+    parser.add_argument(
+        '--diagnostics', action='store_true',
+        help='Add a diagnostics panel to the dashboard (timings, dataset sizes, heap; JSON export)'
+    )
+    args = parser.parse_args(argv)
+    
+    # Chart size limits given on the command line (the rest keep their defaults)
+    args.chart_display = {}
+    for option, minimum in {'top_n': 2, 'max_points': 3, 'animation_threshold': 0}.items():
+        value = getattr(args, option)
+        if value is None:
+            continue
+        if value < minimum:
+            parser.error(f"--{option.replace('_', '-')} must be at least {minimum}")
+        args.chart_display[option] = value
+    
+    if args.snapshot_date is not None:
+        try:
+            args.snapshot_date = parse_taken_at(args.snapshot_date)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    # Wave planner options (planning is off without --plan-waves)
+    caps = {option: getattr(args, option) for option in ['max_vms', 'max_tb', 'max_vcpus', 'max_hours']}
+    args.wave_plan = None
+    if args.plan_waves is not None:
+        if args.plan_waves < 1:
+            parser.error('--plan-waves must be at least 1')
+        if any(cap is not None and cap <= 0 for cap in caps.values()):
+            parser.error('wave caps must be positive')
+        args.wave_plan = {'waves': args.plan_waves, 'keep_together': args.keep_together, **caps}
+    elif args.keep_together or any(cap is not None for cap in caps.values()):
+        parser.error('--wave-max-* and --keep-together need --plan-waves')
+    
+    # Backward compatible form: generate_dashboard.py <input_excel> <output_html>
+    if len(args.inputs) > 1 and args.inputs[-1].lower().endswith(('.html', '.htm')):
+        if args.output_file:
+            parser.error('output file given twice')
+        args.output_file = args.inputs.pop()
+    
+    if len(args.inputs) > 1 and (args.snapshot_path or args.history_db):
+        parser.error('--delta and --history apply to a single export')
+    try:
+        check_environment_names([parse_environment_spec(spec) for spec in args.inputs])
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
 def main():
     """Command line entry point."""
     if len(sys.argv) < 2:
@@ -133,15 +365,25 @@ def main():
         print("Error: Please provide an input Excel file")
         sys.exit(1)
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    args = parse_args()
     
-    if not os.path.exists(input_file):
-        print(f"Error: File not found: {input_file}")
-        sys.exit(1)
+    for spec in args.inputs:
+        path = parse_environment_spec(spec)[1]
+        if not os.path.exists(path):
+            print(f"Error: File not found: {path}")
+            sys.exit(1)
     
     try:
-        result = generate_dashboard(input_file, output_file)
+        if len(args.inputs) > 1:
+            return generate_comparison_dashboard(
+                args.inputs, args.output_file, args.rules_path, args.chart_display, args.diagnostics,
+                args.catalog_path, args.wave_plan, args.storage_map_path
+            )
+        result = generate_dashboard(
+            parse_environment_spec(args.inputs[0])[1], args.output_file, args.snapshot_path,
+            args.history_db, args.snapshot_date, args.rules_path, args.chart_display,
+            args.diagnostics, args.catalog_path, args.wave_plan, args.storage_map_path
+        )
         return result
     except Exception as e:
         print(f"Error generating dashboard: {e}")
@@ -0,0 +1,309 @@
+"""
+node_catalog.py
+---------------
+Node SKU catalog and cost optimizer.
+
+A catalog file (TOML or YAML, default default_catalog.toml) lists the node
+models clusters can be built from, with cores, vCPUs, memory and a price per
+node. For every cluster and forecast year, the optimizer picks the cheapest mix
+of at most two SKUs whose usable capacity (capacity / overhead) carries the
+projected vCPU and memory demand plus HA spare nodes (as large as the mix's
+largest SKU), with at least the HA minimum of nodes. SKUs smaller than the cluster's largest
+VM are not considered for it.
+
+Every SKU pair x cluster x year is one entry of flat NumPy arrays. For a
+count of the pair's first SKU the second SKU's count follows from the needs,
+so each entry is searched along the first count only: outward from the
+optimum with fractional node counts, and only while that lower bound is below
+the cheapest mix found for the cluster and year. The result is the exact
+integer optimum; 8 SKUs x 2,000 clusters x 3 years take about 0.2 seconds.
+"""
+
+import os
+
+import numpy as np
+
+from placement import OVERHEAD_FACTOR, HA_SPARE_NODES, MIN_NODES
+from forecast import FORECAST_YEARS, DEFAULT_GROWTH_RATE, cluster_growth
+from rules import read_rules_file
+
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'default_catalog.toml')
+
+
+def load_catalog(path=None):
+    """
+    Load a node SKU catalog (default: default_catalog.toml).
+
+    Returns:
+        Dictionary with 'path', 'currency', 'price_period' and 'skus': a list
+        of {'name', 'label', 'cores', 'vcpus', 'memory', 'price'} entries
+    """
+    path = path or DEFAULT_CATALOG_PATH
+    definitions = read_rules_file(path)
+    entries = definitions.get('sku') or []
+    if not entries:
+        raise ValueError(f"Catalog {path} defines no [[sku]] entries")
+
+    skus = []
+    for i, entry in enumerate(entries):
+        missing = [key for key in ('vcpus', 'memory', 'price') if key not in entry]
+        if missing:
+            raise ValueError(f"SKU {i} in {path} has no {', '.join(missing)}")
+        if float(entry['vcpus']) <= 0 or float(entry['memory']) <= 0 or float(entry['price']) < 0:
+            raise ValueError(f"SKU {i} in {path} needs positive vcpus and memory and a price >= 0")
+        name = str(entry.get('name', f"sku-{i + 1}"))
+        skus.append({
+            'name': name,
+            'label': str(entry.get('label', name)),
+            'cores': int(entry.get('cores', entry['vcpus'] // 2)),
+            'vcpus': int(entry['vcpus']),
+            'memory': int(entry['memory']),
+            'price': float(entry['price'])
+        })
+    return {
+        'path': path,
+        'currency': str(definitions.get('currency', 'USD')),
+        'price_period': str(definitions.get('price_period', 'year')),
+        'skus': skus
+    }
+
+
+def _largest_vms(shapes, clusters):
+    """Largest vCPU count and memory of a VM per cluster (0 for clusters without shapes)."""
+    largest = shapes.groupby('cluster_name', sort=False)[['num_of_cpus', 'mem_size_GB']].max()
+    largest = largest.reindex(clusters).fillna(0)
+    return largest['num_of_cpus'].to_numpy(dtype=float), largest['mem_size_GB'].to_numpy(dtype=float)
+
+
+def _nodes_needed(need, capacity):
+    """Nodes of a capacity covering a need (the epsilon absorbs float error on exact fits)."""
+    return np.ceil(np.maximum(need, 0) / capacity - 1e-9)
+
+
+def _cheapest_counts(need_vcpus, need_memory, va, vb, ma, mb, pa, pb, most_first, group, min_nodes):
+    """
+    Cheapest counts of the two SKUs of a pair, for 1-D arrays of entries.
+
+    For a count of the first SKU the second SKU's count follows from the
+    needs. With fractional second-SKU counts the cost is convex in the first
+    count and at most one second-SKU node below the integer cost, so only
+    counts whose fractional cost is below the best integer cost found can win:
+    the best of the entry itself, or of any other pair for the same cluster and
+    year (`group`). They are searched outward from the fractional optimum, all
+    entries at once. Pruned entries keep a cost no pair would be chosen at.
+
+    Returns:
+        (cost, first count, second count) arrays
+    """
+    # Second-SKU nodes for the needs alone, and per first-SKU node they replace
+    vcpu_nodes, vcpu_rate = need_vcpus / vb, va / vb
+    memory_nodes, memory_rate = need_memory / mb, ma / mb
+
+    def second_count(index, count, fractional=False):
+        rest = np.maximum(
+            np.maximum(vcpu_nodes[index] - count * vcpu_rate[index],
+                       memory_nodes[index] - count * memory_rate[index]),
+            np.maximum(min_nodes - count, 0)
+        )
+        return rest if fractional else np.ceil(rest - 1e-9)
+
+    def cost(index, count, fractional=False):
+        return count * pa[index] + second_count(index, count, fractional) * pb[index]
+
+    every = slice(None)
+    # The fractional optimum is at a breakpoint: where two of the vCPU, memory
+    # and minimum-nodes bounds on the second count cross, where one of them
+    # reaches zero, or an end
+    determinant = va * mb - ma * vb
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossings = [
+            np.where(determinant != 0, (need_vcpus * mb - need_memory * vb) / determinant, 0),
+            np.where(va != vb, (need_vcpus - min_nodes * vb) / (va - vb), 0),
+            np.where(ma != mb, (need_memory - min_nodes * mb) / (ma - mb), 0)
+        ]
+    breakpoints = np.clip(
+        np.stack([np.zeros_like(most_first), *crossings, need_vcpus / va, need_memory / ma,
+                  np.full_like(most_first, min_nodes), most_first]),
+        0, most_first
+    )
+    fractional = np.stack([cost(every, point, True) for point in breakpoints])
+    lowest = fractional.min(axis=0)
+    center = np.floor(np.take_along_axis(breakpoints, fractional.argmin(axis=0)[None], axis=0)[0])
+
+    best_cost = cost(every, center)
+    best_first = center
+    group_cost = np.full(group.max() + 1 if len(group) else 0, np.inf)
+    np.minimum.at(group_cost, group, best_cost)
+    # Next count to try below and above the optimum, while that side can still win
+    sides = [(center - 1, -1, np.ones(len(center), dtype=bool)),
+             (center + 1, 1, np.ones(len(center), dtype=bool))]
+    active = np.flatnonzero(lowest < np.minimum(best_cost, group_cost[group]) - 1e-6)
+    while active.size:
+        for counts, step, alive in sides:
+            count = counts[active]
+            promising = alive[active] & (count >= 0) & (count <= most_first[active])
+            candidates = active[promising]
+            bound = np.minimum(best_cost[candidates], group_cost[group[candidates]])
+            promising[promising] = cost(candidates, count[promising], True) < bound - 1e-6
+            index, count = active[promising], count[promising]
+            integer = cost(index, count)
+            better = integer < best_cost[index]
+            best_cost[index[better]] = integer[better]
+            best_first[index[better]] = count[better]
+            np.minimum.at(group_cost, group[index], integer)
+            alive[active] = promising
+            counts[active] += step
+        active = active[sides[0][2][active] | sides[1][2][active]]
+    return best_cost, best_first, second_count(every, best_first)
+
+
+def optimize_node_costs(shapes, by_cluster, catalog, growth_models=None, overhead=OVERHEAD_FACTOR,
+                        spare_nodes=HA_SPARE_NODES, min_nodes=MIN_NODES, years=FORECAST_YEARS):
+    """
+    Cheapest node mix per cluster and forecast year.
+
+    Args:
+        shapes: vm_shapes() frame (largest VM per cluster)
+        by_cluster: distributions['by_cluster'] (today's vCPUs and memory)
+        catalog: load_catalog() result
+        growth_models: fit_growth_models() result; without it every cluster
+            grows by DEFAULT_GROWTH_RATE a year
+        overhead, spare_nodes, min_nodes: Sizing rules, as in placement.py
+        years: Forecast years (without growth models)
+
+    Returns:
+        JSON-friendly dictionary with the catalog, the sizing rules, 'years',
+        'clusters': {cluster: {'mix': [{sku: nodes}], 'nodes': [...],
+        'cost': [...], 'single': cheapest one-SKU option in the last year}}
+        (None values for clusters no SKU can hold) and 'total'
+    """
+    skus = catalog['skus']
+    clusters = list(by_cluster)
+    growth = cluster_growth(clusters, growth_models, years)
+    years = list(growth_models['years']) if growth_models else list(years)
+
+    # Projected demand (clusters, years)
+    demand_vcpus = np.ceil(np.array([by_cluster[c]['num_of_cpus'] for c in clusters], dtype=float)[:, None]
+                           * growth['vcpus'])
+    demand_memory = np.ceil(np.array([by_cluster[c]['mem_size_GB'] for c in clusters], dtype=float)[:, None]
+                            * growth['memory'])
+
+    # Usable capacity and price per SKU; every pair a <= b (a == b: one SKU)
+    vcpus = np.array([sku['vcpus'] for sku in skus], dtype=float) / overhead
+    memory = np.array([sku['memory'] for sku in skus], dtype=float) / overhead
+    price = np.array([sku['price'] for sku in skus], dtype=float)
+    first, second = np.triu_indices(len(skus))
+    va, vb = vcpus[first][:, None, None], vcpus[second][:, None, None]
+    ma, mb = memory[first][:, None, None], memory[second][:, None, None]
+    pa, pb = price[first][:, None, None], price[second][:, None, None]
+
+    # Required capacity (pairs, clusters, years): demand plus spares of the larger SKU
+    shape = (len(first), len(clusters), len(years))
+    need_vcpus = np.broadcast_to(demand_vcpus[None] + spare_nodes * np.maximum(va, vb), shape)
+    need_memory = np.broadcast_to(demand_memory[None] + spare_nodes * np.maximum(ma, mb), shape)
+    # A pair of one SKU is all "second" nodes
+    most_first = np.where(
+        (first == second)[:, None, None], 0,
+        np.maximum(np.maximum(_nodes_needed(need_vcpus, va), _nodes_needed(need_memory, ma)), min_nodes)
+    )
+
+    # Only pairs whose SKUs both hold the cluster's largest VM
+    largest_vcpus, largest_memory = _largest_vms(shapes, clusters)
+    fits = (vcpus[:, None] >= largest_vcpus[None]) & (memory[:, None] >= largest_memory[None])
+    entries = np.flatnonzero(np.broadcast_to((fits[first] & fits[second])[:, :, None], shape))
+    flat = [np.broadcast_to(values, shape).ravel()[entries]
+            for values in (need_vcpus, need_memory, va, vb, ma, mb, pa, pb, most_first)]
+    group = entries % (len(clusters) * len(years))
+    entry_cost, entry_first, entry_second = _cheapest_counts(*flat, group, min_nodes)
+
+    best_cost = np.full(shape, np.inf)
+    best_first = np.zeros(shape)
+    best_second = np.zeros(shape)
+    best_cost.ravel()[entries] = entry_cost
+    best_first.ravel()[entries] = entry_first
+    best_second.ravel()[entries] = entry_second
+
+    pair = best_cost.argmin(axis=0)
+    cost = np.take_along_axis(best_cost, pair[None], axis=0)[0]
+    count_first = np.take_along_axis(best_first, pair[None], axis=0)[0].astype(int)
+    count_second = np.take_along_axis(best_second, pair[None], axis=0)[0].astype(int)
+    single_pairs = np.flatnonzero(first == second)
+    single = single_pairs[best_cost[single_pairs, :, -1].argmin(axis=0)]
+
+    result_clusters = {}
+    for position, cluster in enumerate(clusters):
+        if not np.isfinite(cost[position, -1]):
+            result_clusters[cluster] = {'mix': None, 'nodes': None, 'cost': None, 'single': None}
+            continue
+        mixes = []
+        for year in range(len(years)):
+            mix = {}
+            for sku, nodes in ((first, count_first), (second, count_second)):
+                name = skus[sku[pair[position, year]]]['name']
+                if nodes[position, year]:
+                    mix[name] = mix.get(name, 0) + int(nodes[position, year])
+            mixes.append(mix)
+        single_index = single[position]
+        result_clusters[cluster] = {
+            'mix': mixes,
+            'nodes': (count_first[position] + count_second[position]).tolist(),
+            'cost': cost[position].round(2).tolist(),
+            'single': {
+                'sku': skus[first[single_index]]['name'],
+                'nodes': int(best_first[single_index, position, -1] + best_second[single_index, position, -1]),
+                'cost': round(float(best_cost[single_index, position, -1]), 2)
+            }
+        }
+
+    sized = np.isfinite(cost[:, -1])
+    return {
+        'source': os.path.basename(catalog['path']),
+        'currency': catalog['currency'],
+        'price_period': catalog['price_period'],
+        'skus': skus,
+        'years': years,
+        'scenario': 'fitted' if growth_models else f"+{DEFAULT_GROWTH_RATE}% annually",
+        'overhead': overhead,
+        'ha_spare_nodes': spare_nodes,
+        'min_nodes': min_nodes,
+        'clusters': result_clusters,
+        'total': {
+            'nodes': (count_first + count_second)[sized].sum(axis=0).tolist(),
+            'cost': cost[sized].sum(axis=0).round(2).tolist(),
+            'single_cost': round(float(best_cost[single[sized], np.flatnonzero(sized), -1].sum()), 2),
+            'unsized': int((~sized).sum())
+        }
+    }
+
+
+# For testing
+if __name__ == '__main__':
+    import sys
+    import time
+
+    import pandas as pd
+
+    catalog = load_catalog(sys.argv[1] if len(sys.argv) > 1 else None)
+    rng = np.random.default_rng(11)
+    n = 200000
+    frame = pd.DataFrame({
+        'cluster_name': rng.choice([f'CLU-{i:04d}' for i in range(2000)], n),
+        'num_of_cpus': rng.choice([1, 2, 2, 4, 4, 8, 16, 24], n),
+        'mem_size_GB': rng.choice([2, 4, 8, 8, 16, 16, 32, 64, 96, 128, 200], n)
+    })
+    shapes = frame.groupby(['cluster_name', 'num_of_cpus', 'mem_size_GB']).size().rename('vm_count').reset_index()
+    by_cluster = frame.groupby('cluster_name')[['num_of_cpus', 'mem_size_GB']].sum().to_dict('index')
+
+    start = time.perf_counter()
+    costs = optimize_node_costs(shapes, by_cluster, catalog)
+    elapsed = time.perf_counter() - start
+    print(f"{len(catalog['skus'])} SKUs x {len(by_cluster)} clusters x {len(costs['years'])} years "
+          f"in {elapsed:.3f}s ({costs['scenario']})")
+    for year, nodes, cost in zip(costs['years'], costs['total']['nodes'], costs['total']['cost']):
+        print(f"  {year}: {nodes} nodes, {cost:,.0f} {catalog['currency']}/{catalog['price_period']}")
+    print(f"  cheapest single SKU per cluster in {costs['years'][-1]}: {costs['total']['single_cost']:,.0f}")
+    for cluster in list(costs['clusters'])[:3]:
+        entry = costs['clusters'][cluster]
+        print(f"  {cluster}: {entry['mix'][-1]} = {entry['cost'][-1]:,.0f} "
+              f"(single: {entry['single']['nodes']} x {entry['single']['sku']} = {entry['single']['cost']:,.0f})")
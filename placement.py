@@ -0,0 +1,369 @@
+"""
+placement.py
+------------
+Bin-packing placement simulator for node count recommendations.
+Each cluster's VMs are packed by their (vCPU, memory) vectors onto a candidate
+node spec with three multi-dimensional heuristics; the packing with the fewest
+nodes is kept and HA spare nodes are added on top.
+
+VMs are packed by shape (distinct vCPU/memory pairs with a count), so the cost
+grows with the number of shapes and nodes instead of the number of VMs:
+- ffd / best_fit: shapes largest first; all VMs of a shape are placed in one
+  NumPy step. For identical items first-fit fills the first nodes with room in
+  order and best-fit fills the tightest nodes first, so the batch gives the
+  same placement as placing them one by one.
+- dot_product: nodes are filled one at a time, each time with the VM whose
+  vector is best aligned with the node's free capacity (FFD-DotProduct);
+  copies of a shape are added in one step while it stays the best aligned. A
+  filled node's mix is then repeated for as many nodes as the remaining VMs
+  allow. This avoids the CPU-heavy / memory-heavy segregation of plain FFD.
+
+A cluster with more than MAX_PACK_SHAPES shapes (e.g. memory sizes spread over
+every GB) is packed with neighbouring shapes merged into their VM-weighted mean
+(coarsen_shapes), so packing time stays bounded whatever the spread of sizes;
+the total vCPU and memory demand is unchanged.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# Candidate node specs (schedulable vCPUs, memory GB) offered on the Forecast tab
+NODE_SPECS = {
+    'small': {'label': 'Small', 'cores': 32, 'vcpus': 64, 'memory': 512},
+    'medium': {'label': 'Medium', 'cores': 64, 'vcpus': 128, 'memory': 1024},
+    'large': {'label': 'Large', 'cores': 128, 'vcpus': 256, 'memory': 2048}
+}
+
+# Headroom for scheduling, platform overhead and bursts: VMs may use 1/1.2 of a node
+OVERHEAD_FACTOR = 1.2
+# Spare nodes per cluster so a node failure (or drain) can be absorbed
+HA_SPARE_NODES = 1
+# Minimum cluster size for high availability
+MIN_NODES = 3
+
+HEURISTICS = ('ffd', 'best_fit', 'dot_product')
+
+# Above this many shapes per packing, shapes are merged (see coarsen_shapes)
+MAX_PACK_SHAPES = 128
+
+
+def vm_shapes(df, cluster_column='cluster_name'):
+    """Count VMs per cluster and (vCPU, memory) shape."""
+    shapes = df.groupby([cluster_column, 'num_of_cpus', 'mem_size_GB'], sort=False).size()
+    return shapes.rename('vm_count').reset_index().rename(columns={cluster_column: 'cluster_name'})
+
+
+def _quantile_buckets(values, counts, levels):
+    """Bucket of each value: `levels` runs of (about) equal VM count over the sorted distinct values."""
+    _, inverse = np.unique(values, return_inverse=True)
+    weight = np.bincount(inverse, weights=counts)
+    before = np.cumsum(weight) - weight
+    return (before * levels // weight.sum()).astype(np.int64)[inverse]
+
+
+def coarsen_shapes(vcpus, memory, counts, max_shapes=MAX_PACK_SHAPES):
+    """
+    Merge shapes into at most max_shapes. vCPU and memory values are split
+    into runs of about equal VM count (as many runs per dimension as the
+    limit allows) and each run pair becomes one shape with the VM-weighted
+    mean vCPUs and memory, so the total demand is unchanged. Returns the
+    merged vcpus, memory and counts (the input when it is within the limit).
+    """
+    if len(counts) <= max_shapes:
+        return vcpus, memory, counts
+    distinct_memory = len(np.unique(memory))
+    vcpu_levels = min(len(np.unique(vcpus)), max(math.isqrt(max_shapes), max_shapes // distinct_memory))
+    memory_levels = max_shapes // vcpu_levels
+    keys = (_quantile_buckets(vcpus, counts, vcpu_levels) * memory_levels
+            + _quantile_buckets(memory, counts, memory_levels))
+    _, inverse = np.unique(keys, return_inverse=True)
+    merged = np.bincount(inverse, weights=counts)
+    return (
+        np.bincount(inverse, weights=vcpus * counts) / merged,
+        np.bincount(inverse, weights=memory * counts) / merged,
+        merged.astype(np.int64)
+    )
+
+
+def _fit_counts(free_vcpus, free_memory, vcpus, memory):
+    """How many VMs of one shape still fit on each open node."""
+    unlimited = np.full(len(free_vcpus), np.inf)
+    # The epsilon absorbs float error on exactly full nodes
+    by_vcpus = np.floor(free_vcpus / vcpus + 1e-9) if vcpus > 0 else unlimited
+    by_memory = np.floor(free_memory / memory + 1e-9) if memory > 0 else unlimited
+    return np.minimum(by_vcpus, by_memory)
+
+
+def _pack_decreasing(vcpus, memory, counts, node_vcpus, node_memory, best_fit):
+    """First-fit / best-fit decreasing over shapes; returns per-node free vCPUs and memory."""
+    # Largest first: by dominant share of a node, then by total share
+    dominant = np.maximum(vcpus / node_vcpus, memory / node_memory)
+    total = vcpus / node_vcpus + memory / node_memory
+    order = np.lexsort((-total, -dominant))
+
+    free_vcpus = np.empty(0)
+    free_memory = np.empty(0)
+    for i in order:
+        shape_vcpus, shape_memory, count = vcpus[i], memory[i], int(counts[i])
+        fits = _fit_counts(free_vcpus, free_memory, shape_vcpus, shape_memory)
+        candidates = np.flatnonzero(fits > 0)
+        if best_fit:
+            residual = free_vcpus[candidates] / node_vcpus + free_memory[candidates] / node_memory
+            candidates = candidates[np.argsort(residual, kind='stable')]
+        room = np.minimum(fits[candidates], count)
+        placed = np.clip(count - (np.cumsum(room) - room), 0, room)
+        free_vcpus[candidates] -= placed * shape_vcpus
+        free_memory[candidates] -= placed * shape_memory
+
+        # The rest goes to new nodes, each filled as far as the shape allows
+        remaining = count - int(placed.sum())
+        if remaining > 0:
+            per_node = int(min(
+                np.floor(node_vcpus / shape_vcpus + 1e-9) if shape_vcpus > 0 else remaining,
+                np.floor(node_memory / shape_memory + 1e-9) if shape_memory > 0 else remaining
+            ))
+            full, last = divmod(remaining, per_node)
+            on_node = np.full(full + (last > 0), per_node)
+            if last:
+                on_node[-1] = last
+            free_vcpus = np.append(free_vcpus, node_vcpus - on_node * shape_vcpus)
+            free_memory = np.append(free_memory, node_memory - on_node * shape_memory)
+    return free_vcpus, free_memory
+
+
+def _pack_dot_product(vcpus, memory, counts, node_vcpus, node_memory):
+    """Node-by-node dot-product packing with mix replication; returns per-node free vCPUs and memory."""
+    vcpu_share = vcpus / node_vcpus
+    memory_share = memory / node_memory
+    remaining = counts.copy()
+    free_vcpus = []
+    free_memory = []
+    while remaining.any():
+        mix = np.zeros(len(counts), dtype=np.int64)
+        free_v, free_m = 1.0, 1.0
+        while True:
+            fits = (remaining > mix) & (vcpu_share <= free_v + 1e-9) & (memory_share <= free_m + 1e-9)
+            if not fits.any():
+                break
+            scores = np.where(fits, vcpu_share * free_v + memory_share * free_m, -1)
+            shape = int(np.argmax(scores))
+            share_v, share_m = vcpu_share[shape], memory_share[shape]
+            copies = min(
+                remaining[shape] - mix[shape],
+                math.floor((free_v + 1e-9) / share_v) if share_v > 0 else math.inf,
+                math.floor((free_m + 1e-9) / share_m) if share_m > 0 else math.inf
+            )
+            if copies > 1:
+                # After k more copies every score drops by k * (vector . share); the
+                # shape is picked again while its score stays clearly the highest
+                # (near-ties are left to argmax)
+                drop = vcpu_share * share_v + memory_share * share_m
+                gap, closing = scores[shape] - scores, drop[shape] - drop
+                rivals = fits & ((closing > 0) | (gap <= 1e-9))
+                rivals[shape] = False
+                overtake = np.ceil(np.divide(gap - 1e-9, closing, out=np.ones_like(gap), where=closing > 0))
+                copies = max(1, min(copies, overtake[rivals].min(initial=np.inf)))
+            copies = int(copies)
+            mix[shape] += copies
+            # One subtraction per copy keeps free bit-identical to placing them singly
+            for _ in range(copies):
+                free_v -= share_v
+                free_m -= share_m
+
+        # Repeat the mix while every VM in it is still available
+        used = mix > 0
+        repeats = int((remaining[used] // mix[used]).min())
+        remaining -= mix * repeats
+        free_vcpus.append(np.full(repeats, free_v * node_vcpus))
+        free_memory.append(np.full(repeats, free_m * node_memory))
+    if not free_vcpus:
+        return np.empty(0), np.empty(0)
+    return np.concatenate(free_vcpus), np.concatenate(free_memory)
+
+
+def pack_shapes(vcpus, memory, counts, node_vcpus, node_memory, heuristic='dot_product'):
+    """
+    Pack VM shapes onto identical nodes.
+
+    Args:
+        vcpus, memory, counts: Per-shape vCPUs, memory GB and VM count
+        node_vcpus, node_memory: Usable capacity of one node
+        heuristic: 'ffd' (first-fit decreasing), 'best_fit' (best-fit decreasing;
+            the tightest node that fits, by normalized free capacity) or
+            'dot_product' (see module docstring)
+
+    Returns:
+        Dictionary with 'nodes' (opened), per-node 'free_vcpus' / 'free_memory'
+        arrays and 'oversized' (VMs larger than a node, one dedicated node each)
+    """
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic '{heuristic}', expected one of {HEURISTICS}")
+    vcpus = np.asarray(vcpus, dtype=float)
+    memory = np.asarray(memory, dtype=float)
+    counts = np.asarray(counts, dtype=np.int64)
+
+    # VMs that use nothing need no node; VMs larger than a node get one each
+    keep = (counts > 0) & ((vcpus > 0) | (memory > 0))
+    oversized = keep & ((vcpus > node_vcpus) | (memory > node_memory))
+    oversized_count = int(counts[oversized].sum())
+    keep &= ~oversized
+    vcpus, memory, counts = coarsen_shapes(vcpus[keep], memory[keep], counts[keep])
+
+    if heuristic == 'dot_product':
+        free_vcpus, free_memory = _pack_dot_product(vcpus, memory, counts, node_vcpus, node_memory)
+    else:
+        free_vcpus, free_memory = _pack_decreasing(
+            vcpus, memory, counts, node_vcpus, node_memory, heuristic == 'best_fit'
+        )
+    free_vcpus = np.append(free_vcpus, np.zeros(oversized_count))
+    free_memory = np.append(free_memory, np.zeros(oversized_count))
+
+    return {
+        'nodes': len(free_vcpus),
+        'free_vcpus': free_vcpus,
+        'free_memory': free_memory,
+        'oversized': oversized_count
+    }
+
+
+def size_cluster(shapes, spec, overhead=OVERHEAD_FACTOR, spare_nodes=HA_SPARE_NODES,
+                 min_nodes=MIN_NODES):
+    """
+    Node recommendation for one cluster on one node spec.
+
+    Args:
+        shapes: Frame with num_of_cpus, mem_size_GB and vm_count columns
+        spec: Node spec dict with 'vcpus' and 'memory'
+        overhead: Capacity headroom factor (VMs use at most capacity / overhead)
+        spare_nodes: HA spare nodes added to the packed nodes
+        min_nodes: Minimum cluster size
+
+    Returns:
+        Dictionary with packed_nodes, nodes (recommended), fluid_nodes (lower
+        bound if VMs could be split), heuristic, oversized, bottleneck and
+        vCPU/memory utilization of the packed nodes (% of usable capacity)
+    """
+    node_vcpus = spec['vcpus'] / overhead
+    node_memory = spec['memory'] / overhead
+    vcpus = shapes['num_of_cpus'].to_numpy(dtype=float)
+    memory = shapes['mem_size_GB'].to_numpy(dtype=float)
+    counts = shapes['vm_count'].to_numpy(dtype=np.int64)
+
+    packings = {h: pack_shapes(vcpus, memory, counts, node_vcpus, node_memory, h) for h in HEURISTICS}
+    heuristic = min(HEURISTICS, key=lambda h: packings[h]['nodes'])
+    packing = packings[heuristic]
+    packed = packing['nodes']
+
+    demand_vcpus = float((vcpus * counts).sum())
+    demand_memory = float((memory * counts).sum())
+    vcpu_share = demand_vcpus / node_vcpus
+    memory_share = demand_memory / node_memory
+    return {
+        'packed_nodes': packed,
+        'nodes': max(min_nodes, packed + spare_nodes) if packed else 0,
+        'fluid_nodes': int(np.ceil(max(vcpu_share, memory_share) - 1e-9)),
+        'heuristic': heuristic,
+        'oversized': packing['oversized'],
+        'bottleneck': 'memory' if memory_share >= vcpu_share else 'vcpu',
+        'vcpu_utilization': round(100 * demand_vcpus / (packed * node_vcpus), 1) if packed else 0.0,
+        'memory_utilization': round(100 * demand_memory / (packed * node_memory), 1) if packed else 0.0
+    }
+
+
+def grown_packed_nodes(shapes, spec, factors, overhead=OVERHEAD_FACTOR):
+    """
+    Packed nodes (fewest over the heuristics) after the cluster grows by each
+    factor, every shape's VM count scaled by the factor so the mix is kept.
+
+    Args:
+        shapes: Frame with num_of_cpus, mem_size_GB and vm_count columns
+        spec: Node spec dict with 'vcpus' and 'memory'
+        factors: Growth factors (1 = today)
+        overhead: Capacity headroom factor
+
+    Returns:
+        List of packed node counts, one per factor
+    """
+    node_vcpus = spec['vcpus'] / overhead
+    node_memory = spec['memory'] / overhead
+    vcpus = shapes['num_of_cpus'].to_numpy(dtype=float)
+    memory = shapes['mem_size_GB'].to_numpy(dtype=float)
+    counts = shapes['vm_count'].to_numpy(dtype=float)
+    return [
+        min(
+            pack_shapes(vcpus, memory, np.rint(counts * factor), node_vcpus, node_memory, h)['nodes']
+            for h in HEURISTICS
+        )
+        for factor in factors
+    ]
+
+
+def simulate_placement(shapes, node_specs=None, overhead=OVERHEAD_FACTOR,
+                       spare_nodes=HA_SPARE_NODES, min_nodes=MIN_NODES):
+    """
+    Size every cluster on every node spec by bin-packing its current VMs.
+
+    Args:
+        shapes: vm_shapes() frame (cluster_name, num_of_cpus, mem_size_GB, vm_count)
+        node_specs: Spec name -> {'vcpus', 'memory'} (default NODE_SPECS)
+        overhead, spare_nodes, min_nodes: Sizing rules, see size_cluster
+
+    Returns:
+        JSON-friendly dictionary with the node specs, the sizing rules and
+        'clusters': {cluster: {spec: size_cluster() result}}
+    """
+    node_specs = node_specs or NODE_SPECS
+    clusters = {}
+    for cluster, cluster_shapes in shapes.groupby('cluster_name', sort=False):
+        clusters[str(cluster)] = {
+            name: size_cluster(cluster_shapes, spec, overhead, spare_nodes, min_nodes)
+            for name, spec in node_specs.items()
+        }
+    return {
+        'node_specs': node_specs,
+        'overhead': overhead,
+        'ha_spare_nodes': spare_nodes,
+        'min_nodes': min_nodes,
+        'clusters': clusters
+    }
+
+
+# For testing
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(7)
+    n = 100000
+    frame = pd.DataFrame({
+        'cluster_name': rng.choice([f'CLU-{i:02d}' for i in range(12)], n),
+        'num_of_cpus': rng.choice([1, 2, 2, 4, 4, 8, 16, 24], n),
+        'mem_size_GB': rng.choice([2, 4, 8, 8, 16, 16, 32, 64, 96, 128, 200], n)
+    })
+
+    start = time.perf_counter()
+    shapes = vm_shapes(frame)
+    placement = simulate_placement(shapes)
+    elapsed = time.perf_counter() - start
+    print(f"Packed {n} VMs ({len(shapes)} cluster shapes) onto {len(NODE_SPECS)} node specs "
+          f"in {elapsed:.2f}s")
+    for cluster, specs in list(placement['clusters'].items())[:3]:
+        for name, result in specs.items():
+            print(f"  {cluster} {name:<6} packed {result['packed_nodes']:>4} "
+                  f"(fluid {result['fluid_nodes']:>4}, {result['heuristic']}) -> {result['nodes']} nodes, "
+                  f"{result['vcpu_utilization']}% vCPU / {result['memory_utilization']}% memory")
+
+    # Memory sizes spread over every GB: shapes are merged to MAX_PACK_SHAPES per cluster
+    spread = frame.assign(mem_size_GB=rng.integers(1, 257, n))
+    start = time.perf_counter()
+    spread_shapes = vm_shapes(spread)
+    simulate_placement(spread_shapes)
+    print(f"Packed {n} VMs ({len(spread_shapes)} cluster shapes, memory 1-256 GB) in "
+          f"{time.perf_counter() - start:.2f}s")
+
+    # 200 GB VMs on 512 GB nodes: two per node, where the fluid estimate assumes 3.5
+    big = pd.DataFrame({'cluster_name': ['BIG'], 'num_of_cpus': [8], 'mem_size_GB': [200], 'vm_count': [70]})
+    result = size_cluster(big, NODE_SPECS['small'])
+    print(f"  70 x 200 GB on small nodes: fluid {result['fluid_nodes']}, packed {result['packed_nodes']}")
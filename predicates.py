@@ -0,0 +1,287 @@
+"""
+predicates.py
+-------------
+Small predicate language over processed VM columns, e.g.
+
+    os_family = Windows and (mem_size_GB > 64 or num_of_cpus > 16)
+
+Predicates are parsed once into a tree and evaluated column-wise with
+pandas/NumPy. String conditions are evaluated on the distinct values of a
+column and broadcast back through its codes, so cost does not grow with the
+length of the guest OS strings.
+
+The same language is the dashboard's query box (compiled in the browser by
+components/filter_engine.py); query_frame evaluates those queries against a
+processed frame for scripted reporting.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# Friendly names (as used in the dashboard VM list) -> processed frame columns
+FIELD_ALIASES = {
+    'cluster': 'cluster_name',
+    'host': 'vm_host',
+    'memory_gb': 'mem_size_GB',
+    'vcpus': 'num_of_cpus',
+    'storage_gb': 'storage_size_GB',
+    'used_gb': 'used_size_GB',
+    'utilization': 'storage_efficiency',
+    'storage_domain': 'storage_pool_name'
+}
+
+# Frame columns a predicate may compare; the dashboard query box accepts the
+# same fields (QUERY_ALIASES in components/filter_engine.py). 'month' is the
+# creation month (YYYY-MM), 'environment' exists in multi-environment data only.
+QUERY_COLUMNS = [
+    'vm_name', 'cluster_name', 'vm_host', 'storage_pool_name', 'status', 'guest_os', 'os_family',
+    'os_consolidated', 'size_category', 'complexity', 'mem_size_GB', 'num_of_cpus', 'storage_size_GB',
+    'used_size_GB', 'storage_efficiency', 'creation_date', 'month', 'environment'
+]
+
+COMPARISON_OPERATORS = ['=', '==', '!=', '>', '>=', '<', '<=', '~', '!~']
+
+# Date operands: YYYY, YYYY-MM or YYYY-MM-DD, any time part is ignored
+DATE_PATTERN = re.compile(r'(\d{4})(?:-(\d{1,2})(?:-(\d{1,2}))?)?(?:[T ].*)?')
+
+TOKEN_PATTERN = re.compile(r'''\s*(?:
+    (?P<string>"[^"]*"|'[^']*')
+  | (?P<op>==|!=|>=|<=|!~|=|<|>|~)
+  | (?P<paren>[()])
+  | (?P<word>[^\s()=!<>~"']+)
+)''', re.VERBOSE)
+
+KEYWORDS = {'and', 'or', 'not', 'true', 'false'}
+
+
+def tokenize(text):
+    """Split a predicate into (kind, value) tokens."""
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Invalid predicate '{text}': unexpected '{text[position:]}'")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'string':
+            value = value[1:-1]
+        elif kind == 'word' and value.lower() in KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+def parse_predicate(text):
+    """
+    Parse a predicate into a tree of tuples:
+    ('or', [nodes]), ('and', [nodes]), ('not', node), ('const', bool)
+    and ('cmp', field, operator, value).
+    An empty predicate always matches.
+    """
+    tokens = tokenize(text or '')
+    if not tokens:
+        return ('const', True)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else (None, None)
+
+    def advance():
+        nonlocal position
+        token = peek()
+        position += 1
+        return token
+
+    def fail(message):
+        raise ValueError(f"Invalid predicate '{text}': {message}")
+
+    def parse_or():
+        nodes = [parse_and()]
+        while peek() == ('keyword', 'or'):
+            advance()
+            nodes.append(parse_and())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def parse_and():
+        nodes = [parse_not()]
+        while peek() == ('keyword', 'and'):
+            advance()
+            nodes.append(parse_not())
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def parse_not():
+        if peek() == ('keyword', 'not'):
+            advance()
+            return ('not', parse_not())
+        return parse_atom()
+
+    def parse_atom():
+        kind, value = advance()
+        if (kind, value) == ('paren', '('):
+            node = parse_or()
+            if advance() != ('paren', ')'):
+                fail("missing ')'")
+            return node
+        if kind == 'keyword' and value in ('true', 'false'):
+            return ('const', value == 'true')
+        if kind != 'word':
+            fail(f"expected a field name, got '{value}'")
+        field = value
+        op_kind, operator = advance()
+        if op_kind != 'op':
+            fail(f"expected an operator after '{field}'")
+        value_kind, operand = advance()
+        if value_kind not in ('word', 'string'):
+            fail(f"expected a value after '{field} {operator}'")
+        return ('cmp', field, '=' if operator == '==' else operator, operand)
+
+    tree = parse_or()
+    if position < len(tokens):
+        fail(f"unexpected '{tokens[position][1]}'")
+    return tree
+
+
+def resolve_field(field, columns):
+    """Map a predicate field name to a frame column."""
+    column = FIELD_ALIASES.get(field, field)
+    available = column in columns or (column == 'month' and 'creation_date' in columns)
+    if column not in QUERY_COLUMNS or not available:
+        raise ValueError(f"Unknown field '{field}' in predicate")
+    return column
+
+
+def _field_values(df, column):
+    """Values of a resolved field; 'month' is derived from creation_date when absent."""
+    if column == 'month' and column not in df.columns:
+        return df['creation_date'].dt.strftime('%Y-%m')
+    return df[column]
+
+
+def _compare(values, operator, operand):
+    """Vectorized comparison of an array against one operand."""
+    if operator == '=':
+        return values == operand
+    if operator == '!=':
+        return values != operand
+    if operator == '>':
+        return values > operand
+    if operator == '>=':
+        return values >= operand
+    if operator == '<':
+        return values < operand
+    return values <= operand
+
+
+def _evaluate_comparison(df, field, operator, operand, cache):
+    """Evaluate one field/operator/value comparison to a boolean array."""
+    column = resolve_field(field, df.columns)
+    series = _field_values(df, column)
+
+    if pd.api.types.is_numeric_dtype(series) and operator not in ('~', '!~'):
+        try:
+            number = float(operand)
+        except ValueError:
+            raise ValueError(f"Field '{field}' is numeric, got '{operand}'")
+        return _compare(series.to_numpy(dtype=float), operator, number)
+
+    # Dates compare by day, like the YYYY-MM-DD dates of the dashboard VM list
+    if pd.api.types.is_datetime64_any_dtype(series):
+        if operator not in ('~', '!~'):
+            match = DATE_PATTERN.fullmatch(operand.strip())
+            try:
+                day = np.datetime64(pd.Timestamp(*(int(part or 1) for part in match.groups())))
+            except (AttributeError, ValueError):
+                raise ValueError(f"Field '{field}' is a date, got '{operand}'")
+            result = _compare(series.dt.normalize().to_numpy(), operator, day)
+            return np.where(series.notna().to_numpy(), result, operator == '!=')
+        series = series.dt.strftime('%Y-%m-%d')
+
+    # Strings: evaluate on the distinct (lower-cased) values, then broadcast via codes
+    if column not in cache:
+        codes, uniques = pd.factorize(series)
+        cache[column] = (codes, pd.Series(uniques).map(str).str.lower())
+    codes, uniques = cache[column]
+    needle = str(operand).lower()
+    if operator in ('~', '!~'):
+        matched = uniques.str.contains(needle, regex=False).to_numpy()
+        if operator == '!~':
+            matched = ~matched
+    else:
+        matched = _compare(uniques.to_numpy(), operator, needle)
+
+    # Missing values (code -1) match only negative operators
+    lookup = np.append(matched, operator in ('!=', '!~'))
+    return lookup[codes]
+
+
+def evaluate_predicate(tree, df, cache=None):
+    """Evaluate a parsed predicate over a frame to a boolean NumPy array."""
+    if cache is None:
+        cache = {}
+    kind = tree[0]
+    if kind == 'const':
+        return np.full(len(df), tree[1], dtype=bool)
+    if kind == 'not':
+        return ~evaluate_predicate(tree[1], df, cache)
+    if kind in ('and', 'or'):
+        combine = np.logical_and if kind == 'and' else np.logical_or
+        result = evaluate_predicate(tree[1][0], df, cache)
+        for node in tree[1][1:]:
+            result = combine(result, evaluate_predicate(node, df, cache))
+        return result
+    return np.asarray(_evaluate_comparison(df, *tree[1:], cache), dtype=bool)
+
+
+def compile_predicate(text):
+    """
+    Compile a predicate once into a function of (df, cache=None) -> bool array.
+    Share one cache dict across predicates evaluated on the same frame.
+    """
+    tree = parse_predicate(text)
+
+    def predicate(df, cache=None):
+        return evaluate_predicate(tree, df, cache)
+
+    predicate.tree = tree
+    predicate.source = text
+    return predicate
+
+
+def query_frame(df, text, cache=None):
+    """
+    Rows of a processed VM frame matching a query, e.g.
+    query_frame(df, 'os_family=Windows and memory_gb>32 and cluster~PROD').
+    
+    Args:
+        df: Processed frame (see data_processor.load_processed_frame)
+        text: Query expression in the predicate language
+        cache: Optional dict shared across queries on the same frame
+        
+    Returns:
+        Filtered copy of the frame
+    """
+    return df[compile_predicate(text)(df, cache)].copy()
+
+
+# For testing
+if __name__ == '__main__':
+    frame = pd.DataFrame({
+        'guest_os': ['RHEL 7.9', 'Windows 2019', 'RHEL 8.6', None],
+        'os_family': ['Linux', 'Windows', 'Linux', 'Unknown'],
+        'mem_size_GB': [8, 128, 64, 4],
+        'num_of_cpus': [2, 8, 24, 1]
+    })
+    for text in [
+        'os_family = Windows and (memory_gb > 64 or vcpus > 16)',
+        "guest_os ~ 'rhel 7' or guest_os ~ rhel7",
+        'not vcpus <= 4',
+        'guest_os != "RHEL 8.6"'
+    ]:
+        print(f"{text}: {compile_predicate(text)(frame).tolist()}")
+    print(query_frame(frame, 'os_family=Linux and memory_gb>8'))
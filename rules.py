@@ -0,0 +1,185 @@
+"""
+rules.py
+--------
+Configurable size-category and migration-complexity rules.
+Rules are read from a TOML (or YAML) file, compiled once into vectorized
+predicates and applied to the whole frame with first-match semantics.
+"""
+
+import functools
+import hashlib
+import os
+
+import numpy as np
+
+from predicates import FIELD_ALIASES, compile_predicate
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'default_rules.toml')
+
+# Rule set in the rules file -> (category column, fired-rule column), applied in this order
+RULE_SETS = {
+    'size': ('size_category', 'size_rule'),
+    'complexity': ('complexity', 'complexity_rule')
+}
+
+# Assigned when no rule of a set matches
+UNMATCHED_CATEGORY = 'Unknown'
+
+# Size rule thresholds shown as ranges: column -> (range key, unit)
+RANGE_COLUMNS = {'num_of_cpus': ('cpu_range', ''), 'mem_size_GB': ('mem_range', ' GB')}
+
+
+def read_rules_file(path):
+    """Read a rules file (.toml, .yaml or .yml) into a dictionary."""
+    if path.lower().endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAML rules files need PyYAML: pip install pyyaml")
+        with open(path, encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    with open(path, 'rb') as f:
+        return tomllib.load(f)
+
+
+@functools.lru_cache(maxsize=None)
+def load_rules(path=None):
+    """
+    Load and compile a rules file (default: default_rules.toml).
+    Compiled rule sets are cached per path.
+
+    Returns:
+        Dictionary with 'path', 'fingerprint' (content hash) and, per rule
+        set, a list of {'name', 'category', 'when', 'predicate'} entries
+    """
+    path = path or DEFAULT_RULES_PATH
+    with open(path, 'rb') as f:
+        fingerprint = hashlib.sha256(f.read()).hexdigest()[:16]
+    definitions = read_rules_file(path)
+
+    rules = {'path': path, 'fingerprint': fingerprint}
+    for rule_set in RULE_SETS:
+        entries = definitions.get(rule_set) or []
+        if not entries:
+            raise ValueError(f"Rules file {path} defines no [[{rule_set}]] rules")
+        compiled = []
+        for i, entry in enumerate(entries):
+            if 'category' not in entry:
+                raise ValueError(f"Rule {rule_set}[{i}] in {path} has no category")
+            when = str(entry.get('when', '')).strip()
+            compiled.append({
+                'name': str(entry.get('name', f"{rule_set}-{i + 1}")),
+                'category': str(entry['category']),
+                'when': when,
+                'predicate': compile_predicate(when)
+            })
+        rules[rule_set] = compiled
+    return rules
+
+
+def apply_rules(df, rules):
+    """
+    Classify every VM of a frame in place.
+    Each rule set writes its category column and the name of the rule that fired.
+    """
+    cache = {}
+    for rule_set, (category_column, rule_column) in RULE_SETS.items():
+        entries = rules[rule_set]
+        conditions = [entry['predicate'](df, cache) for entry in entries]
+        df[category_column] = np.select(
+            conditions, [entry['category'] for entry in entries], default=UNMATCHED_CATEGORY
+        )
+        df[rule_column] = np.select(conditions, [entry['name'] for entry in entries], default='')
+    return df
+
+
+def describe_rules(rules):
+    """JSON-friendly description of the active rules for the dashboard."""
+    return {
+        'source': os.path.basename(rules['path']),
+        **{
+            rule_set: [
+                {'name': entry['name'], 'category': entry['category'], 'when': entry['when'] or 'always'}
+                for entry in rules[rule_set]
+            ]
+            for rule_set in RULE_SETS
+        }
+    }
+
+
+def _threshold_bounds(tree):
+    """
+    Thresholds of a predicate made of numeric `field > N` (or >=) comparisons
+    joined by or, as {column: (operator, N)}; None for any other predicate.
+    """
+    bounds = {}
+    for node in tree[1] if tree[0] == 'or' else [tree]:
+        if node[0] != 'cmp' or node[2] not in ('>', '>='):
+            return None
+        try:
+            value = float(node[3])
+        except ValueError:
+            return None
+        column = FIELD_ALIASES.get(node[1], node[1])
+        if column not in bounds or value < bounds[column][1]:
+            bounds[column] = (node[2], value)
+    return bounds
+
+
+def describe_size_ranges(rules):
+    """
+    vCPU and memory range labels per size category, in rule order.
+
+    First match wins, so the first rule is labelled by its own thresholds
+    (>16) and every later category by the lowest threshold of the rules
+    checked before it (≤16). Ranges can only be told while those rules are
+    `field > N or ...` thresholds; after any other rule the labels are None.
+
+    Returns:
+        {category: {'cpu_range': label, 'mem_range': label}}
+    """
+    ranges = {}
+    upper = {}
+    known = True
+    for index, entry in enumerate(rules['size']):
+        bounds = _threshold_bounds(entry['predicate'].tree) if entry['when'] else {}
+        if entry['category'] not in ranges:
+            labels = {}
+            for column, (key, unit) in RANGE_COLUMNS.items():
+                if index == 0:
+                    told, bound, prefix = bounds is not None, (bounds or {}).get(column), {'>': '>', '>=': '≥'}
+                else:
+                    told, bound, prefix = known, upper.get(column), {'>': '≤', '>=': '<'}
+                if not told:
+                    labels[key] = None
+                elif bound is None:
+                    labels[key] = 'Any'
+                else:
+                    labels[key] = f"{prefix[bound[0]]}{bound[1]:g}{unit}"
+            ranges[entry['category']] = labels
+        if bounds is None:
+            known = False
+        else:
+            for column, (operator, value) in bounds.items():
+                if column not in upper or value < upper[column][1]:
+                    upper[column] = (operator, value)
+    return ranges
+
+
+# For testing
+if __name__ == '__main__':
+    import sys
+
+    rules = load_rules(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"Rules: {rules['path']} ({rules['fingerprint']})")
+    for rule_set in RULE_SETS:
+        print(f"\n[{rule_set}]")
+        for entry in rules[rule_set]:
+            print(f"  {entry['name']:<16} -> {entry['category']:<8} when {entry['when'] or 'always'}")
+    print(f"\nSize ranges: {describe_size_ranges(rules)}")
@@ -0,0 +1,135 @@
+"""
+scenario_sweep.py
+-----------------
+Capacity sensitivity sweep for the Forecast tab.
+
+Total recommended nodes are evaluated over a full grid of sizing parameters:
+node spec, overhead factor, CPU and memory overcommit, annual growth and HA
+spare nodes. Each cluster is sized from its total vCPUs and memory in
+distributions['by_cluster'] (the capacity ratio, not bin-packing): projected
+demand times overhead over the overcommitted node capacity, plus spare nodes,
+at least MIN_NODES per cluster.
+
+The vCPU and memory node counts only depend on some of the axes, so they are
+computed on their own sub-grids and combined by broadcasting; clusters are
+processed in blocks to bound memory. The result is one integer per grid point
+in row-major order of the axes.
+"""
+
+import numpy as np
+
+from placement import NODE_SPECS, OVERHEAD_FACTOR, HA_SPARE_NODES, MIN_NODES
+from forecast import FORECAST_YEARS, DEFAULT_GROWTH_RATE
+
+
+# Swept parameters in grid order: name -> (label, values, baseline); the node
+# spec axis takes its values from the node specs
+SWEEP_AXES = {
+    'node_spec': ('Node spec', None, 'medium'),
+    'overhead': ('Overhead factor', (1.0, 1.1, 1.2, 1.3, 1.4, 1.5), OVERHEAD_FACTOR),
+    'cpu_overcommit': ('CPU overcommit', (1, 2, 4, 6, 8, 10), 1),
+    'memory_overcommit': ('Memory overcommit', (1.0, 1.1, 1.25, 1.5), 1.0),
+    'growth': ('Annual growth (%)', tuple(range(0, 55, 5)), DEFAULT_GROWTH_RATE),
+    'ha_spare_nodes': ('HA spare nodes', (0, 1, 2), HA_SPARE_NODES)
+}
+
+# Clusters sized per block of the grid evaluation
+CLUSTER_BLOCK = 64
+
+
+def sweep_capacity(by_cluster, node_specs=None, axes=None, years=len(FORECAST_YEARS), min_nodes=MIN_NODES):
+    """
+    Total recommended nodes for every combination of the sweep parameters.
+
+    Args:
+        by_cluster: distributions['by_cluster'] (num_of_cpus, mem_size_GB per cluster)
+        node_specs: Spec name -> {'label', 'vcpus', 'memory'} (default NODE_SPECS)
+        axes: Values per axis name overriding SWEEP_AXES (optional)
+        years: Years of growth (the last forecast year)
+        min_nodes: Minimum nodes per cluster with VMs
+
+    Returns:
+        JSON-friendly dictionary with 'axes' ([{'name', 'label', 'values',
+        'baseline'}] in grid order), 'shape', 'nodes' (row-major totals),
+        'year' and 'clusters'
+    """
+    node_specs = node_specs or NODE_SPECS
+    values = {name: list(axis_values or node_specs) for name, (_, axis_values, _) in SWEEP_AXES.items()}
+    values.update({name: list(axis_values) for name, axis_values in (axes or {}).items()})
+
+    spec_vcpus = np.array([node_specs[spec]['vcpus'] for spec in values['node_spec']], dtype=float)
+    spec_memory = np.array([node_specs[spec]['memory'] for spec in values['node_spec']], dtype=float)
+    overhead = np.array(values['overhead'], dtype=float)
+    cpu_overcommit = np.array(values['cpu_overcommit'], dtype=float)
+    memory_overcommit = np.array(values['memory_overcommit'], dtype=float)
+    growth = (1 + np.array(values['growth'], dtype=float) / 100) ** years
+    spare = np.array(values['ha_spare_nodes'], dtype=np.int32)
+
+    # Demand multiplier per capacity unit on the sub-grids each resource depends on:
+    # vCPUs (spec, overhead, cpu, 1, growth), memory (spec, overhead, 1, memory, growth)
+    vcpu_scale = (overhead[None, :, None, None, None] * growth[None, None, None, None, :]
+                  / (spec_vcpus[:, None, None, None, None] * cpu_overcommit[None, None, :, None, None]))
+    memory_scale = (overhead[None, :, None, None, None] * growth[None, None, None, None, :]
+                    / (spec_memory[:, None, None, None, None] * memory_overcommit[None, None, None, :, None]))
+
+    clusters = list(by_cluster)
+    demand_vcpus = np.array([by_cluster[c]['num_of_cpus'] for c in clusters], dtype=float)
+    demand_memory = np.array([by_cluster[c]['mem_size_GB'] for c in clusters], dtype=float)
+    used = (demand_vcpus > 0) | (demand_memory > 0)
+    demand_vcpus, demand_memory = demand_vcpus[used], demand_memory[used]
+
+    shape = vcpu_scale.shape[:3] + memory_scale.shape[3:4] + vcpu_scale.shape[4:] + spare.shape
+    totals = np.zeros(shape, dtype=np.int64)
+    for start in range(0, len(demand_vcpus), CLUSTER_BLOCK):
+        block = slice(start, start + CLUSTER_BLOCK)
+        # (..., clusters); the epsilon absorbs float error on exact fits
+        vcpu_nodes = np.ceil(vcpu_scale[..., None] * demand_vcpus[block] - 1e-9).astype(np.int32)
+        memory_nodes = np.ceil(memory_scale[..., None] * demand_memory[block] - 1e-9).astype(np.int32)
+        nodes = np.maximum(vcpu_nodes, memory_nodes)[..., None, :] + spare[:, None]
+        totals += np.maximum(nodes, min_nodes).sum(axis=-1)
+
+    return {
+        'axes': [
+            {
+                'name': name,
+                'label': label,
+                'values': values[name],
+                'baseline': baseline if baseline in values[name] else values[name][0]
+            }
+            for name, (label, _, baseline) in SWEEP_AXES.items()
+        ],
+        'shape': list(totals.shape),
+        'nodes': totals.ravel().tolist(),
+        'year': FORECAST_YEARS[0] + years - 1,
+        'clusters': int(used.sum()),
+        'min_nodes': min_nodes
+    }
+
+
+# For testing
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(5)
+    by_cluster = {
+        f'CLU-{i:03d}': {'num_of_cpus': int(rng.integers(50, 5000)), 'mem_size_GB': int(rng.integers(200, 40000))}
+        for i in range(200)
+    }
+
+    start = time.perf_counter()
+    sweep = sweep_capacity(by_cluster)
+    elapsed = time.perf_counter() - start
+    print(f"{len(sweep['nodes'])} grid points x {sweep['clusters']} clusters in {elapsed:.3f}s "
+          f"(shape {sweep['shape']})")
+
+    fine = {'overhead': np.round(np.arange(1.0, 1.51, 0.05), 2).tolist(), 'growth': list(range(0, 51, 2)),
+            'cpu_overcommit': list(range(1, 11))}
+    start = time.perf_counter()
+    sweep = sweep_capacity(by_cluster, axes=fine)
+    elapsed = time.perf_counter() - start
+    print(f"{len(sweep['nodes'])} grid points x {sweep['clusters']} clusters in {elapsed:.3f}s "
+          f"(shape {sweep['shape']})")
+
+    grid = np.array(sweep['nodes']).reshape(sweep['shape'])
+    baseline = tuple(axis['values'].index(axis['baseline']) for axis in sweep['axes'])
+    print(f"  baseline nodes in {sweep['year']}: {grid[baseline]}")
@@ -0,0 +1,337 @@
+"""
+snapshot_store.py
+-----------------
+Append-only SQLite history of processed exports.
+Each run records per-run and per-cluster aggregates, plus per-VM resource
+vectors stored as change events, so real capacity can be plotted over time.
+The latest recorded vector of every present VM is also kept in vm_current, so
+appending a run reads the current estate rather than the whole event history.
+"""
+
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from data_processor import snapshot_keys
+
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    taken_at TEXT NOT NULL,
+    source TEXT,
+    total_vms INTEGER NOT NULL,
+    running_vms INTEGER NOT NULL,
+    total_vcpus INTEGER NOT NULL,
+    total_memory_gb INTEGER NOT NULL,
+    total_storage_gb REAL NOT NULL,
+    used_storage_gb REAL NOT NULL,
+    added INTEGER NOT NULL,
+    removed INTEGER NOT NULL,
+    modified INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_taken_at ON runs (taken_at);
+
+CREATE TABLE IF NOT EXISTS cluster_runs (
+    cluster_name TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    vm_count INTEGER NOT NULL,
+    running_vms INTEGER NOT NULL,
+    vcpus INTEGER NOT NULL,
+    memory_gb INTEGER NOT NULL,
+    storage_gb REAL NOT NULL,
+    used_storage_gb REAL NOT NULL,
+    PRIMARY KEY (cluster_name, run_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS vm_events (
+    vm_key TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    present INTEGER NOT NULL,
+    cluster_name TEXT,
+    vm_host TEXT,
+    status TEXT,
+    vcpus INTEGER,
+    memory_gb INTEGER,
+    storage_gb REAL,
+    used_storage_gb REAL,
+    PRIMARY KEY (vm_key, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_vm_events_run ON vm_events (run_id);
+
+CREATE TABLE IF NOT EXISTS vm_current (
+    vm_key TEXT PRIMARY KEY,
+    cluster_name TEXT,
+    vm_host TEXT,
+    status TEXT,
+    vcpus INTEGER,
+    memory_gb INTEGER,
+    storage_gb REAL,
+    used_storage_gb REAL
+) WITHOUT ROWID;
+'''
+
+# Per-VM vector columns: processed frame column -> vm_events column
+VECTOR_COLUMNS = {
+    'cluster_name': 'cluster_name',
+    'vm_host': 'vm_host',
+    'status': 'status',
+    'num_of_cpus': 'vcpus',
+    'mem_size_GB': 'memory_gb',
+    'storage_size_GB': 'storage_gb',
+    'used_size_GB': 'used_storage_gb'
+}
+
+# Used storage drifts daily; only record a new VM event when it moves by more than this fraction
+USED_STORAGE_TOLERANCE = 0.05
+
+
+def open_store(path):
+    """Open (and create if needed) a snapshot store."""
+    conn = sqlite3.connect(path)
+    has_current = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vm_current'"
+    ).fetchone() is not None
+    conn.executescript(SCHEMA)
+    if not has_current:
+        # Stores written before vm_current: build it from the event history once
+        with conn:
+            conn.execute('''
+                INSERT INTO vm_current
+                SELECT e.vm_key, e.cluster_name, e.vm_host, e.status, e.vcpus, e.memory_gb,
+                       e.storage_gb, e.used_storage_gb
+                FROM vm_events e
+                JOIN (SELECT vm_key, MAX(run_id) AS run_id FROM vm_events GROUP BY vm_key) last
+                  ON e.vm_key = last.vm_key AND e.run_id = last.run_id
+                WHERE e.present = 1
+            ''')
+    return conn
+
+
+def parse_taken_at(taken_at=None):
+    """
+    Normalize a snapshot timestamp (datetime or ISO 8601 string, default now)
+    to the stored 'YYYY-MM-DD HH:MM:SS' form, so runs sort by date as text.
+    """
+    if taken_at is None:
+        taken_at = datetime.now()
+    elif not isinstance(taken_at, datetime):
+        try:
+            taken_at = datetime.fromisoformat(str(taken_at))
+        except ValueError:
+            raise ValueError(f"Invalid snapshot date {taken_at!r}, expected YYYY-MM-DD "
+                             f"or an ISO 8601 timestamp") from None
+    if taken_at.tzinfo is not None:
+        taken_at = taken_at.astimezone().replace(tzinfo=None)
+    return taken_at.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def check_snapshot_order(conn, taken_at):
+    """
+    Reject a run older than the latest recorded one. Each run is diffed
+    against the latest VM vectors, so exports have to be recorded oldest first.
+    """
+    latest = conn.execute('SELECT MAX(taken_at) FROM runs').fetchone()[0]
+    if latest is not None and taken_at < latest:
+        raise ValueError(f"Snapshot date {taken_at} is older than the latest run in the store "
+                         f"({latest}); record backfilled exports oldest first")
+
+
+def _latest_vectors(conn):
+    """Return the latest recorded vector of every VM still present, indexed by vm_key."""
+    latest = pd.read_sql_query('''
+        SELECT vm_key, cluster_name, vm_host, status, vcpus, memory_gb, storage_gb, used_storage_gb
+        FROM vm_current
+    ''', conn)
+    return latest.set_index('vm_key')
+
+
+def _current_vectors(df):
+    """Per-VM resource vectors of a processed frame, indexed by vm_key."""
+    vectors = df[list(VECTOR_COLUMNS)].rename(columns=VECTOR_COLUMNS)
+    vectors.index = snapshot_keys(df)
+    vectors.index.name = 'vm_key'
+    return vectors
+
+
+def _changed_vectors(previous, current):
+    """Boolean mask over current rows (aligned to previous) whose vector changed."""
+    changed = np.zeros(len(current), dtype=bool)
+    for column in ['cluster_name', 'vm_host', 'status', 'vcpus', 'memory_gb', 'storage_gb']:
+        before = previous[column].to_numpy()
+        after = current[column].to_numpy()
+        changed |= ~((before == after) | (pd.isna(before) & pd.isna(after)))
+
+    before_used = previous['used_storage_gb'].to_numpy(dtype=float)
+    after_used = current['used_storage_gb'].to_numpy(dtype=float)
+    drift = np.abs(after_used - before_used) > USED_STORAGE_TOLERANCE * np.maximum(before_used, 1.0)
+    return changed | drift
+
+
+def append_snapshot(conn, df, aggregates, taken_at=None, source=None):
+    """
+    Append one processed export to the store.
+
+    Args:
+        conn: Connection from open_store()
+        df: Processed VM frame (data_processor.load_processed_frame)
+        aggregates: Its aggregate table
+        taken_at: Snapshot timestamp (datetime or ISO string, default now);
+            it may not be older than the latest run
+        source: Export file name recorded with the run
+
+    Returns:
+        Dictionary with the new run_id and added/removed/modified VM counts
+    """
+    taken_at = parse_taken_at(taken_at)
+    check_snapshot_order(conn, taken_at)
+
+    # Diff per-VM vectors against the latest recorded state
+    previous = _latest_vectors(conn)
+    current = _current_vectors(df)
+    in_previous = current.index.isin(previous.index)
+    added = current[~in_previous]
+    common = current[in_previous]
+    modified = common[_changed_vectors(previous.loc[common.index], common)]
+    removed = previous.index[~previous.index.isin(current.index)]
+
+    running = aggregates[aggregates['status'] == 'On']
+    by_cluster = aggregates.groupby('cluster_name')[
+        ['vm_count', 'num_of_cpus', 'mem_size_GB', 'storage_size_GB', 'used_size_GB']
+    ].sum()
+    running_by_cluster = running.groupby('cluster_name')['vm_count'].sum()
+
+    with conn:
+        cursor = conn.execute(
+            '''INSERT INTO runs (taken_at, source, total_vms, running_vms, total_vcpus,
+                                 total_memory_gb, total_storage_gb, used_storage_gb,
+                                 added, removed, modified)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            (taken_at, source,
+             int(aggregates['vm_count'].sum()), int(running['vm_count'].sum()),
+             int(aggregates['num_of_cpus'].sum()), int(aggregates['mem_size_GB'].sum()),
+             float(aggregates['storage_size_GB'].sum()), float(aggregates['used_size_GB'].sum()),
+             len(added), len(removed), len(modified))
+        )
+        run_id = cursor.lastrowid
+
+        conn.executemany(
+            'INSERT INTO cluster_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [(str(cluster), run_id, int(row['vm_count']), int(running_by_cluster.get(cluster, 0)),
+              int(row['num_of_cpus']), int(row['mem_size_GB']),
+              float(row['storage_size_GB']), float(row['used_size_GB']))
+             for cluster, row in by_cluster.iterrows()]
+        )
+
+        events = pd.concat([added, modified])
+        rows = list(events.astype(object).where(events.notna(), None).itertuples(name=None))
+        conn.executemany(
+            'INSERT INTO vm_events VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?)',
+            ((key, run_id, *values) for key, *values in rows)
+        )
+        conn.executemany(
+            'INSERT INTO vm_events (vm_key, run_id, present) VALUES (?, ?, 0)',
+            ((key, run_id) for key in removed)
+        )
+        # Latest vector per present VM, kept in step with the events
+        conn.executemany('INSERT OR REPLACE INTO vm_current VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        conn.executemany('DELETE FROM vm_current WHERE vm_key = ?', ((key,) for key in removed))
+
+    return {'run_id': run_id, 'added': len(added), 'removed': len(removed), 'modified': len(modified)}
+
+
+def query_capacity_series(conn, cluster=None, start=None, end=None):
+    """
+    Observed capacity per run, oldest first.
+    Uses the taken_at index for the estate totals and the (cluster, run) key per cluster.
+    """
+    conditions = []
+    params = []
+    if start is not None:
+        conditions.append('r.taken_at >= ?')
+        params.append(start)
+    if end is not None:
+        conditions.append('r.taken_at <= ?')
+        params.append(end)
+
+    if cluster is None:
+        sql = '''SELECT r.taken_at, r.total_vms AS vm_count, r.running_vms, r.total_vcpus AS vcpus,
+                        r.total_memory_gb AS memory_gb, r.total_storage_gb AS storage_gb,
+                        r.used_storage_gb, r.added, r.removed, r.modified
+                 FROM runs r'''
+    else:
+        sql = '''SELECT r.taken_at, c.vm_count, c.running_vms, c.vcpus, c.memory_gb,
+                        c.storage_gb, c.used_storage_gb
+                 FROM cluster_runs c JOIN runs r ON r.run_id = c.run_id'''
+        conditions.insert(0, 'c.cluster_name = ?')
+        params.insert(0, cluster)
+
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    sql += ' ORDER BY r.taken_at, r.run_id'
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def query_vm_history(conn, vm_name):
+    """Recorded resource vectors of one VM, oldest first (present=0 marks removal)."""
+    return pd.read_sql_query('''
+        SELECT r.taken_at, e.present, e.cluster_name, e.vm_host, e.status, e.vcpus,
+               e.memory_gb, e.storage_gb, e.used_storage_gb
+        FROM vm_events e JOIN runs r ON r.run_id = e.run_id
+        WHERE e.vm_key = ?
+        ORDER BY e.run_id
+    ''', conn, params=(vm_name,))
+
+
+def _series_dict(frame):
+    """Convert a capacity series frame to JSON-friendly lists."""
+    series = {
+        'dates': frame['taken_at'].str.slice(0, 10).tolist(),
+        'vms': frame['vm_count'].astype(int).tolist(),
+        'vcpus': frame['vcpus'].astype(int).tolist(),
+        'memory': frame['memory_gb'].astype(int).tolist(),
+        'storage': frame['storage_gb'].round(1).tolist(),
+        'used_storage': frame['used_storage_gb'].round(1).tolist()
+    }
+    for column in ['added', 'removed', 'modified']:
+        if column in frame.columns:
+            series[column] = frame[column].astype(int).tolist()
+    return series
+
+
+def get_history_data(conn, clusters=None):
+    """
+    Build the snapshot history block for the Trends tab.
+    Returns None until at least one run is recorded.
+    """
+    totals = query_capacity_series(conn)
+    if len(totals) == 0:
+        return None
+
+    return {
+        'runs': len(totals),
+        'total': _series_dict(totals),
+        'by_cluster': {
+            cluster: _series_dict(query_capacity_series(conn, cluster=cluster))
+            for cluster in (clusters or [])
+        }
+    }
+
+
+# For testing
+if __name__ == '__main__':
+    import sys
+    from data_processor import load_processed_frame
+
+    if len(sys.argv) < 3:
+        print("Usage: python snapshot_store.py <history_db> <excel_file>")
+        sys.exit(1)
+
+    conn = open_store(sys.argv[1])
+    df, aggregates, _ = load_processed_frame(sys.argv[2])
+    result = append_snapshot(conn, df, aggregates, source=sys.argv[2])
+    print(f"Run {result['run_id']}: +{result['added']} added, -{result['removed']} removed, "
+          f"~{result['modified']} modified")
+    print(query_capacity_series(conn).tail(10).to_string(index=False))
@@ -0,0 +1,175 @@
+"""
+storage_domains.py
+------------------
+Storage domain analysis and target PVC capacity plan.
+
+Works from distributions['by_storage_domain'] (VM count, provisioned and used
+storage per RHV storage domain, grouped from the aggregate table), so it adds
+no pass over the VM rows. A storage map file (TOML or YAML, default
+default_storage_map.toml) maps every domain to an OpenShift storage class; the
+plan then sums per storage class:
+- requested PVC capacity: the provisioned disks, plus the CDI filesystem
+  overhead on Filesystem volume mode classes
+- raw backend capacity: used (thin) or requested storage times the replicas
+
+Migration time per domain is limited by the slower of the domain's read
+bandwidth and its storage class's write throughput; domains sharing a storage
+class share its throughput.
+"""
+
+import fnmatch
+import os
+
+from migration_sim import DOMAIN_BANDWIDTH_MBPS
+from rules import read_rules_file
+
+
+DEFAULT_STORAGE_MAP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'default_storage_map.toml')
+VOLUME_MODES = ('Block', 'Filesystem')
+
+
+def load_storage_map(path=None):
+    """
+    Load a storage map (default: default_storage_map.toml).
+
+    Returns:
+        Dictionary with 'path', 'default_class', 'filesystem_overhead',
+        'classes' (name -> {'name', 'label', 'volume_mode', 'replicas', 'thin',
+        'throughput_mbps'}) and 'mappings' ([(pattern, class name)] in order)
+    """
+    path = path or DEFAULT_STORAGE_MAP_PATH
+    definitions = read_rules_file(path)
+
+    classes = {}
+    for i, entry in enumerate(definitions.get('storage_class') or []):
+        if 'name' not in entry:
+            raise ValueError(f"Storage class {i} in {path} has no name")
+        volume_mode = str(entry.get('volume_mode', 'Block'))
+        if volume_mode not in VOLUME_MODES:
+            raise ValueError(f"Storage class {entry['name']} in {path}: volume_mode must be "
+                             f"{' or '.join(VOLUME_MODES)}")
+        if float(entry.get('replicas', 1)) < 1 or float(entry.get('throughput_mbps', 1)) <= 0:
+            raise ValueError(f"Storage class {entry['name']} in {path} needs replicas >= 1 "
+                             f"and a positive throughput_mbps")
+        name = str(entry['name'])
+        classes[name] = {
+            'name': name,
+            'label': str(entry.get('label', name)),
+            'volume_mode': volume_mode,
+            'replicas': float(entry.get('replicas', 1)),
+            'thin': bool(entry.get('thin', True)),
+            'throughput_mbps': float(entry.get('throughput_mbps', DOMAIN_BANDWIDTH_MBPS))
+        }
+    if not classes:
+        raise ValueError(f"Storage map {path} defines no [[storage_class]] entries")
+
+    default_class = str(definitions.get('default_class', next(iter(classes))))
+    mappings = [(str(m.get('domain', '*')), str(m.get('storage_class'))) for m in definitions.get('mapping') or []]
+    for storage_class in [default_class] + [target for _, target in mappings]:
+        if storage_class not in classes:
+            raise ValueError(f"Storage map {path} maps to unknown storage class {storage_class}")
+
+    return {
+        'path': path,
+        'default_class': default_class,
+        'filesystem_overhead': float(definitions.get('filesystem_overhead', 0.055)),
+        'classes': classes,
+        'mappings': mappings
+    }
+
+
+def map_storage_class(domain, storage_map):
+    """Storage class of an RHV storage domain: the first matching mapping, else the default."""
+    for pattern, storage_class in storage_map['mappings']:
+        if fnmatch.fnmatchcase(str(domain).lower(), pattern.lower()):
+            return storage_class
+    return storage_map['default_class']
+
+
+def plan_storage(by_domain, storage_map, domain_bandwidth=DOMAIN_BANDWIDTH_MBPS):
+    """
+    Per-domain storage analysis and per-storage-class PVC capacity plan.
+
+    Args:
+        by_domain: distributions['by_storage_domain'] (vm_count,
+            storage_size_GB and used_size_GB per domain)
+        storage_map: load_storage_map() result
+        domain_bandwidth: Read bandwidth of one RHV storage domain (MB/s)
+
+    Returns:
+        JSON-friendly dictionary with 'source', 'domains' (largest transfer
+        first), 'classes' (PVC plan per storage class) and 'totals'
+    """
+    overhead = storage_map['filesystem_overhead']
+    domains = []
+    classes = {}
+    for domain, stats in by_domain.items():
+        storage_class = storage_map['classes'][map_storage_class(domain, storage_map)]
+        provisioned = float(stats['storage_size_GB'])
+        used = float(stats['used_size_GB'])
+        requested = provisioned * (1 + overhead) if storage_class['volume_mode'] == 'Filesystem' else provisioned
+        raw = (used if storage_class['thin'] else requested) * storage_class['replicas']
+        rate = min(domain_bandwidth, storage_class['throughput_mbps'])
+        domains.append({
+            'domain': str(domain),
+            'storage_class': storage_class['name'],
+            'vm_count': int(stats['vm_count']),
+            'provisioned_gb': round(provisioned, 1),
+            'used_gb': round(used, 1),
+            'used_pct': round(used / provisioned * 100, 1) if provisioned else 0,
+            'rate_mbps': rate,
+            'hours': round(used * 1024 / rate / 3600, 2)
+        })
+
+        entry = classes.setdefault(storage_class['name'], {
+            **storage_class, 'domains': 0, 'vm_count': 0, 'provisioned_gb': 0.0, 'used_gb': 0.0,
+            'requested_gb': 0.0, 'raw_gb': 0.0
+        })
+        entry['domains'] += 1
+        entry['vm_count'] += int(stats['vm_count'])
+        entry['provisioned_gb'] += provisioned
+        entry['used_gb'] += used
+        entry['requested_gb'] += requested
+        entry['raw_gb'] += raw
+
+    for entry in classes.values():
+        # The domains of a class share its write throughput
+        entry['hours'] = round(entry['used_gb'] * 1024 / entry['throughput_mbps'] / 3600, 2)
+        for key in ('provisioned_gb', 'used_gb', 'requested_gb', 'raw_gb'):
+            entry[key] = round(entry[key], 1)
+
+    domains.sort(key=lambda d: d['used_gb'], reverse=True)
+    return {
+        'source': os.path.basename(storage_map['path']),
+        'filesystem_overhead': overhead,
+        'domain_bandwidth_mbps': domain_bandwidth,
+        'domains': domains,
+        'classes': sorted(classes.values(), key=lambda c: c['requested_gb'], reverse=True),
+        'totals': {
+            'domains': len(domains),
+            'vm_count': sum(d['vm_count'] for d in domains),
+            'provisioned_gb': round(sum(d['provisioned_gb'] for d in domains), 1),
+            'used_gb': round(sum(d['used_gb'] for d in domains), 1),
+            'requested_gb': round(sum(c['requested_gb'] for c in classes.values()), 1),
+            'raw_gb': round(sum(c['raw_gb'] for c in classes.values()), 1),
+            # Storage classes migrate in parallel, so the slowest one sets the pace
+            'hours': max((c['hours'] for c in classes.values()), default=0)
+        }
+    }
+
+
+# For testing
+if __name__ == '__main__':
+    by_domain = {
+        'DATA-FC-01': {'vm_count': 420, 'storage_size_GB': 61000.0, 'used_size_GB': 23800.5},
+        'DATA-NFS-01': {'vm_count': 130, 'storage_size_GB': 18000.0, 'used_size_GB': 9100.0},
+        'local-ssd-07': {'vm_count': 12, 'storage_size_GB': 2400.0, 'used_size_GB': 1900.0}
+    }
+    plan = plan_storage(by_domain, load_storage_map())
+    for domain in plan['domains']:
+        print(f"  {domain['domain']} -> {domain['storage_class']}: {domain['used_gb']:,} / "
+              f"{domain['provisioned_gb']:,} GB used, {domain['hours']} h at {domain['rate_mbps']:g} MB/s")
+    for storage_class in plan['classes']:
+        print(f"  {storage_class['name']}: {storage_class['requested_gb']:,} GB requested, "
+              f"{storage_class['raw_gb']:,} GB raw, {storage_class['hours']} h")
+    print(f"Total: {plan['totals']}")
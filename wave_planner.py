@@ -0,0 +1,254 @@
+"""
+wave_planner.py
+---------------
+Constraint-based partitioning of VMs into balanced migration waves.
+
+VMs (or whole clusters or hosts, when they have to move together) are split
+into waves under optional per-wave caps on VM count, TB transferred, vCPUs
+landed and maintenance-window hours, while the loads are spread as evenly as
+the caps allow. Complexity order is kept: no wave holds a VM less complex than
+one in an earlier wave (a cluster or host counts as its most complex VM).
+
+The planner works in two steps:
+- greedy: units are ordered by complexity, Linux share and name, and the
+  order is cut into consecutive waves. A binary search finds the smallest
+  per-wave load for which greedy filling (on prefix sums) needs no more than
+  the requested number of waves.
+- local search: units at the complexity boundary of two neighbouring waves
+  move from the heavier to the lighter one while that lowers the larger of
+  the two loads, which evens out measures the cut could not balance at once.
+
+The wave load is the largest of the wave's measures relative to an even share
+of the total, so 1.0 means perfectly balanced.
+"""
+
+import numpy as np
+import pandas as pd
+
+from migration_sim import MAX_CONCURRENT_TRANSFERS, TRANSFER_RATE_MBPS, VM_OVERHEAD_MINUTES
+
+
+# Complexity levels in migration order
+COMPLEXITY_ORDER = ['Low', 'Medium', 'High']
+# Units that can be kept together: option -> transfer list column
+KEEP_TOGETHER = {'cluster': 'cluster_name', 'host': 'vm_host'}
+# Planned measures, in the order of the caps
+PLAN_MEASURES = ['vm_count', 'transfer_tb', 'vcpus', 'hours']
+DEFAULT_WAVE_COUNT = 4
+# Upper bound on local search moves
+MAX_MOVES = 5000
+
+
+def _unit_table(transfers, keep_together, concurrency, transfer_rate, overhead_minutes):
+    """Per-unit measures, complexity rank and sort order; returns (units, unit index per VM)."""
+    if keep_together is None:
+        unit_ids = np.arange(len(transfers))
+        labels = transfers['vm_name'].map(str).to_numpy()
+    else:
+        codes, values = pd.factorize(transfers[KEEP_TOGETHER[keep_together]].fillna('Unknown').map(str))
+        unit_ids, labels = codes, np.asarray(values)
+
+    used = transfers['used_size_GB'].to_numpy(dtype=float)
+    # Wave hours at full concurrency: copy time plus per-VM overhead, spread over the slots
+    hours = (used * 1024 / transfer_rate + overhead_minutes * 60) / concurrency / 3600
+    rank = transfers['complexity'].map({level: i for i, level in enumerate(COMPLEXITY_ORDER)}).fillna(0)
+    frame = pd.DataFrame({
+        'unit': unit_ids,
+        'vm_count': 1,
+        'transfer_tb': used / 1024,
+        'vcpus': transfers['num_of_cpus'].to_numpy(dtype=float),
+        'hours': hours,
+        'memory_gb': transfers['mem_size_GB'].to_numpy(dtype=float),
+        'rank': rank.to_numpy(dtype=int),
+        'windows': (transfers['os_family'] == 'Windows').to_numpy(dtype=float)
+    })
+    units = frame.groupby('unit', sort=True).agg(
+        vm_count=('vm_count', 'sum'), transfer_tb=('transfer_tb', 'sum'), vcpus=('vcpus', 'sum'),
+        hours=('hours', 'sum'), memory_gb=('memory_gb', 'sum'), rank=('rank', 'max'), windows=('windows', 'mean')
+    )
+    units['label'] = labels[units.index.to_numpy()]
+    # Migration order: complexity, then Linux before Windows
+    units = units.sort_values(['rank', 'windows', 'label'], kind='stable')
+    return units, unit_ids
+
+
+def _greedy_bounds(prefix, limit):
+    """Cut the ordered units into consecutive waves no measure of which exceeds limit."""
+    bounds = [0]
+    count = len(prefix) - 1
+    while bounds[-1] < count:
+        start = bounds[-1]
+        ends = [np.searchsorted(prefix[:, m], prefix[start, m] + limit[m] * (1 + 1e-12), side='right') - 1
+                for m in range(prefix.shape[1])]
+        # A unit larger than the limit gets a wave of its own
+        bounds.append(max(min(ends), start + 1))
+    return bounds
+
+
+def _local_search(assignment, loads, rank, measures, share, caps, max_moves):
+    """Move complexity-boundary units between neighbouring waves to lower the larger load."""
+    wave_count = len(loads)
+    moves = 0
+    improved = True
+    while improved and moves < max_moves:
+        improved = False
+        for a in range(wave_count - 1):
+            b = a + 1
+            members_a = np.flatnonzero(assignment == a)
+            members_b = np.flatnonzero(assignment == b)
+            if len(members_a) == 0 or len(members_b) == 0:
+                continue
+            score_a, score_b = (loads[a] / share).max(), (loads[b] / share).max()
+            if score_a > score_b:
+                # Forward moves keep the order only for a's most complex units
+                source, target, members = a, b, members_a
+                candidates = members_a[rank[members_a] == rank[members_a].max()]
+            else:
+                source, target, members = b, a, members_b
+                candidates = members_b[rank[members_b] == rank[members_b].min()]
+            if len(candidates) == len(members):
+                continue
+
+            moved = measures[candidates]
+            new_source = ((loads[source] - moved) / share).max(axis=1)
+            new_target = ((loads[target] + moved) / share).max(axis=1)
+            objective = np.maximum(new_source, new_target)
+            objective[((loads[target] + moved) > caps).any(axis=1)] = np.inf
+            best = int(np.argmin(objective))
+            if objective[best] < max(score_a, score_b) - 1e-9:
+                unit = candidates[best]
+                assignment[unit] = target
+                loads[source] -= measures[unit]
+                loads[target] += measures[unit]
+                moves += 1
+                improved = True
+    return moves
+
+
+def plan_waves(transfers, waves=DEFAULT_WAVE_COUNT, max_vms=None, max_tb=None, max_vcpus=None,
+               max_hours=None, keep_together=None, concurrency=MAX_CONCURRENT_TRANSFERS,
+               transfer_rate=TRANSFER_RATE_MBPS, overhead_minutes=VM_OVERHEAD_MINUTES, max_moves=MAX_MOVES):
+    """
+    Split VMs into balanced waves under per-wave caps.
+
+    Args:
+        transfers: Per-VM frame (data_processor.migration_transfers) with
+            vm_name, cluster_name, vm_host, complexity, os_family, num_of_cpus,
+            mem_size_GB and used_size_GB
+        waves: Number of waves; more are opened when the caps need them
+        max_vms, max_tb, max_vcpus, max_hours: Per-wave caps (None = no cap)
+        keep_together: 'cluster' or 'host' to move whole clusters or hosts in
+            one wave, None to plan single VMs
+        concurrency, transfer_rate, overhead_minutes: Migration throughput
+            used for the wave hours estimate (see migration_sim.py)
+        max_moves: Local search move budget
+
+    Returns:
+        Dictionary with 'waves' (rows like data_processor.compute_migration_waves
+        plus transfer_tb, hours and over_cap), 'assignment' (wave number per
+        transfers row) and 'settings'
+    """
+    if waves < 1:
+        raise ValueError('At least one wave is needed')
+    if keep_together is not None and keep_together not in KEEP_TOGETHER:
+        raise ValueError(f"keep_together must be one of {', '.join(KEEP_TOGETHER)}")
+
+    units, unit_ids = _unit_table(transfers, keep_together, concurrency, transfer_rate, overhead_minutes)
+    measures = units[PLAN_MEASURES].to_numpy(dtype=float)
+    caps = np.array([np.inf if cap is None else float(cap) for cap in (max_vms, max_tb, max_vcpus, max_hours)])
+    prefix = np.vstack([np.zeros(len(PLAN_MEASURES)), np.cumsum(measures, axis=0)])
+    totals = prefix[-1]
+
+    # The caps alone may need more waves than requested
+    wave_count = max(waves, len(_greedy_bounds(prefix, caps)) - 1) if len(units) else 0
+    share = np.where(totals > 0, totals / max(wave_count, 1), 1.0)
+
+    # Smallest balanced load the greedy cut fits into wave_count waves
+    low, high = 1.0, float(max(wave_count, 1))
+    bounds = _greedy_bounds(prefix, np.minimum(high * share, caps))
+    for _ in range(40):
+        middle = (low + high) / 2
+        candidate = _greedy_bounds(prefix, np.minimum(middle * share, caps))
+        if len(candidate) - 1 <= wave_count:
+            high, bounds = middle, candidate
+        else:
+            low = middle
+
+    assignment = np.repeat(np.arange(len(bounds) - 1), np.diff(bounds))
+    loads = np.array([measures[start:end].sum(axis=0) for start, end in zip(bounds[:-1], bounds[1:])])
+    moves = _local_search(
+        assignment, loads, units['rank'].to_numpy(), measures, share, caps, max_moves
+    ) if len(loads) > 1 else 0
+
+    unit_wave = pd.Series(assignment + 1, index=units.index)
+    unit_label = {'cluster': 'cluster', 'host': 'host'}.get(keep_together, 'VM')
+    cap_text = ', '.join(
+        f"≤{cap:,g} {label}"
+        for cap, label in zip((max_vms, max_tb, max_vcpus, max_hours), ('VMs', 'TB', 'vCPUs', 'hours'))
+        if cap is not None
+    )
+
+    rows = []
+    for wave in range(len(loads)):
+        members = units[assignment == wave]
+        if len(members) == 0:
+            continue
+        levels = [COMPLEXITY_ORDER[r] for r in sorted(members['rank'].unique())]
+        complexity = levels[0] if len(levels) == 1 else f"{levels[0]}–{levels[-1]}"
+        vm_count, transfer_tb, vcpus, hours = loads[wave]
+        rows.append({
+            'wave': wave + 1,
+            'name': f"{complexity} Complexity",
+            'description': (f"{len(members):,} {unit_label}{'s' if len(members) != 1 else ''}, "
+                            f"{transfer_tb:,.1f} TB, ~{hours:,.1f} h at full concurrency"),
+            'criteria': cap_text or f"Balanced across {len(loads)} waves",
+            'vm_count': int(vm_count),
+            'vcpus': int(vcpus),
+            'memory_gb': int(members['memory_gb'].sum()),
+            'transfer_tb': round(float(transfer_tb), 2),
+            'hours': round(float(hours), 2),
+            'over_cap': bool((loads[wave] > caps * (1 + 1e-9)).any())
+        })
+
+    return {
+        'waves': rows,
+        'assignment': pd.Series(unit_wave.reindex(unit_ids).to_numpy(), index=transfers.index),
+        'settings': {
+            'requested_waves': waves,
+            'waves': len(rows),
+            'caps': dict(zip(PLAN_MEASURES, (max_vms, max_tb, max_vcpus, max_hours))),
+            'keep_together': keep_together,
+            'units': len(units),
+            'balance': round(float((loads / share).max()), 3) if len(loads) else None,
+            'local_search_moves': moves
+        }
+    }
+
+
+# For testing
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(11)
+    count = 100000
+    transfers = pd.DataFrame({
+        'vm_name': [f'vm-{i:06d}' for i in range(count)],
+        'cluster_name': rng.integers(0, 300, count).astype(str),
+        'vm_host': rng.integers(0, 3000, count).astype(str),
+        'complexity': rng.choice(COMPLEXITY_ORDER, count, p=[0.5, 0.4, 0.1]),
+        'os_family': rng.choice(['Linux', 'Windows'], count),
+        'num_of_cpus': rng.choice([1, 2, 4, 8, 16, 32], count),
+        'mem_size_GB': rng.choice([2, 4, 8, 16, 64, 256], count),
+        'used_size_GB': rng.lognormal(3.5, 1.2, count).round(1)
+    })
+
+    for options in [{'waves': 8}, {'waves': 8, 'max_tb': 60, 'max_vms': 10000}, {'waves': 6, 'keep_together': 'host'}]:
+        start = time.perf_counter()
+        plan = plan_waves(transfers, **options)
+        elapsed = time.perf_counter() - start
+        settings = plan['settings']
+        print(f"{options}: {settings['waves']} waves of {settings['units']} units in {elapsed:.3f}s, "
+              f"balance {settings['balance']}, {settings['local_search_moves']} moves")
+        for wave in plan['waves'][:8]:
+            print(f"  Wave {wave['wave']} {wave['name']}: {wave['vm_count']} VMs, {wave['transfer_tb']} TB, "
+                  f"{wave['vcpus']} vCPUs, {wave['hours']} h{' (over cap)' if wave['over_cap'] else ''}")